@@ -0,0 +1,51 @@
+# benchmarks/bench_complete.py
+"""添加面板输入联想（前缀树）的建立和逐键查询耗时
+
+用法: python benchmarks/bench_complete.py [网站数量 ...]
+逐键查询模拟一个字一个字地输入，每次查询的耗时应与网站数量无关。
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import make_sites
+from weblauncher import Site, SiteCompleter
+
+# (输入框, 最终输入的文字)
+TYPED = [
+    ("url", "https://www.learn"),
+    ("url", "net1"),
+    ("name", "hub tech"),
+    ("name", "tengxun"),
+]
+
+
+def main(sizes):
+    for size in sizes:
+        sites = [Site.from_dict(site) for site in make_sites(size)]
+        start = time.perf_counter()
+        completer = SiteCompleter(sites)
+        build_ms = (time.perf_counter() - start) * 1000
+        print(f"== {size} 个网站，建索引 {build_ms:.1f} ms")
+        print(f"{'输入':<22}{'首次 ms':>10}{'每键 us':>10}  补全")
+        for field, text in TYPED:
+            complete = completer.complete_url if field == "url" else completer.complete_name
+            prefixes = [text[:i] for i in range(1, len(text) + 1)]
+            # 第一次查到的前缀要从子节点合并出排名，之后直接取缓存
+            start = time.perf_counter()
+            for prefix in prefixes:
+                complete(prefix)
+            first_ms = (time.perf_counter() - start) * 1000
+            best = float("inf")
+            for _ in range(5):
+                start = time.perf_counter()
+                for prefix in prefixes:
+                    found = complete(prefix)
+                best = min(best, (time.perf_counter() - start) / len(prefixes))
+            print(f"{text:<22}{first_ms:>10.3f}{best * 1e6:>10.1f}  {', '.join(found[:3])}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000])
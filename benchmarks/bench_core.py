@@ -0,0 +1,202 @@
+# benchmarks/bench_core.py
+"""核心库基准：不启动界面，测量 WebsiteManager 各操作的耗时和峰值内存
+
+用法: python benchmarks/bench_core.py [网站数量 ...] [--backend jsonl|sqlite]
+                                       [--json 结果.json] [--compare 基线.json]
+默认测 1000、10000、100000 个网站，也可以加上 1000000（耗时约几分钟）。
+delta_load_ms / jsonl_load_ms 是日志中有增量时的完整加载（读取二进制快照
+或逐行解析 JSONL 快照，再重放日志），只对 jsonl 存储测量。save_ms 包含第一个
+备份版本；backup_ms / backup_kb 是之后改动一个网站再备份的耗时和新写入的字节数。
+
+每个规模在单独的子进程中运行（峰值内存互不影响），数据由固定种子生成，
+同一台机器上多次运行的结果可以直接比较。--json 保存结果，--compare 与
+之前保存的结果对比，变慢超过 REGRESSION 倍的项目标记为回归。
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import make_sites
+from weblauncher import FLUSH_INTERVAL, BackupStore, Site, SiteJournal, open_manager
+from weblauncher.pinyin import has_full_pinyin
+from weblauncher.snapshot import binary_path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SEED = 0
+REPEAT = 20        # 读操作重复次数，取中位数
+EDITS = 100        # 增删各执行次数
+REGRESSION = 1.2   # 比基线慢 20% 以上算回归
+NOISE_FLOOR = 0.05  # 基线低于该值（毫秒）的项目误差太大，不判断回归
+QUERIES = ["腾讯", "git", "txxw", "tengxun", "gihtub", "新闻5"]
+METRICS = ["load_ms", "first_page_ms", "materialize_ms", "filter_ms", "search_ms",
+           "add_ms", "delete_ms", "delta_load_ms", "jsonl_load_ms", "save_ms", "backup_ms",
+           "backup_kb", "peak_mb", "migrate_ms"]
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def median_ms(func, repeat=REPEAT):
+    return statistics.median(timed(func)[1] for _ in range(repeat))
+
+
+def peak_mb():
+    """进程的峰值常驻内存（MB），平台不支持时返回 None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位是 KB，macOS 是字节
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def core_manager(tmp, backend, **kwargs):
+    """只带要测量的服务（后台写入、按需解码、备份），不启动图标线程池，不读写常用度和链接缓存"""
+    return open_manager(tmp, backend, services=False, flush_interval=FLUSH_INTERVAL, paging=True,
+                        backups=BackupStore(os.path.join(tmp, "backups")), **kwargs)
+
+
+def run_size(size, backend):
+    """在当前进程中测量一个规模，返回 {指标: 数值}"""
+    result = {"sites": size}
+    with tempfile.TemporaryDirectory() as tmp:
+        SiteJournal(os.path.join(tmp, "custom_sites.json")).write_snapshot(
+            [Site.from_dict(site) for site in make_sites(size, SEED)])
+        if backend == "sqlite":
+            # 一次性迁移不计入启动时间
+            _, result["migrate_ms"] = timed(lambda: core_manager(tmp, backend).close())
+
+        # 启动：按偏移索引打开快照（或打开数据库），再取第一屏
+        manager, result["load_ms"] = timed(lambda: core_manager(tmp, backend))
+        _, result["first_page_ms"] = timed(lambda: manager.filter_sites("全部")[:40])
+        _, result["materialize_ms"] = timed(manager.materialize)
+
+        result["filter_ms"] = median_ms(lambda: manager.filter_sites("技术"))
+        result["search_ms"] = statistics.median(
+            median_ms(lambda: manager.search_website(query), REPEAT // 4) for query in QUERIES)
+
+        added = []
+        times = []
+        for i in range(EDITS):
+            site, ms = timed(lambda: manager.add_website(f"基准{i}", f"bench{i}.example.com", "技术"))
+            added.append(site["id"])
+            times.append(ms)
+        result["add_ms"] = statistics.median(times)
+        result["delete_ms"] = statistics.median(
+            timed(lambda: manager.delete_website(site_id))[1] for site_id in added)
+
+        if backend == "jsonl":
+            # 日志中有增量时的启动：二进制快照 + 增量，对比逐行解析校验 JSONL
+            manager.flush()
+            _, result["delta_load_ms"] = timed(
+                lambda: core_manager(tmp, backend, build_indexes=False))
+            os.remove(binary_path(manager.data_file))
+            _, result["jsonl_load_ms"] = timed(
+                lambda: core_manager(tmp, backend, build_indexes=False))
+
+        manager.journal.wait()
+        _, result["save_ms"] = timed(manager.save_websites)
+        manager.add_website("基准备份", "backup.example.com", "技术")
+        manifest, result["backup_ms"] = timed(manager.backup)
+        result["backup_kb"] = manifest["written"] / 1024
+        manager.close()
+    result["peak_mb"] = peak_mb()
+    return result
+
+
+def environment(backend):
+    """影响结果可比性的环境信息"""
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "machine": platform.machine(), "pypinyin": has_full_pinyin(), "seed": SEED,
+            "backend": backend}
+
+
+def measure(sizes, backend):
+    """每个规模启动一个子进程，避免前一个规模的内存峰值和缓存影响后一个"""
+    results = []
+    for size in sizes:
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", str(size),
+                                 backend], check=True, capture_output=True, text=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+
+def format_value(value):
+    return "-" if value is None else f"{value:.3f}"
+
+
+def report(results, baseline=None):
+    """打印结果表，有基线时逐项打印倍数，返回回归的项目"""
+    print("".join(f"{name:>15}" for name in ["sites"] + METRICS))
+    base = {r["sites"]: r for r in (baseline or {}).get("results", [])}
+    regressions = []
+    for r in results:
+        print(f"{r['sites']:>15}" + "".join(f"{format_value(r.get(name)):>15}" for name in METRICS))
+        old = base.get(r["sites"])
+        if old is None:
+            continue
+        cells = []
+        for name in METRICS:
+            if r.get(name) is None or not old.get(name):
+                cells.append(f"{'-':>15}")
+                continue
+            ratio = r[name] / old[name]
+            mark = ""
+            if ratio > REGRESSION and old[name] >= NOISE_FLOOR:
+                mark = "!"
+                regressions.append(f"{r['sites']} {name}")
+            cells.append(f"{f'x{ratio:.2f}{mark}':>15}")
+        print(f"{'vs 基线':>13}" + "".join(cells))
+    return regressions
+
+
+def main(argv):
+    if argv[:1] == ["--worker"]:
+        print(json.dumps(run_size(int(argv[1]), argv[2])))
+        return 0
+    sizes, save_to, compare_to, backend = [], None, None, "jsonl"
+    args = iter(argv)
+    for arg in args:
+        if arg == "--backend":
+            backend = next(args)
+        elif arg == "--json":
+            save_to = next(args)
+        elif arg == "--compare":
+            compare_to = next(args)
+        else:
+            sizes.append(int(arg))
+    sizes = sizes or [1000, 10000, 100000]
+
+    baseline = None
+    if compare_to:
+        with open(compare_to, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("environment") != environment(backend):
+            print(f"注意: 基线环境不同，结果仅供参考: {baseline.get('environment')}")
+
+    results = measure(sizes, backend)
+    regressions = report(results, baseline)
+    if regressions:
+        print("回归: " + ", ".join(regressions))
+
+    if save_to:
+        with open(save_to, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment(backend), "results": results}, f, indent=1)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
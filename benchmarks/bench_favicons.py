@@ -0,0 +1,100 @@
+# benchmarks/bench_favicons.py
+"""用本地桩服务器检查图标下载和磁盘 LRU 缓存
+
+用法: python benchmarks/bench_favicons.py [站点数量]
+
+桩服务器按 Host 区分站点：127.0.0.x 中 x 为奇数的站点提供 /favicon.ico，
+x 为偶数的只在首页 <link rel="icon"> 中给出图标地址，x 能被 5 整除的没有图标。
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weblauncher.favicons import FaviconCache, FaviconFetcher, scale_rgba
+
+PNG = (b"\x89PNG\r\n\x1a\n" + b"\x00" * 1000)  # 只需要文件头正确
+ICO = (b"\x00\x00\x01\x00" + b"\x00" * 2000)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        x = int(self.headers["Host"].split(":")[0].rsplit(".", 1)[1])
+        if x % 5 == 0:
+            body, code, kind = b"<html></html>", 404, "text/html"
+        elif self.path == "/favicon.ico" and x % 2 == 1:
+            body, code, kind = ICO, 200, "image/x-icon"
+        elif self.path == "/favicon.ico":
+            body, code, kind = b"not found", 404, "text/plain"
+        elif self.path == "/":
+            body, code, kind = b'<html><head><link rel="shortcut icon" href="/static/i.png"></head></html>', 200, "text/html"
+        elif self.path == "/static/i.png":
+            body, code, kind = PNG, 200, "image/png"
+        else:
+            body, code, kind = b"", 404, "text/plain"
+        self.send_response(code)
+        self.send_header("Content-Type", kind)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def fetch_all(cache, urls, workers):
+    """请求全部站点并等待下载完成，返回耗时"""
+    fetcher = FaviconFetcher(cache, workers=workers)
+    start = time.perf_counter()
+    pending = sum(1 for url in urls if fetcher.request(url) is None)
+    fetcher.shutdown(wait=True)
+    return time.perf_counter() - start, pending
+
+
+def main(count):
+    server = StubServer(("0.0.0.0", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_port
+    urls = [f"http://127.0.0.{x}:{port}/some/page" for x in range(1, count + 1)]
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for workers in (1, 4, 16):
+                cache = FaviconCache(os.path.join(tmp, f"w{workers}")).load()
+                elapsed, pending = fetch_all(cache, urls, workers)
+                icons = sum(1 for name, _, _ in cache.entries.values() if not name.endswith(".none"))
+                print(f"{workers:>2} 个线程: {pending} 个站点 {elapsed:.2f} s，"
+                      f"得到 {icons} 个图标，{len(cache.entries) - icons} 个没有图标")
+
+            # 命中：重新加载缓存后全部直接返回
+            cache = FaviconCache(os.path.join(tmp, "w4")).load()
+            fetcher = FaviconFetcher(cache)
+            hits = sum(1 for url in urls if fetcher.request(url) is not None)
+            fetcher.shutdown()
+            print(f"重新加载后命中 {hits} 个，缓存 {cache.total} 字节")
+
+            # LRU：上限只够放约 20 个图标
+            cache = FaviconCache(os.path.join(tmp, "small"), max_bytes=20 * len(ICO)).load()
+            fetch_all(cache, urls, 4)
+            print(f"上限 {cache.max_bytes} 字节: 保留 {len(cache.entries)} 个条目，共 {cache.total} 字节")
+    finally:
+        server.shutdown()
+
+    # 缩放：64x64 -> 32x32
+    pixels = bytes(range(256)) * 64
+    start = time.perf_counter()
+    for _ in range(1000):
+        scaled = scale_rgba(pixels, (64, 64), 32)
+    print(f"缩放 64x64 -> 32x32: {(time.perf_counter() - start):.3f} ms/个，{len(scaled)} 字节")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
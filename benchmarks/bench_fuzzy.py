@@ -0,0 +1,49 @@
+# benchmarks/bench_fuzzy.py
+"""拼音/模糊排序搜索的建索引和查询耗时
+
+用法: python benchmarks/bench_fuzzy.py [网站数量 ...]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import make_sites
+from weblauncher import FuzzyIndex, Site
+from weblauncher.pinyin import has_full_pinyin
+
+# (关键词, 说明)
+QUERIES = [
+    ("tengxun", "全拼前缀"),
+    ("txsp", "首字母"),
+    ("bl", "短前缀"),
+    ("bilbil", "子序列"),
+    ("githbu", "拼写错误"),
+    ("腾讯", "中文前缀"),
+    ("zzzzq", "无结果"),
+]
+
+
+def main(sizes):
+    if not has_full_pinyin():
+        print("未安装 pypinyin：只有首字母，没有全拼")
+    for size in sizes:
+        sites = [Site.from_dict(site) for site in make_sites(size)]
+        start = time.perf_counter()
+        index = FuzzyIndex(sites)
+        build_ms = (time.perf_counter() - start) * 1000
+        print(f"== {size} 个网站，建索引 {build_ms:.1f} ms")
+        print(f"{'关键词':<10}{'类型':<10}{'结果数':>8}{'查询 ms':>10}  前三个结果")
+        for query, kind in QUERIES:
+            best = float("inf")
+            for _ in range(5):
+                start = time.perf_counter()
+                found = index.search(query)
+                best = min(best, time.perf_counter() - start)
+            names = ", ".join(site["name"] for site in found[:3])
+            print(f"{query:<10}{kind:<10}{len(found):>8}{best * 1000:>10.3f}  {names}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000])
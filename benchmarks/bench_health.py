@@ -0,0 +1,104 @@
+# benchmarks/bench_health.py
+"""用本地桩服务器检查链接检查器的行为和吞吐量
+
+用法: python benchmarks/bench_health.py [链接数量]
+
+桩服务器的路径：/ok、/dead（404）、/nohead（HEAD 返回 405，GET 正常）、
+/redirect（302 到 /ok）、/loop（无限重定向）、/slow（超过超时才响应）。
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weblauncher.health import (ALIVE, BROKEN, UNREACHABLE, HealthCache, LinkChecker,
+                                check_links)
+
+EXPECTED = {"/ok": ALIVE, "/dead": BROKEN, "/nohead": ALIVE, "/redirect": ALIVE,
+            "/loop": BROKEN, "/slow": UNREACHABLE}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """按路径返回固定结果的 HTTP 桩"""
+    def _respond(self, body):
+        path = self.path.split("?")[0]
+        if path == "/dead":
+            self.send_response(404)
+        elif path == "/nohead" and self.command == "HEAD":
+            self.send_response(405)
+        elif path == "/redirect":
+            self.send_response(302)
+            self.send_header("Location", "/ok")
+        elif path == "/loop":
+            self.send_response(302)
+            self.send_header("Location", self.path)
+        elif path == "/slow":
+            time.sleep(1.5)
+            self.send_response(200)
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        if body:
+            self.wfile.write(b"ok")
+
+    def do_HEAD(self):
+        self._respond(False)
+
+    def do_GET(self):
+        self._respond(True)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def main(count):
+    server = StubServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    try:
+        # 行为：每种路径的结果
+        checker = LinkChecker(timeout=1.0, host_interval=0)
+        results = checker.run([base + path for path in EXPECTED])
+        for path, expected in EXPECTED.items():
+            status, code = results[base + path]
+            mark = "OK" if status == expected else "不符"
+            print(f"{path:<10}{status:<12}{code!s:<6}{mark}")
+
+        # 吞吐量：不同并发数下检查 count 个链接（桩服务器同一主机，不限速）
+        urls = [f"{base}/ok?i={i}" for i in range(count)]
+        for concurrency in (1, 8, 32):
+            checker = LinkChecker(concurrency=concurrency, host_interval=0)
+            start = time.perf_counter()
+            checker.run(urls)
+            elapsed = time.perf_counter() - start
+            print(f"并发 {concurrency:>2}: {count} 个链接 {elapsed:.2f} s，{count / elapsed:.0f} 个/秒")
+
+        # 同一主机限速：每 0.05 秒最多一个请求
+        checker = LinkChecker(concurrency=32, host_interval=0.05)
+        start = time.perf_counter()
+        checker.run(urls[:20])
+        print(f"限速 0.05 s/次: 20 个链接 {time.perf_counter() - start:.2f} s")
+
+        # 缓存：第二次只检查过期的链接
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = HealthCache(os.path.join(tmp, "link_health.json")).load()
+            checker = LinkChecker(host_interval=0)
+            first = check_links(urls[:100], cache, checker)
+            second = check_links(urls[:100] + urls[100:150], HealthCache(cache.path).load(), checker)
+            print(f"缓存: 第一次检查 {len(first)} 个，第二次只检查 {len(second)} 个")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,94 @@
+# benchmarks/bench_import.py
+"""书签导入吞吐量：生成合成导出文件，测量解析+校验，以及经 WebsiteManager 写入的耗时
+
+写入分为导入线程中的去重、备份和建立索引（prepare_import），
+界面线程中换上结果（finish_import），和写入日志文件（flush）。
+
+用法: python benchmarks/bench_import.py [书签数量]   （默认 1000000）
+"""
+import csv
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import make_sites
+from weblauncher import FLUSH_INTERVAL, BackupStore, BookmarkImporter, WebsiteManager
+from weblauncher.importer import ijson
+
+FOLDER_SIZE = 500  # 每个文件夹的书签数
+
+
+def write_html(path, sites):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("<!DOCTYPE NETSCAPE-Bookmark-file-1>\n<TITLE>Bookmarks</TITLE>\n<H1>Bookmarks</H1>\n<DL><p>\n")
+        f.write("<DT><H3>书签栏</H3>\n<DL><p>\n")
+        for start in range(0, len(sites), FOLDER_SIZE):
+            f.write(f"<DT><H3>{sites[start]['category']}</H3>\n<DL><p>\n")
+            for site in sites[start:start + FOLDER_SIZE]:
+                f.write(f'<DT><A HREF="{site["url"]}" ADD_DATE="1700000000">{site["name"]}</A>\n')
+            f.write("</DL><p>\n")
+        f.write("</DL><p>\n</DL><p>\n")
+
+
+def write_chrome_json(path, sites):
+    folders = []
+    for start in range(0, len(sites), FOLDER_SIZE):
+        children = [{"type": "url", "name": s["name"], "url": s["url"]}
+                    for s in sites[start:start + FOLDER_SIZE]]
+        folders.append({"children": children, "name": sites[start]["category"], "type": "folder"})
+    data = {"roots": {"bookmark_bar": {"children": folders, "name": "书签栏", "type": "folder"}}}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def write_csv(path, sites):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "url", "folder"])
+        for site in sites:
+            writer.writerow([site["name"], site["url"], site["category"]])
+
+
+def main(count):
+    sites = make_sites(count)
+    print("JSON 解析: " + ("ijson" if ijson is not None else "内置增量解析"))
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt, writer in (("html", write_html), ("json", write_chrome_json), ("csv", write_csv)):
+            path = os.path.join(tmp, f"bookmarks.{fmt}")
+            writer(path, sites)
+            size_mb = os.path.getsize(path) / 1024 / 1024
+
+            start = time.perf_counter()
+            records = BookmarkImporter().run(path)
+            parse_s = time.perf_counter() - start
+
+            data_dir = os.path.join(tmp, f"data_{fmt}")
+            # 与界面一样后台写入、导入前备份
+            manager = WebsiteManager(data_dir, flush_interval=FLUSH_INTERVAL,
+                                     backups=BackupStore(os.path.join(data_dir, "backups")))
+            start = time.perf_counter()
+            prepared = manager.prepare_import(records)
+            prepare_s = time.perf_counter() - start
+            start = time.perf_counter()
+            added = manager.finish_import(prepared)
+            finish_s = time.perf_counter() - start
+            start = time.perf_counter()
+            manager.flush()
+            flush_s = time.perf_counter() - start
+            manager.close()
+            del manager, prepared
+            gc.collect()  # 上一轮的网站和索引不留到下一轮的计时里回收
+
+            print(f"{fmt:<5} {size_mb:7.1f} MB  导入 {len(added)}/{count}  "
+                  f"解析+校验 {parse_s:6.2f} s ({count / parse_s:,.0f} 个/秒)  "
+                  f"后台整理 {prepare_s:5.2f} s  界面线程 {finish_s * 1000:6.1f} ms  "
+                  f"写入日志 {flush_s:5.2f} s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,44 @@
+# benchmarks/bench_memory.py
+"""网站记录内存占用：每个网站一个 dict vs __slots__ 的 Site
+
+用法: python benchmarks/bench_memory.py [网站数量 ...]
+"""
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import make_sites
+from weblauncher import Site
+
+
+def measure(build):
+    """返回构建结果常驻的内存（字节）和耗时（秒）"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current, elapsed
+
+
+def main(sizes):
+    print(f"{'网站数':>10}{'dict MB':>10}{'Site MB':>10}{'节省':>8}{'dict s':>9}{'Site s':>9}")
+    for size in sizes:
+        # 与 load_websites 相同：每行单独解析，分类和时间字符串各自独立
+        lines = [json.dumps(site, ensure_ascii=False) for site in make_sites(size)]
+        dict_bytes, dict_s = measure(lambda: [json.loads(line) for line in lines])
+        site_bytes, site_s = measure(lambda: [Site.from_dict(json.loads(line)) for line in lines])
+        print(f"{size:>10}{dict_bytes / 1e6:>10.1f}{site_bytes / 1e6:>10.1f}"
+              f"{1 - site_bytes / dict_bytes:>8.0%}{dict_s:>9.2f}{site_s:>9.2f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000])
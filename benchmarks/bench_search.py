@@ -0,0 +1,72 @@
+# benchmarks/bench_search.py
+"""对比逐条扫描与倒排索引的搜索耗时
+
+用法: python benchmarks/bench_search.py [网站数量 ...]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import make_sites
+from weblauncher import SearchIndex
+
+QUERIES = ["腾讯", "哔哩", "新闻日报", "git", "github", "cloud12", "store.io", "不存在的站"]
+TYPED = ["腾讯新闻", "github.com"]  # 模拟逐字输入
+
+
+def linear_scan(sites, keyword):
+    """原来的实现：每次查询都把所有名称和URL转成小写"""
+    keyword = keyword.lower()
+    return [s for s in sites
+            if keyword in s["name"].lower() or keyword in s["url"].lower()]
+
+
+def timed(func, repeat=5, setup=None):
+    """返回多次运行的最短耗时（毫秒）和结果"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main(sizes):
+    for size in sizes:
+        sites = make_sites(size)
+        start = time.perf_counter()
+        index = SearchIndex(sites)
+        build_ms = (time.perf_counter() - start) * 1000
+        print(f"== {size} 个网站，建索引 {build_ms:.1f} ms")
+        print(f"{'关键词':<12}{'结果数':>8}{'扫描 ms':>12}{'索引 ms':>12}")
+        for query in QUERIES:
+            scan_ms, expected = timed(lambda: linear_scan(sites, query))
+            index_ms, found = timed(lambda: index.search(query), setup=index.clear_last_result)
+            assert found == expected, query
+            print(f"{query:<12}{len(found):>8}{scan_ms:>12.3f}{index_ms:>12.3f}")
+
+        print(f"{'逐字输入':<12}{'每次索引 ms':>14}{'逐步缩小 ms':>14}")
+        for typed in TYPED:
+            prefixes = [typed[:i] for i in range(1, len(typed) + 1)]
+
+            def cold():
+                for prefix in prefixes:
+                    index.clear_last_result()
+                    index.search(prefix)
+
+            def incremental():
+                for prefix in prefixes:
+                    index.search(prefix)
+
+            cold_ms, _ = timed(cold)
+            incremental_ms, _ = timed(incremental, setup=index.clear_last_result)
+            print(f"{typed:<12}{cold_ms:>14.3f}{incremental_ms:>14.3f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000])
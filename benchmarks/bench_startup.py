@@ -0,0 +1,43 @@
+# benchmarks/bench_startup.py
+"""冷启动：完整解析快照 vs 通过偏移索引只解码第一页
+
+用法: python benchmarks/bench_startup.py [网站数量 ...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import make_sites
+from weblauncher import PAGE_SIZE, SiteJournal, is_valid_url
+
+
+def validate(site):
+    return isinstance(site.get("name"), str) and is_valid_url(site.get("url", ""))
+
+
+def main(sizes):
+    print(f"{'网站数':>10}{'完整加载 ms':>14}{'首屏 ms':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            data_file = os.path.join(tmp, f"custom_sites_{size}.json")
+            SiteJournal(data_file).write_snapshot(make_sites(size))
+
+            start = time.perf_counter()
+            SiteJournal(data_file).load(validate)
+            full_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            paged = SiteJournal(data_file).open_paged()
+            paged.category_counts()
+            paged.sites()[:PAGE_SIZE]
+            paged_ms = (time.perf_counter() - start) * 1000
+            paged.close()
+
+            print(f"{size:>10}{full_ms:>14.1f}{paged_ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,36 @@
+# benchmarks/corpus.py
+"""生成中英文混合的合成网站数据"""
+import random
+
+CJK_WORDS = ["网易", "腾讯", "百度", "阿里", "新闻", "视频", "音乐", "购物", "直播", "科技",
+             "云", "盘", "在线", "学堂", "日报", "商城", "地图", "翻译", "邮箱", "论坛",
+             "哔哩", "知乎", "豆瓣", "微博", "京东", "淘宝", "优酷", "芒果", "虎牙", "斗鱼"]
+ASCII_WORDS = ["git", "hub", "cloud", "news", "video", "music", "shop", "live", "tech", "mail",
+               "map", "docs", "dev", "stack", "code", "learn", "daily", "store", "box", "net"]
+CATEGORIES = ["我的", "社交", "购物", "视频", "音乐", "技术", "新闻", "工具", "教育", "直播", "其他"]
+TLDS = ["com", "cn", "net", "org", "com.cn", "io"]
+
+
+def make_site(i, rng):
+    """生成一个合成网站记录"""
+    if rng.random() < 0.6:
+        name = "".join(rng.choice(CJK_WORDS) for _ in range(rng.randint(1, 3)))
+    else:
+        name = " ".join(rng.choice(ASCII_WORDS).capitalize() for _ in range(rng.randint(1, 2)))
+    host = "".join(rng.choice(ASCII_WORDS) for _ in range(rng.randint(1, 3)))
+    url = f"https://www.{host}{i}.{rng.choice(TLDS)}"
+    if rng.random() < 0.3:
+        url += "/" + rng.choice(ASCII_WORDS)
+    return {
+        "id": f"bench_{i}",
+        "name": f"{name}{i % 97}",
+        "url": url,
+        "category": rng.choice(CATEGORIES),
+        "created_at": "2024-01-01 00:00:00",
+    }
+
+
+def make_sites(count, seed=0):
+    """生成 count 个合成网站，同一 seed 结果相同"""
+    rng = random.Random(seed)
+    return [make_site(i, rng) for i in range(count)]
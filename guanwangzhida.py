@@ -1,12 +1,110 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-import webbrowser
-import json
+from tkinter import ttk, messagebox, filedialog
+import itertools
+from collections import OrderedDict
 import os
-import re
 import sys
-import shutil
-from datetime import datetime
+import queue
+import threading
+import time
+
+from weblauncher import (ALIVE, FREQUENT_CATEGORY, METRICS_ENABLED, PAGE_SIZE, SEARCH_DEBOUNCE,
+                         BookmarkImporter, BrowserLauncher, Metrics, open_manager)
+
+POLL_MS = 250  # 检查后台线程的消息和其他窗口修改的间隔（毫秒）
+BATCH_CONFIRM = 10  # 批量打开超过这么多网站时先确认
+METRICS_REFRESH_MS = 500  # 性能面板刷新间隔（毫秒）
+LAG_PROBE_MS = 100  # 性能面板打开时每隔这么久测一次事件循环的延迟
+POOL_PAGES = 3  # 隐藏的按钮最多保留这么多页，更早隐藏的销毁
+# 不触发输入联想的按键（在联想列表中移动、选择和关闭）
+COMPLETION_KEYS = {"Up", "Down", "Return", "Escape", "Tab"}
+
+class ButtonPool:
+    """按网站ID复用的按钮池
+
+    每次刷新时与屏幕上的按钮对比：已有的按钮只在文字或位置变化时
+    更新，不再显示的按钮 grid_remove 隐藏以备复用；隐藏的按钮按最近
+    隐藏的顺序最多保留 capacity 个，超出的销毁。
+    """
+    def __init__(self, master, on_click, on_context_menu, cols=4, label=None,
+                 capacity=POOL_PAGES * PAGE_SIZE):
+        self.master = master
+        self.cols = cols  # 每行显示的按钮数
+        self.on_click = on_click
+        self.on_context_menu = on_context_menu
+        self.label = label or (lambda site: site["name"])  # 网站 -> 按钮文字
+        self.widgets = {}    # 网站ID -> (框架, 按钮)
+        self.sites = {}      # 网站ID -> 按钮当前对应的网站
+        self.texts = {}      # 网站ID -> 按钮当前的文字
+        self.positions = {}  # 网站ID -> (行, 列)，只包含显示中的按钮
+        self.hidden = OrderedDict()  # 隐藏中的按钮的网站ID，最早隐藏的在前
+        self.capacity = capacity
+        self.empty_label = ttk.Label(master, font=("Helvetica", 12), foreground="#999")
+        
+        # 配置网格列权重
+        for col in range(cols):
+            master.grid_columnconfigure(col, weight=1)
+    
+    def _create(self, site_id, site):
+        """创建一个按钮（每个网站只绑定一次事件）"""
+        btn_frame = ttk.Frame(self.master, padding=5)
+        btn = ttk.Button(btn_frame, text=self.label(site),
+                         command=lambda sid=site_id: self.on_click(self.sites[sid]),
+                         width=15)
+        btn.pack(fill=tk.BOTH, expand=True)
+        
+        # 添加右键菜单
+        btn.bind("<Button-3>", lambda e, sid=site_id: self.on_context_menu(e, sid))
+        self.widgets[site_id] = (btn_frame, btn)
+        return btn_frame, btn
+    
+    def render(self, sites, empty_text):
+        """显示新的网站列表，只改动与当前屏幕不同的部分"""
+        positions = {}
+        for i, site in enumerate(sites):
+            site_id = site["id"]
+            position = divmod(i, self.cols)
+            self.hidden.pop(site_id, None)
+            text = self.label(site)
+            widgets = self.widgets.get(site_id)
+            if widgets is None:
+                btn_frame, btn = self._create(site_id, site)
+            else:
+                btn_frame, btn = widgets
+                if self.texts[site_id] != text:
+                    btn.config(text=text)
+            self.sites[site_id] = site
+            self.texts[site_id] = text
+            
+            if self.positions.get(site_id) != position:
+                btn_frame.grid(row=position[0], column=position[1], padx=5, pady=5, sticky="nsew")
+            positions[site_id] = position
+        
+        # 隐藏不再显示的按钮，超出容量时销毁最早隐藏的
+        for site_id in self.positions:
+            if site_id not in positions:
+                self.widgets[site_id][0].grid_remove()
+                self.hidden[site_id] = None
+        self.positions = positions
+        while len(self.hidden) > self.capacity:
+            self.discard(next(iter(self.hidden)))
+        
+        # 如果没有网站，显示提示
+        if sites:
+            self.empty_label.grid_remove()
+        else:
+            self.empty_label.config(text=empty_text)
+            self.empty_label.grid(row=0, column=0, columnspan=self.cols, pady=20)
+    
+    def discard(self, site_id):
+        """网站被删除后销毁对应按钮"""
+        widgets = self.widgets.pop(site_id, None)
+        if widgets is not None:
+            widgets[0].destroy()
+        self.sites.pop(site_id, None)
+        self.texts.pop(site_id, None)
+        self.positions.pop(site_id, None)
+        self.hidden.pop(site_id, None)
 
 class WebLauncherApp:
     def __init__(self, root):
@@ -16,41 +114,54 @@ class WebLauncherApp:
         self.root.configure(bg="#f0f0f0")
         self.root.minsize(800, 600)  # 设置最小窗口尺寸
         
-        # 跨平台数据文件路径
-        app_data_path = os.path.join(os.path.expanduser("~"), ".weblauncher")
-        self.data_file = os.path.join(app_data_path, "custom_sites.json")
-        os.makedirs(app_data_path, exist_ok=True)
-        
-        # 检查旧路径并迁移数据
-        self.migrate_old_data()
-        
-        # 加载网站数据
-        self.websites = self.load_websites()
-        self.current_filter = "全部"
+        # 网站数据（与 Kivy 版共用）。修改由后台线程写入，写入失败的消息
+        # 经队列交给界面线程弹窗提示
+        self._error_queue = queue.Queue()
+        self.manager = open_manager(build_indexes=False, on_error=self._error_queue.put)
+        # 搜索、URL 和联想索引在后台线程建立，建好后经队列交给界面线程挂上
+        self._index_queue = queue.Queue()
+        # 浏览器在后台线程中启动，结果也经队列交给界面线程
+        self.launcher = BrowserLauncher()
+        self._launch_queue = queue.Queue()
+        self._launch_batch = None
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self._check_queue = None
+        
+        # 性能统计：关闭时不装计时包装（F12 或"性能统计"按钮切换）
+        self.metrics = Metrics()
+        self.metrics.watch(self, ["populate_buttons", "search_website", "filter_sites"])
+        self.metrics.watch(self.manager, ["save_websites"])
+        self.metrics.counters["sites"] = lambda: len(self.manager.websites)
+        self.metrics.counters["buttons"] = lambda: len(self.button_pool.widgets)
+        self._metrics_window = None
+        self._metrics_jobs = []
+        self.root.bind("<F12>", lambda event: self.toggle_metrics())
         
         # 创建界面组件
         self.create_widgets()
+        
+        # 其他窗口（进程）保存修改时由监视线程置位，界面线程定时检查后合并
+        self._external_change = threading.Event()
+        self.manager.start_watching(self._external_change.set)
+        self.root.after(POLL_MS, self._poll_background)
+        self.build_indexes_in_background()
+        if METRICS_ENABLED:
+            self.toggle_metrics()
     
-    def migrate_old_data(self):
-        """迁移旧版本数据"""
-        # macOS 旧路径
-        old_mac_path = os.path.join(os.path.expanduser("~"), "Library", "Application Support", "WebLauncher", "custom_sites.json")
-        
-        # Windows 旧路径
-        old_win_path = os.path.join(os.getenv('APPDATA'), "WebLauncher", "custom_sites.json")
-        
-        # Linux 旧路径
-        old_linux_path = os.path.join(os.path.expanduser("~"), ".config", "WebLauncher", "custom_sites.json")
-        
-        old_paths = [old_mac_path, old_win_path, old_linux_path]
-        
-        for old_path in old_paths:
-            if os.path.exists(old_path) and not os.path.exists(self.data_file):
-                try:
-                    shutil.copy2(old_path, self.data_file)
-                    print(f"迁移旧数据: {old_path} -> {self.data_file}")
-                except Exception as e:
-                    print(f"数据迁移失败: {str(e)}")
+    def build_indexes_in_background(self):
+        """在后台线程建立索引，由 _poll_background 在界面线程挂上"""
+        manager = self.manager
+        
+        def worker():
+            try:
+                built = manager.build_search_indexes()
+            except Exception as e:
+                # 搜索时会在界面线程中重建
+                print(f"建立搜索索引失败: {str(e)}")
+                built = None
+            self._index_queue.put(built)
+        
+        threading.Thread(target=worker, name="index-build", daemon=True).start()
     
     def create_widgets(self):
         # 主框架 - 使用PanedWindow实现可调整大小的区域
@@ -77,10 +188,13 @@ class WebLauncherApp:
         search_frame = ttk.Frame(left_frame)
         search_frame.pack(fill=tk.X, pady=(0, 10))
         ttk.Label(search_frame, text="搜索网站:").pack(side=tk.LEFT)
-        self.search_entry = ttk.Entry(search_frame, width=30)
+        self.search_var = tk.StringVar()
+        self.search_entry = ttk.Entry(search_frame, width=30, textvariable=self.search_var)
         self.search_entry.pack(side=tk.LEFT, padx=5)
+        self._search_job = None
+        self.search_var.trace_add("write", lambda *args: self.schedule_search())
         ttk.Button(search_frame, text="搜索", 
-                  command=self.search_website).pack(side=tk.LEFT)
+                  command=lambda: self.search_website()).pack(side=tk.LEFT)
         ttk.Button(search_frame, text="重置", 
                   command=self.reset_search).pack(side=tk.LEFT, padx=5)
         
@@ -88,14 +202,6 @@ class WebLauncherApp:
         nav_frame = ttk.LabelFrame(left_frame, text="分类导航", padding=10)
         nav_frame.pack(fill=tk.X, pady=(0, 10))
         
-        # 获取所有存在的分类（包括默认和用户添加的）
-        all_categories = set()  # 不再默认包含"全部"
-        for site in self.websites:
-            all_categories.add(site["category"])
-        
-        # 按字母顺序排序
-        sorted_categories = sorted(all_categories)
-        
         # 创建水平滚动条和Canvas
         nav_scroll_frame = ttk.Frame(nav_frame)
         nav_scroll_frame.pack(fill=tk.X, expand=True)
@@ -108,42 +214,21 @@ class WebLauncherApp:
         nav_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
         
         # 创建按钮容器框架
-        nav_buttons_frame = ttk.Frame(nav_canvas)
-        nav_canvas.create_window((0, 0), window=nav_buttons_frame, anchor="nw")
+        self.nav_buttons_frame = ttk.Frame(nav_canvas)
+        nav_canvas.create_window((0, 0), window=self.nav_buttons_frame, anchor="nw")
         
         # 配置Canvas的滚动区域
         def on_frame_configure(event):
             nav_canvas.configure(scrollregion=nav_canvas.bbox("all"))
         
-        nav_buttons_frame.bind("<Configure>", on_frame_configure)
+        self.nav_buttons_frame.bind("<Configure>", on_frame_configure)
         
         # 创建自定义按钮样式
         self.style = ttk.Style()
         self.style.configure("Red.TButton", foreground="red")
         
-        self.nav_buttons = []
-        # 首先创建"我的"按钮（红色）
-        btn_my = ttk.Button(nav_buttons_frame, text="我的",
-                           command=lambda c="我的": self.filter_sites(c),
-                           width=10, padding=4, style="Red.TButton")
-        btn_my.pack(side=tk.LEFT, padx=4, pady=2)
-        self.nav_buttons.append(btn_my)
-        
-        # 然后创建"全部"按钮
-        btn_all = ttk.Button(nav_buttons_frame, text="全部",
-                           command=lambda c="全部": self.filter_sites(c),
-                           width=10, padding=4)
-        btn_all.pack(side=tk.LEFT, padx=4, pady=2)
-        self.nav_buttons.append(btn_all)
-        
-        # 最后按字母顺序创建其他分类按钮
-        for cat in sorted_categories:
-            if cat not in ["我的", "全部"]:  # 跳过已经添加的分类
-                btn = ttk.Button(nav_buttons_frame, text=cat,
-                               command=lambda c=cat: self.filter_sites(c),
-                               width=10, padding=4)
-                btn.pack(side=tk.LEFT, padx=4, pady=2)
-                self.nav_buttons.append(btn)
+        self.nav_buttons = {}
+        self.create_category_buttons()
         
         # 按钮展示区
         sites_frame = ttk.LabelFrame(left_frame, text="网站列表", padding=10)
@@ -154,7 +239,7 @@ class WebLauncherApp:
         self.scrollbar = ttk.Scrollbar(sites_frame, orient=tk.VERTICAL, command=self.canvas.yview)
         self.scroll_frame = ttk.Frame(self.canvas)
         
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.canvas.configure(yscrollcommand=self._on_canvas_scroll)
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
@@ -163,6 +248,14 @@ class WebLauncherApp:
             lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
         )
         self.canvas.create_window((0, 0), window=self.scroll_frame, anchor="nw")
+        self.shown_sites = []  # 当前筛选/搜索结果，按页显示
+        self.shown_count = 0
+        self.empty_text = ""
+        self._more_pending = False
+        self.button_pool = ButtonPool(self.scroll_frame,
+                                      on_click=self.open_website,
+                                      on_context_menu=self.show_context_menu,
+                                      label=self.site_label)
         
         # 添加网站面板（右侧面板）
         self.input_frame = ttk.LabelFrame(right_frame, text="添加新网站", padding=15)
@@ -181,6 +274,35 @@ class WebLauncherApp:
         self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
         self.canvas.bind("<Configure>", self._on_canvas_configure)
         
+    def create_category_buttons(self):
+        """按分类索引创建导航按钮："常用"、"我的"（红色）、"全部"，然后是其他分类"""
+        for btn in self.nav_buttons.values():
+            btn.destroy()
+        self.nav_buttons = {}
+        
+        for cat, count in self.manager.get_category_counts():
+            style = "Red.TButton" if cat == "我的" else "TButton"
+            btn = ttk.Button(self.nav_buttons_frame, text=f"{cat} ({count})",
+                           command=lambda c=cat: self.filter_sites(c),
+                           width=10, padding=4, style=style)
+            btn.pack(side=tk.LEFT, padx=4, pady=2)
+            self.nav_buttons[cat] = btn
+    
+    def category_label(self, category):
+        """分类按钮文字（带数量）"""
+        counts = dict(self.manager.get_category_counts())
+        return f"{category} ({counts.get(category, 0)})"
+    
+    def refresh_categories(self):
+        """增删网站后刷新分类数量，分类本身有增减时才重建按钮"""
+        counts = self.manager.get_category_counts()
+        if [cat for cat, _ in counts] != list(self.nav_buttons):
+            self.create_category_buttons()
+            self.category_menu.set_menu(self.category.get(), *self.manager.get_category_choices())
+            return
+        for cat, count in counts:
+            self.nav_buttons[cat].config(text=f"{cat} ({count})")
+    
     def _on_mousewheel(self, event):
         """支持鼠标滚轮滚动"""
         if sys.platform == "darwin":
@@ -188,6 +310,14 @@ class WebLauncherApp:
         else:
             self.canvas.yview_scroll(-1 * (event.delta // 120), "units")
     
+    def _on_canvas_scroll(self, first, last):
+        """滚动条同步；滚动到接近底部时显示下一页"""
+        self.scrollbar.set(first, last)
+        if (float(last) > 0.9 and self.shown_count < len(self.shown_sites)
+                and not self._more_pending):
+            self._more_pending = True
+            self.root.after_idle(self.show_more)
+    
     def _on_canvas_configure(self, event):
         """调整滚动区域宽度"""
         self.canvas.itemconfig("all", width=event.width)
@@ -208,20 +338,10 @@ class WebLauncherApp:
         ttk.Label(self.input_frame, text="分类:").grid(row=2, column=0, padx=5, pady=5, sticky=tk.W)
         self.category = tk.StringVar(value="其他")
         
-        # 获取所有存在的分类（去除"全部"）
-        all_categories = set()
-        for site in self.websites:
-            all_categories.add(site["category"])
-        
-        # 按字母顺序排序
-        sorted_categories = sorted(all_categories)
-        
-        # 添加默认选项（如果不存在）
-        if "其他" not in sorted_categories:
-            sorted_categories.append("其他")
-        
-        category_menu = ttk.OptionMenu(self.input_frame, self.category, "其他", *sorted_categories)
-        category_menu.grid(row=2, column=1, padx=5, pady=5, sticky=tk.W)
+        # 默认分类加上数据中出现的分类（去除"全部"）
+        self.category_menu = ttk.OptionMenu(self.input_frame, self.category, "其他",
+                                            *self.manager.get_category_choices())
+        self.category_menu.grid(row=2, column=1, padx=5, pady=5, sticky=tk.W)
         
         # 添加按钮
         add_btn_frame = ttk.Frame(self.input_frame)
@@ -229,102 +349,37 @@ class WebLauncherApp:
         add_btn = ttk.Button(add_btn_frame, text="添加网站", 
                            command=self.add_website, width=20)
         add_btn.pack()
+        import_btn = ttk.Button(add_btn_frame, text="导入书签",
+                              command=self.import_bookmarks, width=20)
+        import_btn.pack(pady=(5, 0))
+        check_btn = ttk.Button(add_btn_frame, text="检查链接",
+                             command=self.check_links, width=20)
+        check_btn.pack(pady=(5, 0))
+        merge_btn = ttk.Button(add_btn_frame, text="合并重复",
+                             command=self.merge_duplicates, width=20)
+        merge_btn.pack(pady=(5, 0))
+        undo_btn = ttk.Button(add_btn_frame, text="撤销",
+                            command=self.undo_changes, width=20)
+        undo_btn.pack(pady=(5, 0))
+        open_all_btn = ttk.Button(add_btn_frame, text="打开本分类全部",
+                                command=self.open_all_in_category, width=20)
+        open_all_btn.pack(pady=(5, 0))
+        metrics_btn = ttk.Button(add_btn_frame, text="性能统计",
+                               command=self.toggle_metrics, width=20)
+        metrics_btn.pack(pady=(5, 0))
+        
+        # 名称/URL 输入联想：列表浮在正在输入的输入框下方
+        self.completion_list = tk.Listbox(self.input_frame, height=1, activestyle="dotbox")
+        self.completion_list.bind("<ButtonRelease-1>", lambda e: self.choose_completion())
+        self.completion_list.bind("<Return>", lambda e: self.choose_completion())
+        self.completion_list.bind("<Escape>", lambda e: self.hide_completions())
+        self._completion_field = None
+        self._suggested_category = None
+        for field, entry in (("name", self.name_entry), ("url", self.url_entry)):
+            entry.bind("<KeyRelease>", lambda e, field=field: self.on_completion_key(e, field))
+            entry.bind("<Down>", lambda e: self.focus_completions())
+            entry.bind("<FocusOut>", lambda e: self.root.after(150, self._hide_if_unfocused))
         
-    def load_websites(self):
-        """加载已保存的网站数据"""
-        # 扩展的默认网站列表
-        default_sites = [
-            # 社交
-            {"id": "social_1", "name": "微博", "url": "https://weibo.com", "category": "社交"},
-            {"id": "social_2", "name": "微信", "url": "https://wx.qq.com", "category": "社交"},
-            {"id": "social_3", "name": "QQ", "url": "https://im.qq.com", "category": "社交"},
-            {"id": "social_4", "name": "知乎", "url": "https://www.zhihu.com", "category": "社交"},
-            {"id": "social_5", "name": "豆瓣", "url": "https://www.douban.com", "category": "社交"},
-            
-            # 工具
-            {"id": "tools_1", "name": "GitHub", "url": "https://github.com", "category": "工具"},
-            {"id": "tools_2", "name": "百度网盘", "url": "https://pan.baidu.com", "category": "工具"},
-            {"id": "tools_3", "name": "阿里云", "url": "https://www.aliyun.com", "category": "工具"},
-            {"id": "tools_4", "name": "CSDN", "url": "https://www.csdn.net", "category": "工具"},
-            {"id": "tools_5", "name": "Stack Overflow", "url": "https://stackoverflow.com", "category": "工具"},
-            
-            # 购物
-            {"id": "shopping_1", "name": "淘宝", "url": "https://www.taobao.com", "category": "购物"},
-            {"id": "shopping_2", "name": "京东", "url": "https://www.jd.com", "category": "购物"},
-            {"id": "shopping_3", "name": "拼多多", "url": "https://www.pinduoduo.com", "category": "购物"},
-            {"id": "shopping_4", "name": "唯品会", "url": "https://www.vip.com", "category": "购物"},
-            {"id": "shopping_5", "name": "网易严选", "url": "https://you.163.com", "category": "购物"},
-            
-            # 新闻
-            {"id": "news_1", "name": "新浪新闻", "url": "https://news.sina.com.cn", "category": "新闻"},
-            {"id": "news_2", "name": "腾讯新闻", "url": "https://news.qq.com", "category": "新闻"},
-            {"id": "news_3", "name": "人民日报", "url": "https://www.people.com.cn", "category": "新闻"},
-            {"id": "news_4", "name": "36氪氪", "url": "https://36kr.com", "category": "新闻"},
-            {"id": "news_5", "name": "虎嗅", "url": "https://www.huxiu.com", "category": "新闻"},
-            
-            # 视频
-            {"id": "video_1", "name": "哔哔哩哔哔哩", "url": "https://www.bilibili.com", "category": "视频"},
-            {"id": "video_2", "name": "腾讯视频", "url": "https://v.qq.com", "category": "视频"},
-            {"id": "video_3", "name": "爱奇艺", "url": "https://www.iqiyi.com", "category": "视频"},
-            {"id": "video_4", "name": "优酷", "url": "https://www.youku.com", "category": "视频"},
-            {"id": "video_5", "name": "芒果TV", "url": "https://www.mgtv.com", "category": "视频"},
-            
-            # 其他
-            {"id": "other_1", "name": "知乎日报", "url": "https://daily.zhihu.com", "category": "其他"},
-            {"id": "other_2", "name": "中国大学MOOC", "url": "https://www.icourse163.org", "category": "其他"},
-            {"id": "other_3", "name": "W3School", "url": "https://www.w3school.com.cn", "category": "其他"},
-            {"id": "other_4", "name": "LeetCode", "url": "https://leetcode.cn", "category": "其他"},
-            {"id": "other_5", "name": "斗鱼直播", "url": "https://www.douyu.com", "category": "其他"},
-            {"id": "other_6", "name": "虎牙直播", "url": "https://www.huya.com", "category": "其他"},
-        ]
-        
-        if not os.path.exists(self.data_file):
-            # 创建默认数据文件
-            try:
-                with open(self.data_file, "w", encoding="utf-8") as f:
-                    for site in default_sites:
-                        f.write(json.dumps(site, ensure_ascii=False) + "\n")
-                return default_sites
-            except Exception as e:
-                messagebox.showerror("错误", f"创建默认数据失败: {str(e)}")
-                return default_sites[:1]  # 返回至少一个网站
-        
-        sites = []
-        try:
-            with open(self.data_file, "r", encoding="utf-8") as f:
-                for line in f:
-                    try:
-                        site = json.loads(line)
-                        if self.validate_site(site):
-                            sites.append(site)
-                    except json.JSONDecodeError:
-                        continue
-        except Exception as e:
-            messagebox.showerror("错误", f"加载数据失败: {str(e)}")
-            return default_sites
-        
-        # 如果文件存在但为空，添加默认网站
-        if not sites:
-            return default_sites
-        
-        return sites
-    
-    def validate_site(self, site):
-        """验证网站数据有效性"""
-        return ("name" in site and "url" in site and 
-                isinstance(site["name"], str) and 
-                isinstance(site["url"], str) and
-                self.is_valid_url(site["url"]))
-    
-    def is_valid_url(self, url):
-        """增强型URL验证（更宽松）"""
-        regex = re.compile(
-            r'^(https?://)?'  # 协议可选
-            r'([A-Za-z0-9-]+\.)+[A-Za-z]{2,}'  # 域名部分
-            r'(:\d+)?'  # 端口
-            r'(/[/\w\.-]*)*$', re.IGNORECASE)
-        return re.match(regex, url) is not None
-    
     def add_website(self):
         """添加新网站"""
         name = self.name_entry.get().strip()
@@ -335,80 +390,283 @@ class WebLauncherApp:
             messagebox.showerror("错误", "名称和URL不能为空！")
             return
         
-        # 确保URL以http://或https://开头
-        if not url.startswith(("http://", "https://")):
-            url = "https://" + url
-            
-        if not self.is_valid_url(url):
-            messagebox.showerror("错误", "URL格式无效！")
+        # 补全 http(s):// 并校验URL，保存数据
+        try:
+            self.manager.add_website(name, url, category)
+        except ValueError as e:
+            messagebox.showerror("错误", f"{e}！")
             return
         
-        # 生成唯一ID
-        site_id = f"{category}_{len(self.websites)+1}"
-        new_site = {
-            "id": site_id,
-            "name": name,
-            "url": url,
-            "category": category,
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        
-        # 保存数据
-        self.websites.append(new_site)
-        self.save_websites()
-        
         # 重新生成按钮
         self.populate_buttons()
+        self.refresh_categories()
         
         # 清空输入
         self.name_entry.delete(0, tk.END)
         self.url_entry.delete(0, tk.END)
+        self._suggested_category = None
         self.update_status(f"已添加网站: {name}")
         
-    def populate_buttons(self):
-        """刷新按钮显示 - 使用网格布局"""
-        # 清空现有按钮
-        for widget in self.scroll_frame.winfo_children():
-            widget.destroy()
+    def completion_entry(self, field):
+        return self.name_entry if field == "name" else self.url_entry
+        
+    def on_completion_key(self, event, field):
+        """输入框内容变化后刷新联想列表"""
+        if event.keysym == "Escape":
+            self.hide_completions()
+        elif event.keysym not in COMPLETION_KEYS:
+            self.show_completions(field)
+        
+    def show_completions(self, field):
+        """名称/URL 输入框的联想：前缀树中常用度最高的几个补全"""
+        text = self.completion_entry(field).get().strip()
+        if field == "url":
+            completions = self.manager.complete_url(text)
+            self.apply_category_suggestion(text)
+        else:
+            completions = self.manager.complete_name(text)
+        completions = [c for c in completions if c != text]
+        if not completions:
+            self.hide_completions()
+            return
+        self.completion_list.delete(0, tk.END)
+        self.completion_list.insert(tk.END, *completions)
+        self.completion_list.config(height=len(completions))
+        self.completion_list.place(in_=self.completion_entry(field), x=0, rely=1.0, relwidth=1.0)
+        self.completion_list.lift()
+        self._completion_field = field
+        
+    def focus_completions(self):
+        """方向键下：进入联想列表"""
+        if self._completion_field is not None:
+            self.completion_list.focus_set()
+            self.completion_list.selection_clear(0, tk.END)
+            self.completion_list.selection_set(0)
+            self.completion_list.activate(0)
+        
+    def choose_completion(self):
+        """选中一个补全，URL 同时按主机名推荐分类"""
+        selection = self.completion_list.curselection()
+        field = self._completion_field
+        if not selection or field is None:
+            return
+        text = self.completion_list.get(selection[0])
+        entry = self.completion_entry(field)
+        entry.delete(0, tk.END)
+        entry.insert(0, text)
+        entry.focus_set()
+        self.hide_completions()
+        if field == "url":
+            self.apply_category_suggestion(text)
+        
+    def hide_completions(self):
+        self.completion_list.place_forget()
+        self._completion_field = None
+        
+    def _hide_if_unfocused(self):
+        field = self._completion_field
+        if field is None:
+            return
+        focus = self.root.focus_get()
+        if focus is not self.completion_list and focus is not self.completion_entry(field):
+            self.hide_completions()
         
-        # 按分类过滤
-        filtered = self.websites
-        if self.current_filter != "全部":
-            filtered = [s for s in self.websites if s["category"] == self.current_filter]
+    def apply_category_suggestion(self, url):
+        """分类还是默认值或上次推荐的值时，换成按主机名推荐的分类"""
+        if self.category.get() not in ("其他", self._suggested_category):
+            return
+        category = self.manager.suggest_category(url) if url else None
+        if category is not None:
+            self.category.set(category)
+            self._suggested_category = category
+        
+    def import_bookmarks(self):
+        """选择书签文件并在后台线程导入，进度显示在状态栏"""
+        path = filedialog.askopenfilename(
+            title="导入书签",
+            filetypes=[("书签文件", "*.html *.htm *.json *.csv"), ("所有文件", "*.*")])
+        if not path:
+            return
         
-        # 如果没有网站，显示提示
-        if not filtered:
-            ttk.Label(self.scroll_frame, text="没有找到网站", 
-                     font=("Helvetica", 12), 
-                     foreground="#999").pack(pady=20)
-            self.update_status(f"显示 {len(filtered)} 个网站")
+        # tkinter 不是线程安全的：后台线程只往队列里放消息，由界面线程轮询
+        self._import_queue = queue.Queue()
+        
+        def progress(read, valid, rejected, fraction):
+            message = f"正在导入: {fraction:.0%}，已读取 {read} 个，有效 {valid} 个，无效 {rejected} 个"
+            self._import_queue.put(("progress", message))
+        
+        def worker():
+            try:
+                records = BookmarkImporter(progress=progress).run(path)
+                self._import_queue.put(("progress", f"正在整理导入的 {len(records)} 个网站"))
+                # 去重、备份和建立索引也在后台线程做，界面线程只换上结果
+                self._import_queue.put(("done", (records, self.manager.prepare_import(records))))
+            except Exception as e:
+                self._import_queue.put(("error", str(e)))
+        
+        self.update_status(f"正在导入: {os.path.basename(path)}")
+        threading.Thread(target=worker, name="bookmark-import", daemon=True).start()
+        self.root.after(100, self._poll_import)
+        
+    def _poll_import(self):
+        """处理导入线程发来的进度和结果"""
+        try:
+            while True:
+                kind, value = self._import_queue.get_nowait()
+                if kind == "progress":
+                    self.update_status(value)
+                elif kind == "error":
+                    messagebox.showerror("错误", f"导入书签失败: {value}")
+                    return
+                else:
+                    self.finish_import(*value)
+                    return
+        except queue.Empty:
+            self.root.after(100, self._poll_import)
+        
+    def finish_import(self, records, prepared):
+        """一次性写入后台线程准备好的网站"""
+        new_sites = self.manager.finish_import(prepared)
+        self.populate_buttons()
+        self.refresh_categories()
+        skipped = len(records) - len(new_sites)
+        self.update_status(f"已导入 {len(new_sites)} 个网站，跳过 {skipped} 个重复网站")
+        self.build_indexes_in_background()
+        
+    def merge_duplicates(self):
+        """删除重复添加的网站（URL 规范化后相同）"""
+        removed = self.manager.merge_duplicates()
+        for site in removed:
+            self.button_pool.discard(site["id"])
+        if removed:
+            self.populate_buttons()
+            self.refresh_categories()
+        self.update_status(f"删除了 {len(removed)} 个重复网站")
+        
+    def undo_changes(self):
+        """撤销最近的一次修改（本次运行中没有修改时退回上一个备份版本）"""
+        if not messagebox.askyesno("确认", "撤销最近的一次修改？"):
+            return
+        try:
+            message = self.manager.undo()
+        except ValueError as e:
+            self.update_status(str(e))
+            return
+        except Exception as e:
+            messagebox.showerror("错误", f"撤销失败: {str(e)}")
+            return
+        self.build_indexes_in_background()
+        self.populate_buttons()
+        self.refresh_categories()
+        self.update_status(message)
+        
+    def check_links(self):
+        """在后台线程检查链接，完成后刷新按钮上的失效标记"""
+        if self._check_queue is not None:
             return
+        urls = self.manager.all_urls()
+        self._check_queue = queue.Queue()
         
-        # 使用网格布局排列按钮
-        cols = 4  # 每行显示4个按钮
-        for i, site in enumerate(filtered):
-            row, col = divmod(i, cols)
-            
-            # 创建按钮框架
-            btn_frame = ttk.Frame(self.scroll_frame, padding=5)
-            btn_frame.grid(row=row, column=col, padx=5, pady=5, sticky="nsew")
-            
-            # 创建按钮
-            btn = ttk.Button(btn_frame, text=site["name"], 
-                           command=lambda u=site["url"]: webbrowser.open(u),
-                           width=15)
-            btn.pack(fill=tk.BOTH, expand=True)
-            
-            # 添加右键菜单
-            btn.bind("<Button-3>", lambda e, sid=site["id"]: self.show_context_menu(e, sid))
-            
-            # 配置网格列权重
-            if col == 0:
-                self.scroll_frame.grid_rowconfigure(row, weight=0)
-            self.scroll_frame.grid_columnconfigure(col, weight=1)
+        def progress(done, total):
+            self._check_queue.put(("progress", f"正在检查链接: {done}/{total}"))
+        
+        def worker():
+            try:
+                results = self.manager.check_links(urls, progress)
+                self._check_queue.put(("done", results))
+            except Exception as e:
+                self._check_queue.put(("error", str(e)))
         
+        self.update_status("正在检查链接...")
+        threading.Thread(target=worker, name="link-check", daemon=True).start()
+        self.root.after(100, self._poll_check_links)
+        
+    def _poll_check_links(self):
+        """处理检查线程发来的进度和结果"""
+        try:
+            while True:
+                kind, value = self._check_queue.get_nowait()
+                if kind == "progress":
+                    self.update_status(value)
+                    continue
+                self._check_queue = None
+                if kind == "error":
+                    messagebox.showerror("错误", f"检查链接失败: {value}")
+                else:
+                    self.button_pool.render(self.shown_sites[:self.shown_count], self.empty_text)
+                    broken = sum(1 for status, _ in value.values() if status != ALIVE)
+                    self.update_status(f"检查了 {len(value)} 个链接，{broken} 个失效或无法访问")
+                return
+        except queue.Empty:
+            self.root.after(100, self._poll_check_links)
+        
+    def site_label(self, site):
+        """按钮文字：链接失效时在名称前加标记"""
+        return self.manager.link_badge(site["url"]) + site["name"]
+        
+    def show_sites(self, sites, empty_text):
+        """切换显示的网站列表，先只显示第一页"""
+        self.shown_sites = sites
+        self.shown_count = min(PAGE_SIZE, len(sites))
+        self.empty_text = empty_text
+        self.button_pool.render(sites[:self.shown_count], empty_text)
+        
+    def show_more(self):
+        """追加显示下一页（已有按钮保持不动）"""
+        self._more_pending = False
+        if self.shown_count >= len(self.shown_sites):
+            return
+        self.shown_count = min(self.shown_count + PAGE_SIZE, len(self.shown_sites))
+        self.button_pool.render(self.shown_sites[:self.shown_count], self.empty_text)
+        
+    def populate_buttons(self):
+        """刷新按钮显示 - 复用已有按钮"""
+        # 按分类过滤，常用网站排在前面
+        filtered = self.manager.filter_sites(self.manager.current_filter)
+        if self.manager.current_filter == FREQUENT_CATEGORY:
+            self.show_sites(filtered, "还没有打开过网站")
+        else:
+            self.show_sites(filtered, "没有找到网站")
         self.update_status(f"显示 {len(filtered)} 个网站")
         
+    def open_website(self, site):
+        """打开网站并记录到常用度（列表顺序在下次刷新时更新，避免按钮跳动）"""
+        self.launcher.open(site["url"], on_done=self._launch_done)
+        self.manager.record_visit(site["id"])
+        self.nav_buttons[FREQUENT_CATEGORY].config(text=self.category_label(FREQUENT_CATEGORY))
+        self.update_status(f"正在打开: {site['url']}")
+        
+    def _launch_done(self, url, error):
+        """启动线程中调用"""
+        if error is not None:
+            self._launch_queue.put(("error", f"无法打开网址: {error}"))
+        
+    def open_all_in_category(self):
+        """打开当前分类的全部网站；正在批量打开时再按一次取消"""
+        if self._launch_batch is not None:
+            self._launch_batch.cancel()
+            self.update_status("正在取消批量打开...")
+            return
+        urls = [site["url"] for site in self.manager.filter_sites(self.manager.current_filter)]
+        if not urls:
+            self.update_status("当前分类没有网站")
+            return
+        if len(urls) > BATCH_CONFIRM and not messagebox.askyesno(
+                "确认", f"确定要打开 {len(urls)} 个网站吗？"):
+            return
+        total = len(urls)
+        done = itertools.count(1)  # 多个启动线程同时回调，next() 是原子的
+        
+        def on_done(url, error):
+            self._launch_queue.put(("progress", f"正在打开: {next(done)}/{total}"))
+        
+        def on_finished(opened, failed, cancelled):
+            prefix = "已取消，" if cancelled else ""
+            self._launch_queue.put(("finished", f"{prefix}打开了 {opened} 个网站，{failed} 个失败"))
+        
+        self._launch_batch = self.launcher.open_many(urls, on_done, on_finished)
+        self.update_status(f"正在打开 {total} 个网站...")
+        
     def show_context_menu(self, event, site_id):
         """右键菜单"""
         menu = tk.Menu(self.scroll_frame, tearoff=0)
@@ -417,68 +675,46 @@ class WebLauncherApp:
         
     def delete_site(self, site_id):
         """删除网站"""
-        site_name = next((s["name"] for s in self.websites if s["id"] == site_id), "")
-        if not site_name:
+        site = self.manager.get_site(site_id)
+        if site is None:
             return
+        site_name = site["name"]
             
         if not messagebox.askyesno("确认删除", f"确定要删除网站 '{site_name}' 吗？"):
             return
             
-        self.websites = [s for s in self.websites if s["id"] != site_id]
-        self.save_websites()
+        self.manager.delete_website(site_id)
+        self.button_pool.discard(site_id)
         self.populate_buttons()
+        self.refresh_categories()
         self.update_status(f"已删除网站: {site_name}")
         
     def filter_sites(self, category):
         """分类过滤"""
-        self.current_filter = category
+        self.manager.current_filter = category
         self.populate_buttons()
         
+    def schedule_search(self):
+        """输入变化时防抖搜索，取消还没执行的上一次搜索"""
+        if self._search_job is not None:
+            self.root.after_cancel(self._search_job)
+        self._search_job = self.root.after(int(SEARCH_DEBOUNCE * 1000), self.search_website)
+        
     def search_website(self):
         """搜索功能"""
+        if self._search_job is not None:
+            self.root.after_cancel(self._search_job)
+            self._search_job = None
+        
         keyword = self.search_entry.get().strip().lower()
         if not keyword:
             self.populate_buttons()
             return
         
-        filtered = [s for s in self.websites 
-                   if keyword in s["name"].lower() or keyword in s["url"].lower()]
-        
-        # 清空现有按钮
-        for widget in self.scroll_frame.winfo_children():
-            widget.destroy()
-        
-        # 如果没有结果，显示提示
-        if not filtered:
-            ttk.Label(self.scroll_frame, text="没有找到匹配的网站", 
-                     font=("Helvetica", 12), 
-                     foreground="#999").pack(pady=20)
-            self.update_status(f"找到 {len(filtered)} 个匹配结果")
-            return
-        
-        # 使用网格布局排列搜索结果
-        cols = 4  # 每行显示4个按钮
-        for i, site in enumerate(filtered):
-            row, col = divmod(i, cols)
-            
-            # 创建按钮框架
-            btn_frame = ttk.Frame(self.scroll_frame, padding=5)
-            btn_frame.grid(row=row, column=col, padx=5, pady=5, sticky="nsew")
-            
-            # 创建按钮
-            btn = ttk.Button(btn_frame, text=site["name"], 
-                           command=lambda u=site["url"]: webbrowser.open(u),
-                           width=15)
-            btn.pack(fill=tk.BOTH, expand=True)
-            
-            # 添加右键菜单
-            btn.bind("<Button-3>", lambda e, sid=site["id"]: self.show_context_menu(e, sid))
-            
-            # 配置网格列权重
-            if col == 0:
-                self.scroll_frame.grid_rowconfigure(row, weight=0)
-            self.scroll_frame.grid_columnconfigure(col, weight=1)
+        # 拼音/模糊匹配排序的前几个结果在前，其余子串匹配结果在后
+        filtered = self.manager.search_website(keyword)
         
+        self.show_sites(filtered, "没有找到匹配的网站")
         self.update_status(f"找到 {len(filtered)} 个匹配结果")
         
     def reset_search(self):
@@ -486,23 +722,116 @@ class WebLauncherApp:
         self.search_entry.delete(0, tk.END)
         self.populate_buttons()
         
-    def save_websites(self):
-        """保存数据到文件"""
+    def _poll_background(self):
+        """显示后台写入的错误；合并其他窗口保存的修改，按钮池只更新变化了的按钮"""
+        try:
+            while True:
+                messagebox.showerror("错误", self._error_queue.get_nowait())
+        except queue.Empty:
+            pass
+        try:
+            while True:
+                kind, value = self._launch_queue.get_nowait()
+                if kind == "error":
+                    messagebox.showerror("错误", value)
+                else:
+                    if kind == "finished":
+                        self._launch_batch = None
+                    self.update_status(value)
+        except queue.Empty:
+            pass
+        try:
+            while True:
+                self.manager.attach_search_indexes(self._index_queue.get_nowait())
+        except queue.Empty:
+            pass
+        if self._external_change.is_set():
+            self._external_change.clear()
+            try:
+                changes = self.manager.sync()
+            except Exception as e:
+                self.update_status(f"同步其他窗口的修改失败: {str(e)}")
+                changes = {}
+            if changes is None:
+                # 完整重新加载后联想索引需要重建
+                self.build_indexes_in_background()
+            if changes is None or any(changes.values()):
+                for site_id in (changes or {}).get("deleted", []):
+                    self.button_pool.discard(site_id)
+                if self.search_entry.get().strip():
+                    self.search_website()
+                else:
+                    self.populate_buttons()
+                self.refresh_categories()
+                self.update_status("已合并其他窗口的修改")
+        self.root.after(POLL_MS, self._poll_background)
+        
+    def toggle_metrics(self):
+        """打开或关闭性能面板；关闭时同时停止计时和延迟采样"""
+        if self._metrics_window is not None:
+            for job in self._metrics_jobs:
+                self.root.after_cancel(job)
+            self._metrics_jobs = []
+            self._metrics_window.destroy()
+            self._metrics_window = None
+            self.metrics.disable()
+            return
+        self.metrics.enable()
+        window = self._metrics_window = tk.Toplevel(self.root)
+        window.title("性能统计")
+        window.protocol("WM_DELETE_WINDOW", self.toggle_metrics)
+        window.bind("<F12>", lambda event: self.toggle_metrics())
+        self.metrics_text = ttk.Label(window, font="TkFixedFont", justify=tk.LEFT, padding=10)
+        self.metrics_text.pack(fill=tk.BOTH, expand=True)
+        buttons = ttk.Frame(window, padding=(10, 0, 10, 10))
+        buttons.pack(fill=tk.X)
+        ttk.Button(buttons, text="导出 JSON",
+                   command=lambda: self.export_metrics(".json")).pack(side=tk.LEFT)
+        ttk.Button(buttons, text="导出 CSV",
+                   command=lambda: self.export_metrics(".csv")).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="清空", command=self.metrics.reset).pack(side=tk.LEFT)
+        self._metrics_jobs = [None, None]
+        self._probe_lag(time.perf_counter())
+        self._refresh_metrics()
+        
+    def _probe_lag(self, scheduled):
+        """事件循环延迟：定时回调实际晚到了多久（相当于 Kivy 版的帧时间）"""
+        lag = (time.perf_counter() - scheduled) * 1000 - LAG_PROBE_MS
+        if self._metrics_jobs[0] is not None:
+            self.metrics.add("ui_lag", max(0.0, lag))
+        self._metrics_jobs[0] = self.root.after(LAG_PROBE_MS, self._probe_lag, time.perf_counter())
+        
+    def _refresh_metrics(self):
+        self.metrics_text.config(text=self.metrics.text())
+        self._metrics_jobs[1] = self.root.after(METRICS_REFRESH_MS, self._refresh_metrics)
+        
+    def export_metrics(self, extension):
+        """把当前统计导出为 JSON 或 CSV 文件"""
+        path = filedialog.asksaveasfilename(
+            parent=self._metrics_window, title="导出性能统计", defaultextension=extension,
+            initialfile=f"metrics-{time.strftime('%Y%m%d-%H%M%S')}{extension}",
+            filetypes=[("JSON", "*.json"), ("CSV", "*.csv")])
+        if not path:
+            return
         try:
-            # 创建备份
-            if os.path.exists(self.data_file):
-                backup_file = self.data_file + ".bak"
-                shutil.copy2(self.data_file, backup_file)
-                
-            with open(self.data_file, "w", encoding="utf-8") as f:
-                for site in self.websites:
-                    f.write(json.dumps(site, ensure_ascii=False) + "\n")
+            self.metrics.export(path)
+            self.update_status(f"性能统计已导出: {path}")
         except Exception as e:
-            messagebox.showerror("错误", f"保存数据失败: {str(e)}")
-            
+            messagebox.showerror("错误", f"导出性能统计失败: {str(e)}")
+        
     def update_status(self, message):
         """更新状态栏"""
         self.status.config(text=message)
+        
+    def on_close(self):
+        """关闭窗口前合并日志并保存常用度检查点"""
+        if self._metrics_window is not None:
+            self.toggle_metrics()
+        if self._launch_batch is not None:
+            self._launch_batch.cancel()
+        self.launcher.shutdown()
+        self.manager.close()
+        self.root.destroy()
 
 if __name__ == "__main__":
     root = tk.Tk()
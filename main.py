@@ -1,4 +1,7 @@
 # main.py
+import time
+STARTUP_T0 = time.perf_counter()  # 启动计时起点：在导入 Kivy 之前
+
 from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
@@ -7,206 +10,198 @@ from kivy.uix.textinput import TextInput
 from kivy.uix.scrollview import ScrollView
 from kivy.uix.gridlayout import GridLayout
 from kivy.uix.spinner import Spinner
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
 from kivy.properties import ObjectProperty, ListProperty, StringProperty
 from kivy.clock import Clock
 from kivy.core.window import Window
-from kivy.core.text import LabelBase
+from kivy.core.text import LabelBase, Label as CoreLabel
+from kivy.core.image import Image as CoreImage
+from kivy.graphics.texture import Texture
 from kivy.uix.popup import Popup
+from kivy.uix.dropdown import DropDown
 from kivy.factory import Factory
 
+import itertools
 import json
 import os
-import re
-import shutil
-import uuid
-from datetime import datetime
-import webbrowser
+import threading
+from collections import OrderedDict
+
+from weblauncher import (ALIVE, FREQUENT_CATEGORY, METRICS_ENABLED, SEARCH_DEBOUNCE,
+                         BookmarkImporter, BrowserLauncher, FrameStats, Metrics, StartupTracer,
+                         open_manager, scale_rgba, site_origin)
+
+# 启动计时：各阶段耗时追加到 ~/.weblauncher/startup.log
+TRACER = StartupTracer(origin=STARTUP_T0)
+TRACER.record("imports", STARTUP_T0, time.perf_counter())
+STARTUP_LOG = os.path.join(os.path.expanduser("~"), ".weblauncher", "startup.log")
+# 延迟初始化：先显示界面框架，数据和网站列表在后台分阶段加载（设为 0 关闭）
+DEFERRED_INIT = os.environ.get("WEBLAUNCHER_DEFERRED_INIT", "1") != "0"
 
 # 注册中文字体
-LabelBase.register(
-    name='MicrosoftYaHei',
-    fn_regular='assets/fonts/msyh.ttf'
-)
+with TRACER.phase("font_registration"):
+    LabelBase.register(
+        name='MicrosoftYaHei',
+        fn_regular='assets/fonts/msyh.ttf'
+    )
 
-class WebsiteManager:
-    """核心逻辑：网站数据管理"""
-    def __init__(self):
-        # 跨平台数据文件路径
-        app_data_path = os.path.join(os.path.expanduser("~"), ".weblauncher")
-        self.data_file = os.path.join(app_data_path, "custom_sites.json")
-        os.makedirs(app_data_path, exist_ok=True)
-        
-        # 迁移旧数据
-        self.migrate_old_data()
-        
-        # 加载网站数据
-        self.websites = self.load_websites()
-        self.current_filter = "全部"
-    
-    def migrate_old_data(self):
-        """迁移旧版本数据"""
-        old_paths = [
-            os.path.join(os.path.expanduser("~"), "Library", "Application Support", "WebLauncher", "custom_sites.json"),
-            os.path.join(os.getenv('APPDATA', ''), "WebLauncher", "custom_sites.json"),
-            os.path.join(os.path.expanduser("~"), ".config", "WebLauncher", "custom_sites.json")
-        ]
-        
-        for old_path in old_paths:
-            if os.path.exists(old_path) and not os.path.exists(self.data_file):
-                try:
-                    shutil.copy2(old_path, self.data_file)
-                    print(f"迁移旧数据: {old_path} -> {self.data_file}")
-                except Exception as e:
-                    print(f"数据迁移失败: {str(e)}")
-    
-    def load_websites(self):
-        """加载已保存的网站数据"""
-        default_sites = [
-            {"id": "social_1", "name": "微博", "url": "https://weibo.com", "category": "社交"},
-            {"id": "social_2", "name": "微信", "url": "https://wx.qq.com", "category": "社交"},
-            {"id": "social_3", "name": "QQ", "url": "https://im.qq.com", "category": "社交"},
-            {"id": "social_4", "name": "知乎", "url": "https://www.zhihu.com", "category": "社交"},
-            {"id": "social_5", "name": "豆瓣", "url": "https://www.douban.com", "category": "社交"},
-            {"id": "tech_1", "name": "GitHub", "url": "https://github.com", "category": "技术"},
-            {"id": "tech_2", "name": "百度网盘", "url": "https://pan.baidu.com", "category": "工具"},
-            {"id": "tech_3", "name": "阿里云", "url": "https://www.aliyun.com", "category": "工具"},
-            {"id": "tech_4", "name": "CSDN", "url": "https://www.csdn.net", "category": "技术"},
-            {"id": "tech_5", "name": "Stack Overflow", "url": "https://stackoverflow.com", "category": "技术"},
-            {"id": "shopping_1", "name": "淘宝", "url": "https://www.taobao.com", "category": "购物"},
-            {"id": "shopping_2", "name": "京东", "url": "https://www.jd.com", "category": "购物"},
-            {"id": "shopping_3", "name": "拼多多", "url": "https://www.pinduoduo.com", "category": "购物"},
-            {"id": "shopping_4", "name": "唯品会", "url": "https://www.vip.com", "category": "购物"},
-            {"id": "shopping_5", "name": "网易严选", "url": "https://you.163.com", "category": "购物"},
-            {"id": "news_1", "name": "腾讯新闻", "url": "https://news.qq.com", "category": "新闻"},
-            {"id": "news_2", "name": "人民日报", "url": "https://www.people.com.cn", "category": "新闻"},
-            {"id": "news_3", "name": "36氪", "url": "https://www.36kr.com", "category": "新闻"},
-            {"id": "news_4", "name": "虎嗅", "url": "https://www.huxiu.com", "category": "新闻"},
-            {"id": "video_1", "name": "哔哩哔哩", "url": "https://www.bilibili.com", "category": "视频"},
-            {"id": "video_2", "name": "腾讯视频", "url": "https://v.qq.com", "category": "视频"},
-            {"id": "video_3", "name": "爱奇艺", "url": "https://www.iqiyi.com", "category": "视频"},
-            {"id": "video_4", "name": "优酷", "url": "https://www.youku.com", "category": "视频"},
-            {"id": "video_5", "name": "芒果TV", "url": "https://www.mgtv.com", "category": "视频"},
-            {"id": "education_1", "name": "知乎日报", "url": "https://daily.zhihu.com", "category": "新闻"},
-            {"id": "education_2", "name": "中国大学MOOC", "url": "https://www.icourse163.org", "category": "教育"},
-            {"id": "education_3", "name": "W3School", "url": "https://www.w3school.com.cn", "category": "技术"},
-            {"id": "education_4", "name": "LeetCode", "url": "https://leetcode.cn", "category": "技术"},
-            {"id": "live_1", "name": "斗鱼直播", "url": "https://www.douyu.com", "category": "直播"},
-            {"id": "live_2", "name": "虎牙直播", "url": "https://www.huya.com", "category": "直播"},
-            {"id": "ai_1", "name": "deepseek", "url": "https://www.deepseek.com/zh", "category": "工具"}
-        ]
-        
-        if not os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, "w", encoding="utf-8") as f:
-                    for site in default_sites:
-                        f.write(json.dumps(site, ensure_ascii=False) + "\n")
-                return default_sites
-            except Exception as e:
-                print(f"创建默认数据文件失败: {str(e)}")
-                return default_sites[:5]  # 返回部分默认数据
-        
-        sites = []
+WEBSITE_BUTTON_COLOR = (0.95, 0.95, 0.95, 1)
+SEARCH_RESULT_COLOR = (0.9, 0.95, 0.9, 1)
+ICON_SIZE = 32      # 图标在图集中的边长（像素）
+ATLAS_SIZE = 1024   # 每张图集纹理的边长，可放 (1024/32)^2 = 1024 个图标
+# 文字纹理缓存的内存上限（MB），设为 0 关闭缓存（用于对比帧时间）
+LABEL_CACHE_MB = float(os.environ.get("WEBLAUNCHER_LABEL_CACHE_MB", "16"))
+# 切换分类后记录的帧数，帧间隔追加到 ~/.weblauncher/frames.log
+FRAME_SAMPLES = 30
+FRAME_LOG = os.path.join(os.path.expanduser("~"), ".weblauncher", "frames.log")
+BATCH_CONFIRM = 10  # 批量打开超过这么多网站时先确认
+# 性能面板：F12 或状态栏的"性能"按钮切换，导出的统计保存在 ~/.weblauncher
+METRICS_DIR = os.path.join(os.path.expanduser("~"), ".weblauncher")
+METRICS_REFRESH = 0.5  # 面板刷新间隔（秒）
+KEY_F12 = 293
+
+class IconAtlas:
+    """把网站图标打包进少数几张共享纹理
+
+    每个图标缩放到 ICON_SIZE 后写入图集中的一个格子，按钮使用的是
+    图集的子区域，几百个按钮的图标只对应一两张纹理。
+    保留缩放后的像素，GL 上下文重建（如安卓切回前台）时重新写入。
+    """
+    def __init__(self, icon_size=ICON_SIZE, atlas_size=ATLAS_SIZE):
+        self.icon_size = icon_size
+        self.atlas_size = atlas_size
+        self.per_row = atlas_size // icon_size
+        self.pages = []    # 图集纹理
+        self.blits = []    # 每张图集已写入的 (x, y, 像素)
+        self.regions = {}  # 站点 -> 图集子区域
+    
+    def get(self, origin):
+        return self.regions.get(origin)
+    
+    def add(self, origin, path):
+        """解码图标文件并放进图集，返回子区域；无法解码时返回 None"""
         try:
-            with open(self.data_file, "r", encoding="utf-8") as f:
-                for line in f:
-                    try:
-                        site = json.loads(line)
-                        if self.validate_site(site):
-                            sites.append(site)
-                    except json.JSONDecodeError:
-                        continue
+            texture = CoreImage(path).texture
+            pixels = scale_rgba(texture.pixels, texture.size, self.icon_size)
         except Exception as e:
-            print(f"加载数据文件失败: {str(e)}")
-            return default_sites
-        
-        return sites or default_sites
-    
-    def validate_site(self, site):
-        """验证网站数据有效性"""
-        return ("name" in site and "url" in site and 
-                isinstance(site["name"], str) and 
-                isinstance(site["url"], str) and
-                self.is_valid_url(site["url"]))
-    
-    def is_valid_url(self, url):
-        """增强型URL验证"""
-        regex = re.compile(
-            r'^(https?://)?'  # 协议可选
-            r'([A-Za-z0-9-]+\.)+[A-Za-z]{2,}'  # 域名部分
-            r'(:\d+)?'  # 端口
-            r'(/[/\w\.-]*)*$', re.IGNORECASE)
-        return re.match(regex, url) is not None
-    
-    def add_website(self, name, url, category="我的"):
-        """添加新网站"""
-        if not url.startswith(("http://", "https://")):
-            url = "https://" + url
-            
-        if not self.is_valid_url(url):
-            raise ValueError("URL格式无效")
+            print(f"加载图标失败: {str(e)}")
+            return None
         
-        # 生成唯一ID - 使用UUID确保唯一性
-        site_id = f"{category}_{uuid.uuid4().hex}"
-        new_site = {
-            "id": site_id,
-            "name": name,
-            "url": url,
-            "category": category,
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        
-        # 保存数据
-        self.websites.append(new_site)
-        self.save_websites()
-        return new_site
+        slot = len(self.regions)
+        page, cell = divmod(slot, self.per_row * self.per_row)
+        if page == len(self.pages):
+            atlas = Texture.create(size=(self.atlas_size, self.atlas_size), colorfmt='rgba')
+            atlas.add_reload_observer(self._reload)
+            self.pages.append(atlas)
+            self.blits.append([])
+        row, col = divmod(cell, self.per_row)
+        x, y = col * self.icon_size, row * self.icon_size
+        self._blit(self.pages[page], x, y, pixels)
+        self.blits[page].append((x, y, pixels))
+        region = self.pages[page].get_region(x, y, self.icon_size, self.icon_size)
+        self.regions[origin] = region
+        return region
     
-    def delete_website(self, site_id):
-        """删除网站"""
-        original_count = len(self.websites)
-        self.websites = [s for s in self.websites if s["id"] != site_id]
-        if len(self.websites) < original_count:
-            self.save_websites()
-            return True
-        return False
+    def _blit(self, atlas, x, y, pixels):
+        atlas.blit_buffer(pixels, pos=(x, y), size=(self.icon_size, self.icon_size),
+                          colorfmt='rgba', bufferfmt='ubyte')
     
-    def filter_sites(self, category):
-        """分类过滤"""
-        self.current_filter = category
-        if category == "全部":
-            return self.websites
-        return [s for s in self.websites if s["category"] == category]
+    def _reload(self, atlas):
+        """GL 上下文重建后重新写入这张图集的全部图标"""
+        page = self.pages.index(atlas)
+        for x, y, pixels in self.blits[page]:
+            self._blit(atlas, x, y, pixels)
+
+class LabelTextureCache:
+    """共享的文字纹理：同样的文字、字体、字号、颜色只渲染一次
+
+    键包含影响渲染结果的全部选项（字体、字号、颜色、粗体、内边距等），
+    按 LRU 淘汰，纹理像素总量不超过 max_bytes。每个纹理由单独的
+    CoreLabel 渲染并持有，GL 上下文重建时由它重新绘制。
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # 键 -> (CoreLabel, 字节数)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
     
-    def search_website(self, keyword):
-        """搜索网站"""
-        if not keyword:
-            return self.filter_sites(self.current_filter)
-        
-        keyword = keyword.lower()
-        return [s for s in self.websites 
-               if keyword in s["name"].lower() or keyword in s["url"].lower()]
+    def texture(self, text, options):
+        # options["text"] 只是创建时的文字，真正的文字在 text 中
+        key = (text,) + tuple((name, tuple(value) if isinstance(value, list) else value)
+                              for name, value in sorted(options.items()) if name != "text")
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0].texture
+        self.misses += 1
+        # 与 Label 控件的做法相同：直接换上选项字典
+        label = CoreLabel()
+        label.options = dict(options)
+        label.text = text
+        label.refresh()
+        texture = label.texture
+        size = texture.width * texture.height * 4
+        if size <= self.max_bytes:
+            self.entries[key] = (label, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.bytes -= evicted
+        return texture
     
-    def save_websites(self):
-        """保存数据到文件"""
-        try:
-            # 创建备份
-            if os.path.exists(self.data_file):
-                backup_file = self.data_file + ".bak"
-                shutil.copy2(self.data_file, backup_file)
-                
-            with open(self.data_file, "w", encoding="utf-8") as f:
-                for site in self.websites:
-                    f.write(json.dumps(site, ensure_ascii=False) + "\n")
-            return True
-        except Exception as e:
-            print(f"保存数据失败: {str(e)}")
-            return False
+    def stats(self):
+        return {"entries": len(self.entries), "kb": self.bytes // 1024,
+                "hits": self.hits, "misses": self.misses}
+
+LABEL_CACHE = LabelTextureCache(int(LABEL_CACHE_MB * 1024 * 1024)) if LABEL_CACHE_MB > 0 else None
+
+class CachedLabelMixin:
+    """按钮文字从 LABEL_CACHE 取纹理（只处理不换行、不带标记的文字）"""
+    def texture_update(self, *largs):
+        label = self._label
+        if (LABEL_CACHE is None or self.markup or not label.text
+                or any(v is not None for v in label.options.get("text_size") or ())):
+            return super().texture_update(*largs)
+        self.texture = LABEL_CACHE.texture(label.text, label.options)
+        self.texture_size = list(self.texture.size)
+        self.is_shortened = False
+
+class CachedButton(CachedLabelMixin, Button):
+    """文字纹理走共享缓存的按钮（分类按钮的基类）"""
+    pass
+
+class WebsiteGrid(RecycleView):
+    """网站列表：data 只是占位，按钮显示时才从 sites 中按行号取网站"""
+    sites = ObjectProperty([], allownone=True)
+    item_color = ListProperty(WEBSITE_BUTTON_COLOR)
+    badge = ObjectProperty(None, allownone=True)  # URL -> 链接状态标记
+    icon = ObjectProperty(None, allownone=True)   # URL -> 图标纹理（图集子区域）
+    
+    def show(self, sites, item_color):
+        """切换显示的网站列表（sites 可以是按需解码的视图）"""
+        self.sites = sites
+        self.item_color = item_color
+        self.data = [{}] * len(sites)
+        self.refresh_from_data()
+
+class WebsiteButton(RecycleDataViewBehavior, CachedLabelMixin, Button):
+    """网站按钮：被复用到新的行时才解码并绑定对应网站"""
+    url = StringProperty("")
+    site_id = StringProperty("")
+    icon = ObjectProperty(None, allownone=True)
     
-    def get_all_categories(self):
-        """获取所有分类"""
-        categories = set()
-        for site in self.websites:
-            categories.add(site["category"])
-        return sorted(categories)
+    def refresh_view_attrs(self, rv, index, data):
+        site = rv.sites[index]
+        badge = rv.badge(site['url']) if rv.badge else ""
+        self.text = f"{badge}{site['name']}"
+        self.icon = rv.icon(site['url']) if rv.icon else None
+        self.url = site['url']
+        self.site_id = site['id']
+        self.background_color = rv.item_color
+        return super().refresh_view_attrs(rv, index, data)
 
 class MainLayout(BoxLayout):
     """主布局类"""
@@ -220,43 +215,232 @@ class MyApp(App):
         Window.size = (1000, 700)
         Window.title = "智能官网直达工具"
         
-        # 初始化核心逻辑
-        self.manager = WebsiteManager()
-        return MainLayout()
+        # 初始化核心逻辑（延迟初始化时在 on_start 中后台加载）
+        self.manager = None
+        self._search_event = None
+        self._checking_links = False
+        # 浏览器在后台线程中启动，批量打开时限制并发和速率
+        self.launcher = BrowserLauncher()
+        self._launch_batch = None
+        # 添加面板输入框的联想列表，以及自动填上的分类（用户改过分类后不再覆盖）
+        self._completions = {}  # 输入框 -> DropDown
+        self._suggested_category = None
+        self.deferred = DEFERRED_INIT
+        TRACER.info["mode"] = "deferred" if self.deferred else "eager"
+        if not self.deferred:
+            with TRACER.phase("data_load"):
+                self.attach_manager(open_manager(on_error=self.report_error))
+        
+        # 图标：下载完成后合并成一次列表刷新
+        self.icon_atlas = IconAtlas()
+        self._icon_failed = set()
+        self._refresh_icons = Clock.create_trigger(
+            lambda dt: self.root.ids.website_grid.refresh_from_data(), 0.3)
+        
+        # 启动计时：第一帧和第一个显示了网站列表的帧
+        self._startup_pending = {"frame", "indexes"} if self.deferred else {"frame"}
+        self._useful_frame_pending = False
+        self._frame_stats = None  # 正在记录的帧间隔，见 measure_frames
+        Window.bind(on_flip=self._on_startup_flip)
+        
+        # 性能统计：关闭时不装计时包装、不采样帧间隔
+        self.metrics = Metrics()
+        self.metrics.watch(self, ["populate_website_list", "search_website", "filter_sites"])
+        self.metrics.counters["sites"] = (
+            lambda: len(self.manager.websites) if self.manager is not None else 0)
+        if LABEL_CACHE is not None:
+            self.metrics.counters["label_cache"] = LABEL_CACHE.stats
+        self._metrics_overlay = None
+        self._metrics_events = []
+        Window.bind(on_key_down=self._on_key_down)
+        with TRACER.phase("root_widget"):
+            return MainLayout()
+    
+    def load_kv(self, filename=None):
+        """加载 my.kv（计入启动计时）"""
+        with TRACER.phase("kv_load"):
+            return super().load_kv(filename)
+    
+    def attach_manager(self, manager):
+        """数据加载完成后接入界面"""
+        self.manager = manager
+        self.metrics.watch(manager, ["save_websites"])
+        manager.favicons.on_ready = (
+            lambda origin, path, ext: Clock.schedule_once(lambda dt: self._refresh_icons()))
+
+        # 其他窗口（进程）保存修改时在界面线程中合并
+        manager.start_watching(lambda: Clock.schedule_once(lambda dt: self.sync_external()))
+    
+    def sync_external(self):
+        """合并其他窗口保存的修改，没有新内容时什么也不做"""
+        try:
+            changes = self.manager.sync()
+        except Exception as e:
+            self.update_status(f"同步其他窗口的修改失败: {str(e)}")
+            return
+        if changes is not None and not any(changes.values()):
+            return
+        if changes is None:
+            # 完整重新加载后联想索引需要重建
+            self.build_indexes_in_background()
+        # RecycleView 只会重新绑定可见的几行
+        if self.root.ids.search_input.text.strip():
+            self.search_website()
+        else:
+            self.populate_website_list()
+        self.refresh_categories()
+        self.update_status("已合并其他窗口的修改")
+    
+    def data_ready(self):
+        """延迟初始化时数据可能还在加载"""
+        if self.manager is None:
+            self.update_status("正在加载数据，请稍候...")
+            return False
+        return True
+    
+    def report_error(self, message):
+        """核心库的错误（可能来自后台写入线程），切回界面线程后显示"""
+        Clock.schedule_once(lambda dt: self.show_error_popup(message))
+    
+    def on_pause(self):
+        """切到后台时立即写入还没保存的修改（安卓可能随后结束进程）"""
+        if self.manager is not None:
+            self.manager.flush()
+        return True
+    
+    def on_stop(self):
+        """退出时合并日志，下次启动可以按索引快速读取"""
+        if self._launch_batch is not None:
+            self._launch_batch.cancel()
+        self.launcher.shutdown()
+        if self.manager is not None:
+            self.manager.close()
     
     def on_start(self):
         """应用启动时调用"""
-        # 延迟加载数据，确保界面已初始化
-        Clock.schedule_once(lambda dt: self.initialize_ui(), 0.1)
+        if METRICS_ENABLED:
+            self.toggle_metrics()
+        if self.deferred:
+            # 先显示界面框架，数据在后台线程加载
+            self.update_status("正在加载数据...")
+            threading.Thread(target=self._load_in_background, name="startup-load",
+                             daemon=True).start()
+        else:
+            # 延迟加载数据，确保界面已初始化
+            Clock.schedule_once(lambda dt: self.initialize_ui(), 0.1)
     
     def initialize_ui(self):
         """初始化UI"""
         try:
-            # 初始化分类按钮
-            self.initialize_categories()
-            
-            # 填充网站列表
-            self.populate_website_list()
-            
-            # 初始化分类下拉框
-            self.initialize_category_spinner()
+            with TRACER.phase("initialize_ui"):
+                # 网站按钮上显示链接检查结果
+                self.root.ids.website_grid.badge = self.manager.link_badge
+                self.root.ids.website_grid.icon = self.site_icon
+                
+                # 初始化分类按钮
+                self.initialize_categories()
+                
+                # 填充网站列表
+                self.populate_website_list()
+                
+                # 初始化分类下拉框
+                self.initialize_category_spinner()
+            self._useful_frame_pending = True
         except Exception as e:
             self.show_error_popup(f"初始化界面失败: {str(e)}")
+        # 按需解码快照时搜索索引还没建立，联想索引总是在后台建立
+        self.build_indexes_in_background()
     
-    def initialize_categories(self):
-        """初始化分类按钮"""
-        categories = ["我的", "全部", "社交", "购物", "视频", "音乐", "技术", "新闻", "工具", "教育", "直播", "其他"]
+    def _load_in_background(self):
+        """延迟初始化第一步（后台线程）：读取数据，只建分类索引"""
+        try:
+            with TRACER.phase("data_load"):
+                manager = open_manager(build_indexes=False, on_error=self.report_error)
+        except Exception as e:
+            message = f"加载数据失败: {str(e)}"
+            Clock.schedule_once(lambda dt: self.show_error_popup(message))
+            return
+        Clock.schedule_once(lambda dt: self._startup_categories(manager))
+    
+    def _startup_categories(self, manager):
+        """第二步：显示分类，下一帧再填充网站列表"""
+        try:
+            self.attach_manager(manager)
+            with TRACER.phase("categories"):
+                self.initialize_categories()
+                self.initialize_category_spinner()
+        except Exception as e:
+            self.show_error_popup(f"初始化界面失败: {str(e)}")
+            return
+        Clock.schedule_once(lambda dt: self._startup_grid())
+    
+    def _startup_grid(self):
+        """第三步：填充网站列表，然后在后台建立搜索索引"""
+        try:
+            with TRACER.phase("grid"):
+                self.root.ids.website_grid.badge = self.manager.link_badge
+                self.root.ids.website_grid.icon = self.site_icon
+                self.populate_website_list()
+            self._useful_frame_pending = True
+        except Exception as e:
+            self.show_error_popup(f"初始化界面失败: {str(e)}")
+        self.build_indexes_in_background(lambda: self._startup_done("indexes"))
+    
+    def build_indexes_in_background(self, on_done=None):
+        """第四步：在后台线程建立搜索、URL 和联想索引，建好后在界面线程挂上"""
+        manager = self.manager
+        
+        def worker():
+            try:
+                with TRACER.phase("search_indexes"):
+                    built = manager.build_search_indexes()
+            except Exception as e:
+                # 搜索时会在界面线程中重建
+                print(f"建立搜索索引失败: {str(e)}")
+                built = None
+            Clock.schedule_once(lambda dt: attach(built))
         
+        def attach(built):
+            manager.attach_search_indexes(built)
+            if on_done is not None:
+                on_done()
+        
+        threading.Thread(target=worker, name="startup-index", daemon=True).start()
+    
+    def _on_startup_flip(self, *args):
+        """记录第一帧，以及显示出网站列表之后的第一帧"""
+        TRACER.mark("first_frame")
+        if self._useful_frame_pending:
+            TRACER.mark("first_useful_frame")
+            Window.unbind(on_flip=self._on_startup_flip)
+            self._startup_done("frame")
+    
+    def _startup_done(self, step):
+        """启动工作全部完成后写入计时日志"""
+        self._startup_pending.discard(step)
+        if self._startup_pending:
+            return
+        TRACER.info["sites"] = len(self.manager.websites)
+        print(f"启动耗时: {TRACER.summary()}")
+        try:
+            TRACER.write(STARTUP_LOG)
+        except Exception as e:
+            print(f"写入启动日志失败: {str(e)}")
+    
+    def initialize_categories(self):
+        """初始化分类按钮（来自分类索引，显示数量）"""
         # 清空现有按钮
         container = self.root.ids.category_container
         container.clear_widgets()
+        self.category_buttons = {}
         
-        for category in categories:
+        for category, count in self.manager.get_category_counts():
             # 创建分类按钮 - 使用KV文件中定义的样式
             btn = Factory.CategoryButton(
-                text=category,
+                category=category,
+                text=f"{category} ({count})",
                 size_hint=(None, None),
-                size=(85, 32)
+                height=32
             )
             
             # 绑定点击事件
@@ -264,67 +448,117 @@ class MyApp(App):
             
             # 添加到分类容器
             container.add_widget(btn)
+            self.category_buttons[category] = btn
+    
+    def refresh_categories(self):
+        """增删网站后刷新分类数量，分类本身有增减时才重建按钮"""
+        counts = self.manager.get_category_counts()
+        if [c for c, _ in counts] != list(self.category_buttons):
+            self.initialize_categories()
+            self.initialize_category_spinner()
+            return
+        for category, count in counts:
+            self.category_buttons[category].text = f"{category} ({count})"
     
     def initialize_category_spinner(self):
         """初始化分类下拉框"""
-        categories = ["我的", "全部", "社交", "购物", "视频", "音乐", "技术", "新闻", "工具", "教育", "直播", "其他"]
         spinner = self.root.ids.category_spinner
-        spinner.values = categories
+        spinner.values = self.manager.get_category_choices()
     
     def populate_website_list(self):
         """填充网站列表"""
-        if not hasattr(self, 'manager'):
+        if getattr(self, 'manager', None) is None:
             return
-            
-        # 清空现有内容
-        grid = self.root.ids.website_grid
-        grid.clear_widgets()
         
         # 获取当前筛选的网站
         sites = self.manager.filter_sites(self.manager.current_filter)
+        if self.manager.current_filter == FREQUENT_CATEGORY:
+            self.show_sites(sites, "还没有打开过网站")
+        else:
+            self.show_sites(sites, "没有找到网站\n点击右下角按钮添加")
         
-        if not sites:
-            # 添加提示标签
-            label = Factory.Label(
-                text="没有找到网站\n点击右下角按钮添加",
-                size_hint_y=None,
-                height=100,
-                color=(0.5, 0.5, 0.5, 1),
-                font_size=14,
-                font_name='MicrosoftYaHei'
-            )
-            grid.add_widget(label)
-            self.update_status(f"显示 0 个网站")
+        self.update_status(f"显示 {len(sites)} 个网站")
+        self.root.ids.count_label.text = f"共 {len(sites)} 个网站"
+    
+    def show_sites(self, sites, empty_text, background_color=WEBSITE_BUTTON_COLOR):
+        """替换网站列表，RecycleView 只为可见区域创建按钮并按需取数据"""
+        self.root.ids.website_grid.show(sites, background_color)
+        self.root.ids.empty_label.text = "" if len(sites) else empty_text
+    
+    def open_website(self, url, site_id=""):
+        """打开网站并记录到常用度（列表顺序在下次切换分类时更新，避免按钮跳动）
+
+        浏览器在后台线程中启动，失败时再切回界面线程提示。
+        """
+        self.launcher.open(url, on_done=self._launch_done)
+        self.update_status(f"正在打开: {url}")
+        if site_id:
+            self.manager.record_visit(site_id)
+            self.refresh_categories()
+    
+    def _launch_done(self, url, error):
+        """启动线程中调用"""
+        if error is not None:
+            message = f"无法打开网址: {error}"
+            Clock.schedule_once(lambda dt: self.show_error_popup(message))
+    
+    def open_all_in_category(self):
+        """打开当前分类的全部网站；正在批量打开时再按一次取消"""
+        if not self.data_ready():
             return
+        if self._launch_batch is not None:
+            self._launch_batch.cancel()
+            self.update_status("正在取消批量打开...")
+            return
+        urls = [site["url"] for site in self.manager.filter_sites(self.manager.current_filter)]
+        if not urls:
+            self.update_status("当前分类没有网站")
+            return
+        if len(urls) > BATCH_CONFIRM:
+            self.show_confirm_popup(f"确定要打开 {len(urls)} 个网站吗？",
+                                    lambda: self._start_launch_batch(urls))
+        else:
+            self._start_launch_batch(urls)
+    
+    def _start_launch_batch(self, urls):
+        total = len(urls)
+        done = itertools.count(1)  # 多个启动线程同时回调，next() 是原子的
         
-        # 添加网站按钮
-        for site in sites:
-            # 创建网站按钮 - 使用KV文件中定义的样式
-            btn = Factory.WebsiteButton(
-                text=site['name'],
-                size_hint=(None, None),
-                size=(180, 45)
-            )
-            btn.bind(on_press=lambda instance, url=site['url']: self.open_website(url))
-            
-            grid.add_widget(btn)
+        def on_done(url, error):
+            message = f"正在打开: {next(done)}/{total}"
+            Clock.schedule_once(lambda dt: self.update_status(message))
         
-        self.update_status(f"显示 {len(sites)} 个网站")
-        self.root.ids.count_label.text = f"共 {len(sites)} 个网站"
+        def on_finished(opened, failed, cancelled):
+            Clock.schedule_once(lambda dt: self._finish_launch_batch(opened, failed, cancelled))
+        
+        self._launch_batch = self.launcher.open_many(urls, on_done, on_finished)
+        self.update_status(f"正在打开 {total} 个网站...")
     
-    def open_website(self, url):
-        """打开网站"""
-        try:
-            webbrowser.open(url)
-            self.update_status(f"正在打开: {url}")
-        except Exception as e:
-            self.show_error_popup(f"无法打开网址: {str(e)}")
+    def _finish_launch_batch(self, opened, failed, cancelled):
+        self._launch_batch = None
+        prefix = "已取消，" if cancelled else ""
+        self.update_status(f"{prefix}打开了 {opened} 个网站，{failed} 个失败")
+    
+    def site_icon(self, url):
+        """网站图标的纹理；不在图集中时从磁盘缓存加载，没有缓存时安排下载"""
+        origin = site_origin(url)
+        if origin is None or origin in self._icon_failed:
+            return None
+        region = self.icon_atlas.get(origin)
+        if region is None:
+            cached = self.manager.favicons.request(url)
+            if cached is not None:
+                region = self.icon_atlas.add(origin, cached[0])
+                if region is None:
+                    self._icon_failed.add(origin)
+        return region
     
     def delete_website(self, site_id):
         """删除网站"""
         try:
             if self.manager.delete_website(site_id):
                 self.populate_website_list()
+                self.refresh_categories()
                 self.update_status("网站已删除")
             else:
                 self.show_error_popup("删除网站失败")
@@ -337,43 +571,65 @@ class MyApp(App):
             self.manager.current_filter = category
             self.populate_website_list()
             self.update_status(f"显示分类: {category}")
+            self.measure_frames(f"filter:{category}")
         except Exception as e:
             self.show_error_popup(f"筛选网站时出错: {str(e)}")
     
+    def measure_frames(self, event):
+        """记录之后 FRAME_SAMPLES 帧的帧间隔，连同文字纹理缓存的统计写入 frames.log"""
+        if self._frame_stats is not None:
+            return
+        stats = self._frame_stats = FrameStats()
+        
+        def sample(dt):
+            stats.add(dt)
+            if len(stats.samples) < FRAME_SAMPLES:
+                return True
+            self._frame_stats = None
+            entry = dict(stats.summary(), event=event, time=time.strftime("%Y-%m-%d %H:%M:%S"),
+                         label_cache=LABEL_CACHE.stats() if LABEL_CACHE is not None else None)
+            try:
+                os.makedirs(os.path.dirname(FRAME_LOG), exist_ok=True)
+                with open(FRAME_LOG, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            except Exception as e:
+                print(f"写入帧时间日志失败: {str(e)}")
+            return False
+        
+        Clock.schedule_interval(sample, 0)
+    
+    def schedule_search(self):
+        """输入变化时防抖搜索，取消还没执行的上一次搜索"""
+        if self._search_event is not None:
+            self._search_event.cancel()
+        self._search_event = Clock.schedule_once(lambda dt: self.live_search(), SEARCH_DEBOUNCE)
+    
+    def live_search(self):
+        """边输入边搜索，关键词为空时恢复当前分类"""
+        self._search_event = None
+        if self.root.ids.search_input.text.strip():
+            self.search_website()
+        else:
+            self.populate_website_list()
+    
     def search_website(self):
         """搜索网站"""
+        if self._search_event is not None:
+            self._search_event.cancel()
+            self._search_event = None
+        if not self.data_ready():
+            return
         try:
             keyword = self.root.ids.search_input.text.strip()
             sites = self.manager.search_website(keyword)
             
-            grid = self.root.ids.website_grid
-            grid.clear_widgets()
+            # 浅绿色背景突出显示搜索结果
+            self.show_sites(sites, "没有找到匹配的网站", SEARCH_RESULT_COLOR)
             
             if not sites:
-                label = Factory.Label(
-                    text="没有找到匹配的网站",
-                    size_hint_y=None,
-                    height=100,
-                    color=(0.5, 0.5, 0.5, 1),
-                    font_size=14,
-                    font_name='MicrosoftYaHei'
-                )
-                grid.add_widget(label)
                 self.update_status(f"搜索 '{keyword}' 没有结果")
                 return
             
-            # 添加搜索结果
-            for site in sites:
-                btn = Factory.WebsiteButton(
-                    text=site['name'],
-                    size_hint=(None, None),
-                    size=(180, 45),
-                    background_color=(0.9, 0.95, 0.9, 1)  # 浅绿色背景突出显示
-                )
-                btn.bind(on_press=lambda instance, url=site['url']: self.open_website(url))
-                
-                grid.add_widget(btn)
-            
             self.update_status(f"找到 {len(sites)} 个匹配结果")
         except Exception as e:
             self.show_error_popup(f"搜索网站时出错: {str(e)}")
@@ -389,6 +645,8 @@ class MyApp(App):
     
     def add_website(self):
         """添加新网站"""
+        if not self.data_ready():
+            return
         try:
             name = self.root.ids.name_input.text.strip()
             url = self.root.ids.url_input.text.strip()
@@ -398,21 +656,239 @@ class MyApp(App):
                 self.show_error_popup("名称和URL不能为空！")
                 return
             
-            new_site = self.manager.add_website(name, url, category)
+            self.manager.add_website(name, url, category)
             self.populate_website_list()
+            self.refresh_categories()
             self.root.ids.name_input.text = ""
             self.root.ids.url_input.text = ""
+            self._suggested_category = None
             self.update_status(f"已添加网站: {name}")
         except ValueError as e:
             self.show_error_popup(str(e))
         except Exception as e:
             self.show_error_popup(f"添加网站失败: {str(e)}")
     
+    def show_completions(self, field):
+        """名称/URL 输入框的联想：前缀树中常用度最高的几个补全"""
+        widget = self.root.ids[f"{field}_input"]
+        if self.manager is None or not widget.focus:
+            return  # 程序设置文字（选中补全、添加后清空）时不弹出
+        text = widget.text.strip()
+        try:
+            if field == "url":
+                completions = self.manager.complete_url(text)
+                self.apply_category_suggestion(text)
+            else:
+                completions = self.manager.complete_name(text)
+        except Exception as e:
+            print(f"输入联想失败: {str(e)}")
+            return
+        completions = [c for c in completions if c != text]
+        dropdown = self._completions.get(field)
+        if dropdown is None:
+            dropdown = self._completions[field] = DropDown()
+        dropdown.clear_widgets()
+        if not completions:
+            if dropdown.parent is not None:
+                dropdown.dismiss()
+            return
+        for completion in completions:
+            button = Button(text=completion, size_hint_y=None, height=40,
+                            font_name='MicrosoftYaHei')
+            button.bind(on_release=lambda btn: self.choose_completion(field, btn.text))
+            dropdown.add_widget(button)
+        if dropdown.parent is None:
+            dropdown.open(widget)
+    
+    def choose_completion(self, field, text):
+        """选中一个补全，URL 同时按主机名推荐分类"""
+        self._completions[field].dismiss()
+        self.root.ids[f"{field}_input"].text = text
+        if field == "url":
+            self.apply_category_suggestion(text)
+    
+    def apply_category_suggestion(self, url):
+        """分类还是默认值或上次推荐的值时，换成按主机名推荐的分类"""
+        spinner = self.root.ids.category_spinner
+        if spinner.text not in ("其他", self._suggested_category):
+            return
+        category = self.manager.suggest_category(url) if url else None
+        if category is not None:
+            spinner.text = self._suggested_category = category
+    
+    def show_import_popup(self):
+        """选择要导入的书签文件"""
+        if not self.data_ready():
+            return
+        Factory.ImportPopup().open()
+    
+    def import_bookmarks(self, selection):
+        """在后台线程导入书签，进度显示在状态栏"""
+        if not selection:
+            return
+        path = selection[0]
+        
+        def progress(read, valid, rejected, fraction):
+            message = f"正在导入: {fraction:.0%}，已读取 {read} 个，有效 {valid} 个，无效 {rejected} 个"
+            Clock.schedule_once(lambda dt: self.update_status(message))
+        
+        def worker():
+            try:
+                records = BookmarkImporter(progress=progress).run(path)
+                message = f"正在整理导入的 {len(records)} 个网站"
+                Clock.schedule_once(lambda dt: self.update_status(message))
+                # 去重、备份和建立索引也在后台线程做，界面线程只换上结果
+                prepared = self.manager.prepare_import(records)
+            except Exception as e:
+                message = f"导入书签失败: {str(e)}"
+                Clock.schedule_once(lambda dt: self.show_error_popup(message))
+                return
+            Clock.schedule_once(lambda dt: self.finish_import(records, prepared))
+        
+        self.update_status(f"正在导入: {os.path.basename(path)}")
+        threading.Thread(target=worker, name="bookmark-import", daemon=True).start()
+    
+    def finish_import(self, records, prepared):
+        """在界面线程中一次性写入后台线程准备好的网站"""
+        try:
+            new_sites = self.manager.finish_import(prepared)
+            self.populate_website_list()
+            self.refresh_categories()
+            skipped = len(records) - len(new_sites)
+            self.update_status(f"已导入 {len(new_sites)} 个网站，跳过 {skipped} 个重复网站")
+            self.build_indexes_in_background()
+        except Exception as e:
+            self.show_error_popup(f"导入书签失败: {str(e)}")
+    
+    def merge_duplicates(self):
+        """删除重复添加的网站（URL 规范化后相同）"""
+        if not self.data_ready():
+            return
+        try:
+            removed = self.manager.merge_duplicates()
+        except Exception as e:
+            self.show_error_popup(f"合并重复网站失败: {str(e)}")
+            return
+        if removed:
+            self.populate_website_list()
+            self.refresh_categories()
+        self.update_status(f"删除了 {len(removed)} 个重复网站")
+    
+    def undo_changes(self):
+        """撤销最近的一次修改（本次运行中没有修改时退回上一个备份版本）"""
+        if not self.data_ready():
+            return
+        self.show_confirm_popup("撤销最近的一次修改？", self._undo_confirmed)
+    
+    def _undo_confirmed(self):
+        try:
+            message = self.manager.undo()
+        except ValueError as e:
+            self.update_status(str(e))
+            return
+        except Exception as e:
+            self.show_error_popup(f"撤销失败: {str(e)}")
+            return
+        self.build_indexes_in_background()
+        self.populate_website_list()
+        self.refresh_categories()
+        self.update_status(message)
+    
+    def check_links(self):
+        """在后台检查链接，完成后刷新列表上的失效标记"""
+        if self._checking_links or not self.data_ready():
+            return
+        self._checking_links = True
+        urls = self.manager.all_urls()
+        
+        def progress(done, total):
+            message = f"正在检查链接: {done}/{total}"
+            Clock.schedule_once(lambda dt: self.update_status(message))
+        
+        def worker():
+            try:
+                results = self.manager.check_links(urls, progress)
+            except Exception as e:
+                message = f"检查链接失败: {str(e)}"
+                Clock.schedule_once(lambda dt: self.finish_check_links(None, message))
+                return
+            Clock.schedule_once(lambda dt: self.finish_check_links(results))
+        
+        self.update_status("正在检查链接...")
+        threading.Thread(target=worker, name="link-check", daemon=True).start()
+    
+    def finish_check_links(self, results, error=None):
+        """在界面线程中显示检查结果"""
+        self._checking_links = False
+        if error is not None:
+            self.show_error_popup(error)
+            return
+        self.root.ids.website_grid.refresh_from_data()
+        broken = sum(1 for status, _ in results.values() if status != ALIVE)
+        self.update_status(f"检查了 {len(results)} 个链接，{broken} 个失效或无法访问")
+    
+    def _on_key_down(self, window, key, scancode, codepoint, modifiers):
+        if key == KEY_F12:
+            self.toggle_metrics()
+            return True
+        return False
+    
+    def toggle_metrics(self):
+        """打开或关闭性能面板；关闭时同时停止计时和帧采样"""
+        if self._metrics_overlay is not None:
+            Window.remove_widget(self._metrics_overlay)
+            self._metrics_overlay = None
+            for event in self._metrics_events:
+                event.cancel()
+            self._metrics_events = []
+            self.metrics.disable()
+            return
+        self.metrics.enable()
+        self._metrics_overlay = Factory.MetricsOverlay()
+        Window.add_widget(self._metrics_overlay)
+        self._metrics_events = [
+            Clock.schedule_interval(lambda dt: self.metrics.add("frame", dt * 1000), 0),
+            Clock.schedule_interval(lambda dt: self.refresh_metrics(), METRICS_REFRESH),
+        ]
+        self.refresh_metrics()
+    
+    def refresh_metrics(self):
+        """刷新性能面板（固定在窗口左上角）"""
+        overlay = self._metrics_overlay
+        if overlay is None:
+            return
+        overlay.ids.metrics_text.text = self.metrics.text()
+        overlay.pos = (10, Window.height - overlay.height - 10)
+    
+    def export_metrics(self, fmt):
+        """把当前统计导出为 JSON 或 CSV 文件"""
+        path = os.path.join(METRICS_DIR, f"metrics-{time.strftime('%Y%m%d-%H%M%S')}.{fmt}")
+        try:
+            self.metrics.export(path)
+            self.update_status(f"性能统计已导出: {path}")
+        except Exception as e:
+            self.show_error_popup(f"导出性能统计失败: {str(e)}")
+    
     def update_status(self, message):
         """更新状态栏"""
         if hasattr(self, 'root') and hasattr(self.root, 'ids'):
             self.root.ids.status_label.text = message
     
+    def show_confirm_popup(self, message, on_confirm):
+        """显示确认弹窗，点击"确定"后调用 on_confirm()"""
+        content = BoxLayout(orientation='vertical', padding=10, spacing=10)
+        content.add_widget(Label(text=message, font_name='MicrosoftYaHei'))
+        buttons = BoxLayout(size_hint_y=None, height=45, spacing=10)
+        ok = Button(text="确定", font_name='MicrosoftYaHei')
+        cancel = Button(text="取消", font_name='MicrosoftYaHei')
+        buttons.add_widget(ok)
+        buttons.add_widget(cancel)
+        content.add_widget(buttons)
+        popup = Popup(title='确认', content=content, size_hint=(0.5, 0.35))
+        ok.bind(on_press=lambda instance: (popup.dismiss(), on_confirm()))
+        cancel.bind(on_press=lambda instance: popup.dismiss())
+        popup.open()
+    
     def show_error_popup(self, message):
         """显示错误弹窗"""
         popup = Popup(
@@ -0,0 +1,53 @@
+# tests/conftest.py
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """按 server.routes 应答；路径不在表中时返回 404"""
+    def _reply(self, with_body):
+        self.server.requests.append((self.command, self.path))
+        route = self.server.routes.get(self.path, (404, {}, b"not found"))
+        status, headers, body = route(self.command) if callable(route) else route
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if with_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._reply(True)
+
+    def do_HEAD(self):
+        self._reply(False)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    """本机上的 HTTP 服务器
+
+    server.routes[路径] = (状态码, 响应头, 内容)，或按请求方法返回这样三元组的函数；
+    server.requests 记下收到的 (方法, 路径)，server.url 为 http://127.0.0.1:端口。
+    """
+    monkeypatch.setenv("no_proxy", "*")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.daemon_threads = True
+    server.routes = {}
+    server.requests = []
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
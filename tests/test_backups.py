@@ -0,0 +1,74 @@
+# tests/test_backups.py
+import pytest
+
+from weblauncher.backups import BackupStore, site_lines
+from weblauncher.manager import SqliteWebsiteManager, WebsiteManager
+from weblauncher.records import Site
+
+
+def test_versions_share_unchanged_chunks(tmp_path):
+    store = BackupStore(str(tmp_path / "backups"))
+    sites = [Site(f"id{i}", f"网站{i}", f"https://s{i}.example.com", "测试") for i in range(3000)]
+    first = store.save(site_lines(sites), "保存")
+    assert store.save(site_lines(sites), "保存") is None  # 内容相同不另存
+
+    sites[-1] = sites[-1].replace(name="改名")
+    second = store.save(site_lines(sites), "保存")
+    assert second["written"] < first["written"]
+    assert [s["name"] for s in store.load(first["id"])][-1] == "网站2999"
+    assert [s["name"] for s in store.load(second["id"])][-1] == "改名"
+    assert [v["id"] for v in store.versions()] == [second["id"], first["id"]]
+
+
+@pytest.mark.parametrize("backend", [WebsiteManager, SqliteWebsiteManager])
+def test_undo_reverts_only_the_last_change(tmp_path, backend):
+    manager = backend(str(tmp_path))
+    manager.save_websites()
+    kept = manager.add_website("保留", "https://kept.example.com")
+    victim = manager.add_website("误删", "https://victim.example.com")
+    manager.update_website(kept["id"], name="改过的名字")
+    manager.delete_website(victim["id"])
+
+    assert manager.undo() == "已撤销删除「误删」"
+    assert manager.get_site(victim["id"])["name"] == "误删"
+    assert manager.get_site(kept["id"])["name"] == "改过的名字"  # 之前的修改都还在
+
+    assert manager.undo() == "已撤销修改「保留」"
+    assert manager.get_site(kept["id"])["name"] == "保留"
+    manager.undo()
+    assert manager.get_site(victim["id"]) is None
+    assert manager.find_duplicate("https://kept.example.com") is not None
+    manager.close()
+
+    reloaded = backend(str(tmp_path))
+    assert reloaded.get_site(kept["id"])["name"] == "保留"
+    assert reloaded.get_site(victim["id"]) is None
+    reloaded.close()
+
+
+@pytest.mark.parametrize("backend", [WebsiteManager, SqliteWebsiteManager])
+def test_undo_import_keeps_earlier_edits(tmp_path, backend):
+    manager = backend(str(tmp_path), backups=BackupStore(str(tmp_path / "backups")))
+    mine = manager.add_website("导入前添加", "https://mine.example.com")
+    count = len(manager.websites)
+    manager.add_websites([("甲", "https://a.example.com", "工具"), ("乙", "https://b.example.com", "工具")])
+
+    assert manager.undo() == "已撤销导入的 2 个网站"
+    assert len(manager.websites) == count
+    assert manager.get_site(mine["id"])["name"] == "导入前添加"
+    assert manager.find_duplicate("https://a.example.com") is None
+    manager.close()
+
+
+def test_without_backups_only_single_edits_undo(tmp_path):
+    manager = WebsiteManager(str(tmp_path))
+    manager.add_websites([("乙", "https://b.example.com", "工具")])
+    mine = manager.add_website("甲", "https://a.example.com")
+
+    assert manager.list_backups() == []
+    assert manager.undo() == "已撤销添加「甲」"
+    assert manager.get_site(mine["id"]) is None
+    with pytest.raises(ValueError):
+        manager.undo()  # 导入前没有备份，不能撤销
+    assert manager.find_duplicate("https://b.example.com")["name"] == "乙"
+    manager.close()
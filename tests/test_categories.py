@@ -0,0 +1,60 @@
+# tests/test_categories.py
+from weblauncher.categories import (ALL_CATEGORY, DEFAULT_CATEGORIES, FREQUENT_CATEGORY,
+                                    CategoryIndex, category_choices, navigation_order)
+
+
+def site(n, category):
+    return {"id": f"id{n}", "name": f"site{n}", "url": f"https://s{n}.example.com",
+            "category": category}
+
+
+def ids(sites):
+    return [s["id"] for s in sites]
+
+
+def test_buckets_keep_insertion_order_and_counts():
+    index = CategoryIndex([site(1, "视频"), site(2, "工具"), site(3, "视频"), site(4, "自定义")])
+    assert ids(index.sites("视频")) == ["id1", "id3"]
+    assert index.sites("不存在") == []
+    assert index.count("视频") == 2
+    assert index.count(ALL_CATEGORY) == 4
+    assert index.categories() == sorted(["视频", "工具", "自定义"])
+
+
+def test_remove_drops_empty_category():
+    index = CategoryIndex([site(1, "视频"), site(2, "工具")])
+    assert index.remove(site(2, "工具"))
+    assert not index.remove(site(2, "工具"))
+    assert index.categories() == ["视频"]
+    assert index.count(ALL_CATEGORY) == 1
+
+
+def test_update_keeps_position_or_moves_bucket():
+    index = CategoryIndex([site(1, "视频"), site(2, "视频"), site(3, "视频")])
+    renamed = dict(site(1, "视频"), name="改名")
+    index.update(site(1, "视频"), renamed)
+    assert ids(index.sites("视频")) == ["id1", "id2", "id3"]
+    assert index.sites("视频")[0]["name"] == "改名"
+
+    index.update(site(2, "视频"), site(2, "音乐"))
+    assert ids(index.sites("视频")) == ["id1", "id3"]
+    assert ids(index.sites("音乐")) == ["id2"]
+    assert index.count(ALL_CATEGORY) == 3
+
+
+def test_site_without_category_goes_to_other():
+    index = CategoryIndex([{"id": "a", "name": "甲", "url": "https://a.example.com"}])
+    assert ids(index.sites("其他")) == ["a"]
+
+
+def test_navigation_and_choices():
+    assert navigation_order(["工具", "我的", "视频"]) == [FREQUENT_CATEGORY, "我的", ALL_CATEGORY,
+                                                   "工具", "视频"]
+    choices = category_choices(["工具", "自定义", ALL_CATEGORY])
+    assert choices == DEFAULT_CATEGORIES + ["自定义"]
+
+
+def test_find_by_id():
+    index = CategoryIndex([site(1, "视频"), site(2, "工具")])
+    assert index.find("id2")["category"] == "工具"
+    assert index.find("id9") is None
@@ -0,0 +1,91 @@
+# tests/test_complete.py
+import random
+
+import pytest
+
+from weblauncher.complete import PrefixTrie, SiteCompleter
+from weblauncher.records import Site
+
+
+def brute_force(scores, prefix, k):
+    words = sorted((w for w in scores if w.startswith(prefix)), key=lambda w: (-scores[w], w))
+    return words[:k]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_prefix_trie_matches_brute_force(seed):
+    """随机增删、调整得分后，每个前缀的补全与逐个比较的结果一致"""
+    rnd = random.Random(seed)
+    trie = PrefixTrie(k=4)
+    scores = {}
+    alphabet = "abc./"
+    for _ in range(400):
+        word = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(1, 6)))
+        if rnd.random() < 0.3 and scores:
+            victim = rnd.choice(sorted(scores))
+            trie.remove(victim)
+            del scores[victim]
+        else:
+            scores[word] = rnd.choice([1.0, 2.0, 3.0, rnd.random() * 5])
+            trie.add(word, scores[word])
+        prefix = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 3)))
+        assert trie.complete(prefix) == brute_force(scores, prefix, 4)
+    assert len(trie) == len(scores)
+    for prefix in ["", "a", "ab", "b.", "c/"]:
+        assert trie.complete(prefix, 2) == brute_force(scores, prefix, 2)
+
+
+def test_prefix_trie_splits_edges():
+    trie = PrefixTrie()
+    trie.add("github.com", 1)
+    trie.add("gitee.com", 2)
+    trie.add("git", 1)
+    assert trie.complete("git") == ["gitee.com", "git", "github.com"]
+    assert trie.complete("gith") == ["github.com"]
+    assert trie.complete("gix") == []
+    trie.remove("gitee.com")
+    assert trie.complete("gi") == ["git", "github.com"]
+
+
+def sites():
+    return [Site("1", "百度网盘", "https://pan.baidu.com/disk/home", "工具"),
+            Site("2", "百度", "https://www.baidu.com", "搜索"),
+            Site("3", "GitHub", "https://github.com/explore", "技术"),
+            Site("4", "GitHub Docs", "https://docs.github.com/en", "技术")]
+
+
+def test_complete_urls_and_names():
+    completer = SiteCompleter(sites())
+    assert completer.complete_url("https://www.bai") == ["https://www.baidu.com"]
+    assert completer.complete_url("pan.baidu.com/d") == ["https://pan.baidu.com/disk",
+                                                         "https://pan.baidu.com/disk/home"]
+    assert completer.complete_url("git") == ["https://github.com", "https://github.com/explore"]
+    assert completer.complete_name("bdwp") == ["百度网盘"]
+    assert completer.complete_name("百度") == ["百度", "百度网盘"]
+    assert completer.complete_name("git hub") == ["GitHub", "GitHub Docs"]
+    assert completer.complete_url("") == [] and completer.complete_name("  ") == []
+
+
+def test_suggest_category_uses_parent_domains():
+    completer = SiteCompleter(sites())
+    assert completer.suggest_category("pan.baidu.com/s/abc") == "工具"
+    assert completer.suggest_category("https://map.baidu.com") in ("工具", "搜索")
+    assert completer.suggest_category("gist.github.com") == "技术"
+    assert completer.suggest_category("example.org") is None
+
+
+def test_touch_and_remove_update_ranking():
+    usage = {}
+    completer = SiteCompleter(sites(), score=lambda site_id: 1.0 + usage.get(site_id, 0))
+    assert completer.complete_name("git") == ["GitHub", "GitHub Docs"]
+
+    usage["4"] = 5
+    completer.touch(sites()[3])
+    assert completer.complete_name("git") == ["GitHub Docs", "GitHub"]
+
+    completer.remove(sites()[3])
+    assert completer.complete_name("git") == ["GitHub"]
+    assert completer.complete_url("docs.") == []
+    completer.update(sites()[2], sites()[2].replace(name="代码托管"))
+    assert completer.complete_name("git") == []
+    assert completer.complete_name("dmtg") == ["代码托管"]
@@ -0,0 +1,83 @@
+# tests/test_database.py
+import pytest
+
+from weblauncher.database import SiteDatabase
+from weblauncher.records import Site
+
+SITES = [Site("a", "百度地图", "https://map.baidu.com", "工具"),
+         Site("b", "GitHub", "https://github.com", "技术"),
+         Site("c", "50%折扣", "https://sale.example.com", "购物"),
+         Site("d", "哔哩哔哩", "https://www.bilibili.com", "视频"),
+         Site("e", "a_b 工具", "https://ab.example.com", "工具")]
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = SiteDatabase(str(tmp_path / "sites.db"))
+    db.import_sites(SITES)
+    yield db
+    db.close()
+
+
+def ids(rows):
+    return [site.id for site in rows]
+
+
+def scan(keyword):
+    keyword = keyword.lower()
+    return [s.id for s in SITES if keyword in s.name.lower() or keyword in s.url.lower()]
+
+
+KEYWORDS = ["百度", "baidu", "GITHUB", ".com", "哔哩", "%", "50%", "_", "a_b", "b", "不存在"]
+
+
+def test_search_matches_substring_scan(db):
+    assert db.fts
+    for keyword in KEYWORDS:
+        assert ids(db.search(keyword)) == scan(keyword), keyword
+
+
+def test_like_fallback_without_fts5(db):
+    db.fts = False
+    for keyword in KEYWORDS:
+        assert ids(db.search(keyword)) == scan(keyword), keyword
+
+
+def test_fts_follows_updates_and_deletes(db):
+    db.update(SITES[1].replace(name="GitLab", url="https://gitlab.com"))
+    assert db.delete("a")
+    assert not db.delete("a")
+    assert ids(db.search("github")) == []
+    assert ids(db.search("gitlab")) == ["b"]
+    assert ids(db.search("baidu")) == []
+    assert db.count() == 4
+
+
+def test_views_are_ordered_and_paged(db):
+    assert ids(db.all()) == ["a", "b", "c", "d", "e"]
+    assert ids(db.category("工具")) == ["a", "e"]
+    assert db.category_counts() == {"工具": 2, "技术": 1, "购物": 1, "视频": 1}
+    assert db.get("d") == SITES[3]
+    assert db.get("x") is None
+    rows = db.all()
+    assert rows[-1].id == "e"
+    assert ids(rows[1:3]) == ["b", "c"]
+
+
+def test_prefix_search_ranks_pinyin_and_initials(db):
+    assert ids(db.prefix_search("baidu")) == ["a"]
+    assert ids(db.prefix_search("bl")) == ["d"]
+    assert ids(db.prefix_search("git")) == ["b"]
+    assert ids(db.prefix_search(" ")) == []
+
+
+def test_changed_sees_other_connection(tmp_path, db):
+    assert not db.changed()
+    other = SiteDatabase(db.db_file)
+    try:
+        other.add(Site("f", "知乎", "https://www.zhihu.com", "社交"))
+    finally:
+        other.close()
+    assert db.changed()
+    assert not db.changed()
+    assert ids(db.category("社交")) == ["f"]
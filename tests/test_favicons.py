@@ -0,0 +1,88 @@
+# tests/test_favicons.py
+import os
+import threading
+import time
+
+from weblauncher import favicons
+from weblauncher.favicons import FaviconCache, FaviconFetcher, site_origin, sniff_image
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 60
+GIF = b"GIF89a" + b"\x00" * 30
+
+
+def new_fetcher(tmp_path, **kwargs):
+    return FaviconFetcher(FaviconCache(str(tmp_path / "favicons")).load(), timeout=5, **kwargs)
+
+
+def test_site_origin_and_sniff():
+    assert site_origin("https://Example.com:8443/a?b") == "https://example.com:8443"
+    assert site_origin("https://例子.测试/") == "https://xn--fsqu00a.xn--0zwm56d"
+    assert site_origin("ftp://example.com") is None
+    assert sniff_image(PNG) == "png" and sniff_image(b"<html>") is None
+
+
+def test_fetch_favicon_ico(stub_server, tmp_path):
+    stub_server.routes["/favicon.ico"] = (200, {"Content-Type": "image/png"}, PNG)
+    assert new_fetcher(tmp_path).fetch(stub_server.url) == (PNG, "png")
+
+
+def test_fetch_falls_back_to_icon_link(stub_server, tmp_path):
+    page = b'<html><head><link rel="shortcut icon" href="static/i.gif"></head></html>'
+    stub_server.routes.update({
+        "/favicon.ico": (200, {"Content-Type": "text/html"}, b"<html>not an icon</html>"),
+        "/": (200, {"Content-Type": "text/html; charset=utf-8"}, page),
+        "/static/i.gif": (200, {}, GIF),
+    })
+    assert new_fetcher(tmp_path).fetch(stub_server.url) == (GIF, "gif")
+
+
+def test_fetch_rejects_oversized_icon(stub_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(favicons, "FAVICON_MAX_BYTES", 32)
+    stub_server.routes["/favicon.ico"] = (200, {}, PNG)
+    assert new_fetcher(tmp_path).fetch(stub_server.url) is None
+
+
+def test_request_downloads_once_and_caches(stub_server, tmp_path):
+    gate = threading.Event()
+    # 第二次请求时第一次下载还没完成
+    stub_server.routes["/favicon.ico"] = lambda method: gate.wait(5) and (200, {}, PNG)
+    ready = threading.Event()
+    results = []
+    fetcher = new_fetcher(tmp_path, on_ready=lambda *args: (results.append(args), ready.set()))
+    url = stub_server.url + "/some/page"
+
+    assert fetcher.request(url) is None
+    assert fetcher.request(url) is None  # 同一站点正在下载，不重复下载
+    gate.set()
+    assert ready.wait(5)
+    path, ext = fetcher.request(url)
+    assert ext == "png" and open(path, "rb").read() == PNG
+    assert results == [(stub_server.url, path, "png")]
+    assert stub_server.requests.count(("GET", "/favicon.ico")) == 1
+    fetcher.shutdown(wait=True)
+
+
+def test_missing_icon_is_retried_after_ttl(stub_server, tmp_path):
+    fetcher = new_fetcher(tmp_path)
+    fetcher.request(stub_server.url)
+    fetcher.shutdown(wait=True)
+
+    cache = fetcher.cache
+    assert cache.get(stub_server.url) is None
+    assert not cache.needs_fetch(stub_server.url)
+    assert cache.needs_fetch(stub_server.url, now=time.time() + cache.miss_ttl)
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = FaviconCache(str(tmp_path), max_bytes=250).load()
+    for name in ("a", "b", "c"):
+        cache.put(f"https://{name}.example.com", b"\x00" * 100, "png")
+        time.sleep(0.01)
+    assert cache.get("https://a.example.com") is None  # 超出上限，最久未用的被删除
+    assert cache.get("https://b.example.com") is not None
+    cache.put("https://d.example.com", b"\x00" * 100, "png")
+
+    reloaded = FaviconCache(str(tmp_path), max_bytes=250).load()
+    assert reloaded.get("https://c.example.com") is None  # b 刚用过，c 被淘汰
+    assert reloaded.get("https://b.example.com") is not None
+    assert reloaded.total == 200 and len(os.listdir(tmp_path)) == 2
@@ -0,0 +1,69 @@
+# tests/test_fuzzy.py
+import pytest
+
+from weblauncher import pinyin
+from weblauncher.fuzzy import FuzzyIndex, merge_ranked, within_distance
+
+
+def site(n, name):
+    return {"id": f"id{n}", "name": name, "url": f"https://s{n}.example.com", "category": "测试"}
+
+
+def names(sites):
+    return [s["name"] for s in sites]
+
+
+@pytest.fixture
+def no_pypinyin(monkeypatch):
+    monkeypatch.setattr(pinyin, "lazy_pinyin", None)
+    pinyin.char_pinyin.cache_clear()
+    yield
+    pinyin.char_pinyin.cache_clear()
+
+
+def test_tiers_rank_prefix_before_initials_subsequence_and_typos():
+    index = FuzzyIndex([site(1, "xaxbxc"), site(2, "axbyc"), site(3, "Abcdef"),
+                        site(4, "abd"), site(5, "阿波次"), site(6, "abc 工具")])
+    # 名称前缀（短的在前）> 首字母 > 子序列 > 拼写错误
+    assert names(index.search("abc")) == ["abc 工具", "Abcdef", "阿波次", "axbyc", "abd"]
+    assert names(index.search("ABC", k=1)) == ["abc 工具"]
+    assert index.search("zzz") == []
+    assert names(index.search("xxc")) == ["xaxbxc"]
+    assert index.search("  ") == []
+
+
+def test_pinyin_prefix_and_initials():
+    index = FuzzyIndex([site(1, "百度地图"), site(2, "哔哩哔哩"), site(3, "bd工具")])
+    assert names(index.search("baidu")) == ["百度地图"]
+    assert names(index.search("bl")) == ["哔哩哔哩"]
+    assert names(index.search("bd")) == ["bd工具", "百度地图"]
+
+
+def test_initials_without_pypinyin(no_pypinyin):
+    assert pinyin.name_keys("百度 地图") == ("", "bddt")
+    assert pinyin.name_keys("QQ音乐") == ("", "qqyl")
+    index = FuzzyIndex([site(1, "百度地图")])
+    assert names(index.search("bddt")) == ["百度地图"]
+    assert index.search("baidu") == []
+
+
+def test_add_remove_update():
+    index = FuzzyIndex([site(1, "知乎"), site(2, "知网")])
+    assert not index.remove("id9")
+    assert index.remove("id1")
+    assert names(index.search("zh")) == ["知网"]
+    index.update(site(2, "豆瓣"))
+    assert index.search("zh") == []
+    assert names(index.search("db")) == ["豆瓣"]
+    index.add_many([site(3, "知乎"), site(2, "知网")])
+    assert names(index.search("zh")) == ["知乎", "知网"]
+    assert len(index.keys) == len({key for key in index.keys})
+
+
+def test_within_distance_and_merge_ranked():
+    assert within_distance("github", "gihtub", 2) == 2
+    assert within_distance("github", "gitlab", 1) is None
+    assert within_distance("abc", "abcdef", 2) is None
+    ranked = [site(2, "乙")]
+    assert names(merge_ranked(ranked, [site(1, "甲"), site(2, "乙"), site(3, "丙")])) == \
+        ["乙", "甲", "丙"]
@@ -0,0 +1,67 @@
+# tests/test_health.py
+import socket
+import time
+
+from weblauncher.health import ALIVE, BROKEN, UNREACHABLE, HealthCache, LinkChecker, check_links
+
+
+def closed_port_url():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}/"
+
+
+def test_link_checker_statuses(stub_server):
+    stub_server.routes.update({
+        "/ok": (200, {}, b"ok"),
+        "/no-head": lambda method: (405, {}, b"") if method == "HEAD" else (200, {}, b"ok"),
+        "/moved": (302, {"Location": "/ok"}, b""),
+        "/loop": (301, {"Location": "/loop"}, b""),
+        "/private": (403, {}, b""),
+        "/error": (500, {}, b""),
+        "/page?q=1": (200, {}, b"ok"),
+    })
+    base = stub_server.url
+    urls = [base + path for path in ("/ok", "/no-head", "/moved", "/loop", "/private",
+                                      "/missing", "/error", "/page?q=1")]
+    dead = closed_port_url()
+    results = LinkChecker(host_interval=0, timeout=5).run(urls + [dead])
+
+    assert results == {
+        base + "/ok": (ALIVE, 200),
+        base + "/no-head": (ALIVE, 200),   # 不支持 HEAD 时用 GET 确认
+        base + "/moved": (ALIVE, 200),
+        base + "/loop": (BROKEN, 301),
+        base + "/private": (ALIVE, 403),   # 在线但拒绝匿名访问
+        base + "/missing": (BROKEN, 404),
+        base + "/error": (BROKEN, 500),
+        base + "/page?q=1": (ALIVE, 200),
+        dead: (UNREACHABLE, None),
+    }
+    assert ("GET", "/no-head") in stub_server.requests
+    assert ("GET", "/ok") not in stub_server.requests
+
+
+def test_same_host_requests_are_spaced(stub_server):
+    stub_server.routes.update({"/a": (200, {}, b""), "/b": (200, {}, b"")})
+    start = time.monotonic()
+    LinkChecker(host_interval=0.2).run([stub_server.url + "/a", stub_server.url + "/b"])
+    assert time.monotonic() - start >= 0.2
+
+
+def test_check_links_only_rechecks_stale_entries(stub_server, tmp_path):
+    stub_server.routes["/ok"] = (200, {}, b"ok")
+    urls = [stub_server.url + "/ok", stub_server.url + "/missing"]
+    cache = HealthCache(str(tmp_path / "link_health.json"), ttl=3600).load()
+    progress = []
+
+    results = check_links(urls, cache, LinkChecker(host_interval=0), progress=lambda *a: progress.append(a))
+    assert set(results) == set(urls)
+    assert progress[-1] == (2, 2)
+    assert cache.badge(urls[1]) == "[失效]" and cache.badge(urls[0]) == ""
+
+    checked = len(stub_server.requests)
+    reloaded = HealthCache(cache.path, ttl=3600).load()
+    assert check_links(urls, reloaded, LinkChecker(host_interval=0)) == {}
+    assert len(stub_server.requests) == checked
+    assert reloaded.stale(urls, now=time.time() + 7200) == urls
@@ -0,0 +1,76 @@
+# tests/test_importer.py
+import io
+import json
+
+import pytest
+
+from weblauncher import importer
+from weblauncher.importer import BookmarkImporter, _json_events, iter_bookmarks_json
+
+CHROME = {"roots": {
+    "bookmark_bar": {"type": "folder", "name": "书签栏", "children": [
+        {"type": "url", "name": "GitHub", "url": "https://github.com", "date_added": 13300000000},
+        {"type": "folder", "children": [
+            {"type": "url", "name": "引号\"与\\反斜杠", "url": "https://example.com/docs"},
+            {"type": "url", "name": "无效", "url": "javascript:void(0)"},
+        ], "name": "技术"},
+    ]},
+    "other": {"type": "folder", "name": "其他书签", "children": [], "visible": True, "x": None},
+}}
+
+
+def test_json_events_match_json_module():
+    text = json.dumps(CHROME, ensure_ascii=False)
+    events = list(_json_events(io.StringIO(text)))
+    assert events[0] == ("", "start_map", None)
+    assert ("", "map_key", "roots") in events
+    assert ("", "string", "引号\"与\\反斜杠") in events
+    assert ("", "number", 13300000000) in events
+    assert ("", "boolean", True) in events and ("", "null", None) in events
+    assert events[-1] == ("", "end_map", None)
+
+
+@pytest.mark.parametrize("chunk", [1, 7, 64 * 1024])
+def test_json_bookmarks_without_ijson(monkeypatch, chunk):
+    monkeypatch.setattr(importer, "ijson", None)
+    monkeypatch.setattr(importer, "READ_CHUNK", chunk)
+    text = json.dumps(CHROME, ensure_ascii=False, indent=1)
+    items = list(iter_bookmarks_json(io.StringIO(text)))
+    # 文件夹名称读完整个文件才确定
+    items = [(name, url, folder if isinstance(folder, str) else folder.name)
+             for name, url, folder in items]
+    assert items == [("GitHub", "https://github.com", "书签栏"),
+                     ("引号\"与\\反斜杠", "https://example.com/docs", "技术"),
+                     ("无效", "javascript:void(0)", "技术")]
+
+
+def test_json_events_reject_truncated_file():
+    with pytest.raises(ValueError):
+        list(_json_events(io.StringIO('{"roots": {"a": [1, 2')))
+    with pytest.raises(ValueError):
+        list(_json_events(io.StringIO('{"name": "未结束')))
+
+
+def test_import_formats(tmp_path, monkeypatch):
+    monkeypatch.setattr(importer, "ijson", None)
+    html = tmp_path / "bookmarks.html"
+    html.write_text('<!DOCTYPE NETSCAPE-Bookmark-file-1>\n<DL><p>\n<DT><H3>书签栏</H3>\n<DL><p>\n'
+                    '<DT><A HREF="https://a.example.com">甲</A>\n<DT><H3>新闻</H3>\n<DL><p>\n'
+                    '<DT><A HREF="https://b.example.com">乙</A>\n</DL><p>\n</DL><p>\n</DL><p>\n',
+                    encoding="utf-8")
+    chrome = tmp_path / "Bookmarks.json"
+    chrome.write_text(json.dumps(CHROME, ensure_ascii=False), encoding="utf-8")
+    table = tmp_path / "sites.csv"
+    table.write_text("name,url,folder\n丙,https://c.example.com,购物\n坏,not a url,购物\n",
+                     encoding="utf-8")
+    progress = []
+
+    def run(path):
+        return BookmarkImporter(progress=lambda *args: progress.append(args)).run(str(path))
+
+    assert run(html) == [("甲", "https://a.example.com", "其他"),
+                         ("乙", "https://b.example.com", "新闻")]
+    assert run(chrome) == [("GitHub", "https://github.com", "其他"),
+                           ("引号\"与\\反斜杠", "https://example.com/docs", "技术")]
+    assert run(table) == [("丙", "https://c.example.com", "购物")]
+    assert progress[-1] == (2, 1, 1, 1.0)
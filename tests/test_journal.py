@@ -0,0 +1,162 @@
+# tests/test_journal.py
+import json
+import random
+
+import pytest
+
+from weblauncher.journal import SiteJournal
+from weblauncher.manager import WebsiteManager
+
+
+def site(n, name=None):
+    return {"id": f"id{n}", "name": name or f"site{n}", "url": f"https://s{n}.example.com",
+            "category": "测试"}
+
+
+def new_journal(tmp_path, sites=()):
+    journal = SiteJournal(str(tmp_path / "custom_sites.json"))
+    with journal.lock:
+        journal.write_snapshot(list(sites))
+    return journal
+
+
+def names(sites):
+    return {s["id"]: s["name"] for s in sites}
+
+
+def test_replay_applies_journal_over_snapshot(tmp_path):
+    journal = new_journal(tmp_path, [site(1), site(2)])
+    journal.append("add", site=site(3))
+    journal.append("update", id="id1", fields={"name": "改名"})
+    journal.append("delete", id="id2")
+
+    loaded = SiteJournal(journal.data_file).load()
+    assert names(loaded) == {"id1": "改名", "id3": "site3"}
+
+
+def test_replay_skips_torn_last_line(tmp_path):
+    journal = new_journal(tmp_path, [site(1)])
+    journal.append("add", site=site(2))
+    with open(journal.journal_file, "ab") as f:
+        f.write(b'{"seq": 9, "op": "add", "si')
+
+    assert names(SiteJournal(journal.data_file).load()) == {"id1": "site1", "id2": "site2"}
+
+
+def test_legacy_duplicate_and_missing_ids_get_fresh_ids(tmp_path):
+    data_file = tmp_path / "custom_sites.json"
+    legacy = [{"id": "我的_1", "name": "A站", "url": "https://a.example.com", "category": "我的"},
+              {"id": "我的_1", "name": "B站", "url": "https://b.example.com", "category": "我的"},
+              {"name": "C站", "url": "https://c.example.com"}]
+    data_file.write_text("".join(json.dumps(s, ensure_ascii=False) + "\n" for s in legacy),
+                         encoding="utf-8")
+
+    journal = SiteJournal(str(data_file))
+    loaded = journal.load()
+    assert sorted(s["name"] for s in loaded) == ["A站", "B站", "C站"]
+    assert len({s["id"] for s in loaded}) == 3
+    assert journal.renamed == 2
+    # 同样的内容得到同样的ID（几个进程同时迁移时一致）
+    assert names(SiteJournal(str(data_file)).load()) == names(loaded)
+
+    manager = WebsiteManager(str(tmp_path))
+    manager.close()
+    reloaded = WebsiteManager(str(tmp_path))
+    assert names(reloaded.websites) == names(loaded)
+    reloaded.close()
+
+
+def test_compact_folds_journal_into_snapshot(tmp_path):
+    journal = new_journal(tmp_path, [site(1)])
+    journal.append("add", site=site(2))
+    sites = journal.load()
+    assert journal.compact(sites)
+
+    assert journal.snapshot_seq() == 1
+    assert journal.is_clean()
+    assert not [path for path in journal._journal_files() if path != journal.journal_file]
+    assert names(SiteJournal(journal.data_file).load()) == {"id1": "site1", "id2": "site2"}
+
+
+def test_compact_refuses_with_unmerged_peer_records(tmp_path):
+    a = new_journal(tmp_path, [site(1)])
+    b = SiteJournal(a.data_file)
+    sites = a.load()
+    b.load()
+    b.append("add", site=site(2))
+
+    assert not a.compact(sites)
+    assert [entry["op"] for entry in a.read_new()] == ["add"]
+
+
+def test_append_after_peer_compaction_follows_snapshot_seq(tmp_path):
+    a = new_journal(tmp_path, [site(1)])
+    b = SiteJournal(a.data_file)
+    a.load()
+    a.append("add", site=site(2))
+    sites = b.load()
+    # b 合并并删掉了 a 读过的日志，又有新的记录；a 再写入时序号要接在快照后面
+    b.append("add", site=site(3))
+    assert b.compact(sites + [site(3)])
+    b.append("update", id="id1", fields={"name": "b改名"})
+    a.append("delete", id="id2")
+
+    assert a.needs_reload
+    assert a.seq > a.snapshot_seq()
+    assert names(SiteJournal(a.data_file).load()) == {"id1": "b改名", "id3": "site3"}
+
+
+def test_read_new_sees_records_in_rotated_file(tmp_path):
+    a = new_journal(tmp_path, [site(1)])
+    b = SiteJournal(a.data_file)
+    a.load()
+    b.load()
+    b.append("add", site=site(2))
+    b._rotate(b.load())  # 轮转后还没写快照（后台压缩进行中）
+    b.append("add", site=site(3))
+
+    entries = a.read_new()
+    assert [entry["site"]["id"] for entry in entries] == ["id2", "id3"]
+    assert not a.needs_reload
+
+
+def random_edits(managers, rnd, steps):
+    n = 0
+    for step in range(steps):
+        manager = rnd.choice(managers)
+        op = rnd.random()
+        sites = list(manager.websites)
+        if op < 0.5:
+            n += 1
+            manager.add_website(f"s{n}", f"https://s{n}.example.com", "测试")
+        elif op < 0.7 and sites:
+            manager.delete_website(rnd.choice(sites)["id"])
+        elif op < 0.9 and sites:
+            manager.update_website(rnd.choice(sites)["id"], name=f"u{step}")
+        else:
+            manager.save_websites()
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("threshold", [2000, 10 ** 9])
+def test_two_managers_converge(tmp_path, seed, threshold):
+    """两个进程（两个 WebsiteManager）交替修改同一目录，最后与重新加载的结果一致"""
+    managers = [WebsiteManager(str(tmp_path), flush_interval=0.01) for _ in range(2)]
+    try:
+        for manager in managers:
+            manager.journal.compact_threshold = threshold
+        random_edits(managers, random.Random(seed), 150)
+        for manager in managers:
+            manager.flush()
+        for manager in managers:
+            manager.sync()
+        for manager in managers:
+            manager.journal.wait()
+        fresh = WebsiteManager(str(tmp_path))
+        expected = names(fresh.websites)
+        assert names(managers[0].websites) == expected
+        assert names(managers[1].websites) == expected
+        fresh.writer.stop()
+    finally:
+        for manager in managers:
+            manager.writer.stop()
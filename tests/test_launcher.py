@@ -0,0 +1,50 @@
+# tests/test_launcher.py
+import threading
+import time
+
+from weblauncher.launcher import BrowserLauncher
+
+
+def test_open_many_limits_concurrency():
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def opener(url):
+        with lock:
+            running.append(url)
+            peak.append(len(running))
+        time.sleep(0.01)
+        with lock:
+            running.remove(url)
+        return url != "https://bad.example.com"
+
+    launcher = BrowserLauncher(workers=2, rate=0, opener=opener)
+    finished = threading.Event()
+    results = []
+    urls = [f"https://s{i}.example.com" for i in range(9)] + ["https://bad.example.com"]
+    batch = launcher.open_many(urls, on_finished=lambda *args: (results.append(args), finished.set()))
+    assert finished.wait(5)
+    assert results == [(9, 1, False)]
+    assert max(peak) <= 2 and not batch.cancelled
+    launcher.shutdown()
+
+
+def test_shutdown_during_batches_cancels_them(monkeypatch):
+    """关闭时正在派发的批次不再向已关闭的线程池提交"""
+    errors = []
+    monkeypatch.setattr(threading, "excepthook", lambda args: errors.append(args.exc_value))
+    for _ in range(20):
+        launcher = BrowserLauncher(workers=2, rate=1000, opener=lambda url: True)
+        finished = []
+        batches = [launcher.open_many([f"https://s{i}.example.com" for i in range(200)],
+                                      on_finished=lambda *args: finished.append(args))
+                   for _ in range(3)]
+        launcher.shutdown()
+        for batch in batches:
+            batch._thread.join(5)
+        assert len(finished) == 3
+        assert all(cancelled for _, _, cancelled in finished)
+        assert launcher.open("https://late.example.com") is None
+        assert launcher.open_many(["https://late.example.com"]).cancelled
+    assert errors == []
@@ -0,0 +1,114 @@
+# tests/test_manager.py
+import os
+import threading
+
+import pytest
+
+from weblauncher.backups import BackupStore
+from weblauncher.manager import SqliteWebsiteManager, WebsiteManager, open_manager
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """写好快照、退出后的数据目录（再次打开时按偏移索引按需解码）"""
+    manager = WebsiteManager(str(tmp_path))
+    manager.add_website("示例", "https://example.com/docs", "技术")
+    manager.close()
+    return str(tmp_path)
+
+
+def test_background_indexes_replace_paged_view(data_dir):
+    manager = WebsiteManager(data_dir, build_indexes=False, paging=True)
+    assert manager.paged is not None
+
+    built = manager.build_search_indexes()
+    assert manager.indexing
+    assert manager.complete_url("exam") == []  # 建立期间不在界面线程中重复建立
+    assert manager.attach_search_indexes(built)
+
+    assert manager.paged is None and not manager.indexing
+    assert manager.search_index is not None and manager.url_index is not None
+    assert manager.complete_url("exam") == ["https://example.com", "https://example.com/docs"]
+    assert [site["name"] for site in manager.search_website("示例")] == ["示例"]
+    manager.close()
+
+
+def test_background_indexes_discarded_after_edit(data_dir):
+    manager = WebsiteManager(data_dir, build_indexes=False)
+    built = manager.build_search_indexes()
+    manager.add_website("新网站", "https://new.example.org")
+
+    assert not manager.attach_search_indexes(built)
+    assert not manager.indexing
+    assert manager.find_duplicate("https://new.example.org")["name"] == "新网站"
+    manager.close()
+
+
+IMPORTED = [("甲", "https://a.example.com", "工具"), ("重复", "https://example.com/docs/", "技术"),
+            ("乙", "https://b.example.com", "工具"), ("甲again", "https://a.example.com", "工具")]
+
+
+@pytest.mark.parametrize("backend", [WebsiteManager, SqliteWebsiteManager])
+def test_import_prepared_in_background(data_dir, backend):
+    backups = BackupStore(os.path.join(data_dir, "backups"))
+    manager = backend(data_dir, build_indexes=False, backups=backups)
+    before = len(manager.websites)
+    prepared = manager.prepare_import(IMPORTED)
+    added = manager.finish_import(prepared)
+
+    assert [site["name"] for site in added] == ["甲", "乙"]
+    assert manager.find_duplicate("https://b.example.com")["name"] == "乙"
+    assert [site["name"] for site in manager.search_website("甲")] == ["甲"]
+    assert manager.list_backups()[0]["count"] == before  # 导入前的数据有备份
+    count = len(manager.websites)
+    manager.close()
+    reloaded = backend(data_dir)
+    assert len(reloaded.websites) == count
+    assert reloaded.find_duplicate("https://a.example.com")["name"] == "甲"
+    reloaded.close()
+
+
+def test_import_rechecks_duplicates_after_edit(data_dir):
+    manager = WebsiteManager(data_dir)
+    prepared = manager.prepare_import(IMPORTED)
+    manager.add_website("先加的乙", "https://b.example.com")
+    count = len(manager.websites)
+
+    assert [site["name"] for site in manager.finish_import(prepared)] == ["甲"]
+    assert len(manager.websites) == count + 1
+    assert manager.find_duplicate("https://b.example.com")["name"] == "先加的乙"
+    manager.close()
+
+
+@pytest.mark.parametrize("backend", [WebsiteManager, SqliteWebsiteManager])
+def test_import_adds_missing_scheme(data_dir, backend):
+    manager = backend(data_dir, build_indexes=False)
+    added = manager.add_websites([("丙", "c.example.com/start", "工具"),
+                                  ("丁", "http://d.example.com", "工具")])
+
+    assert [site["url"] for site in added] == ["https://c.example.com/start",
+                                               "http://d.example.com"]
+    assert manager.find_duplicate("https://c.example.com/start")["name"] == "丙"
+    manager.close()
+
+
+def test_data_layer_starts_no_services(tmp_path):
+    threads = threading.active_count()
+    manager = WebsiteManager(str(tmp_path))
+    manager.add_website("甲", "https://a.example.com")
+    manager.record_visit(manager.find_duplicate("https://a.example.com")["id"])
+
+    assert threading.active_count() == threads  # 修改直接写入，没有写入线程
+    assert manager.paged is None and manager.favicons is None and manager.backups is None
+    manager.close()
+    assert not {"usage.log", "link_health.json", "backups", "favicons"} & set(os.listdir(tmp_path))
+
+
+def test_open_manager_adds_frontend_services(tmp_path):
+    manager = open_manager(str(tmp_path), "jsonl")
+    assert manager.favicons is not None and manager.backups is not None
+    assert manager.writer.interval is not None
+    manager.close()
+    reopened = open_manager(str(tmp_path), "jsonl", build_indexes=False)
+    assert reopened.paged is not None
+    reopened.close()
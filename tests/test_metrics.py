@@ -0,0 +1,76 @@
+# tests/test_metrics.py
+import csv
+import json
+
+from weblauncher.metrics import Metrics, RollingStats
+
+
+class Worker:
+    def work(self, n):
+        return n * 2
+
+
+def test_rolling_stats_nearest_rank_over_window():
+    stats = RollingStats(window=4)
+    assert stats.summary() == {"count": 0}
+    for ms in [100, 1, 2, 3, 4]:
+        stats.add(ms)
+    # 100 已经滚出窗口，但仍计入次数
+    assert stats.summary() == {"count": 5, "p50_ms": 2, "p95_ms": 4, "max_ms": 4}
+
+    stats = RollingStats()
+    for ms in range(1, 101):
+        stats.add(ms)
+    summary = stats.summary()
+    assert (summary["p50_ms"], summary["p95_ms"], summary["max_ms"]) == (50, 95, 100)
+
+
+def test_watch_installs_timing_only_while_enabled():
+    metrics = Metrics()
+    worker = Worker()
+    metrics.watch(worker, ["work"])
+    assert "work" not in vars(worker)
+    assert worker.work(1) == 2
+    assert metrics.stats == {}
+
+    metrics.enable()
+    assert worker.work(2) == 4
+    assert worker.work(3) == 6
+    assert metrics.stats["work"].count == 2
+
+    metrics.disable()
+    assert "work" not in vars(worker)
+    worker.work(4)
+    assert metrics.stats["work"].count == 2
+
+    late = Worker()
+    metrics.enable()
+    metrics.watch(late, ["work"])
+    late.work(1)
+    assert metrics.stats["work"].count == 3
+
+
+def test_snapshot_text_and_export(tmp_path):
+    metrics = Metrics()
+    for ms in [1.0, 2.0, 3.0]:
+        metrics.add("frame", ms)
+    metrics.counters["sites"] = lambda: 42
+    metrics.counters["broken"] = lambda: 1 / 0
+
+    snapshot = metrics.snapshot()
+    assert snapshot["timings"]["frame"] == {"count": 3, "p50_ms": 2.0, "p95_ms": 3.0,
+                                            "max_ms": 3.0}
+    assert snapshot["counters"]["sites"] == 42
+    assert snapshot["counters"]["broken"].startswith("读取失败")
+    assert "frame  3  2.0/3.0/3.0" in metrics.text()
+
+    exported = json.loads(open(metrics.export(str(tmp_path / "m.json")), encoding="utf-8").read())
+    assert exported["timings"]["frame"]["count"] == 3
+    with open(metrics.export(str(tmp_path / "out" / "m.csv")), encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["metric", "field", "value"]
+    assert ["frame", "p95_ms", "3.0"] in rows
+    assert ["counter", "sites", "42"] in rows
+
+    metrics.reset()
+    assert metrics.snapshot()["timings"] == {}
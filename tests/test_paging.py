@@ -0,0 +1,73 @@
+# tests/test_paging.py
+import os
+
+import pytest
+
+from weblauncher.journal import SiteJournal
+from weblauncher.paging import PagedSnapshot
+
+
+def site(n, category):
+    return {"id": f"id{n}", "name": f"网站{n}", "url": f"https://s{n}.example.com",
+            "category": category}
+
+
+SITES = [site(1, "视频"), site(2, "工具"), site(3, "视频"), site(4, "新闻"), site(5, "视频")]
+
+
+def write(tmp_path, sites=SITES):
+    journal = SiteJournal(str(tmp_path / "custom_sites.json"))
+    with journal.lock:
+        journal.write_snapshot(list(sites), 3)
+    return journal.data_file
+
+
+def test_paged_snapshot_decodes_on_demand(tmp_path):
+    paged = PagedSnapshot.open(write(tmp_path))
+    try:
+        assert paged.seq == 3
+        assert len(paged) == 5
+        assert paged._cache == {}
+        assert paged.site(2) == SITES[2]
+        assert list(paged._cache) == [2]
+        assert paged.load_all() == SITES
+        assert list(paged.sites()) == SITES
+        assert paged.category_counts() == {"视频": 3, "工具": 1, "新闻": 1}
+        videos = paged.sites("视频")
+        assert [s["id"] for s in videos] == ["id1", "id3", "id5"]
+        assert [s["id"] for s in videos[1:]] == ["id3", "id5"]
+        assert len(paged.sites("不存在")) == 0
+    finally:
+        paged.close()
+
+
+def test_find_by_id(tmp_path):
+    paged = PagedSnapshot.open(write(tmp_path))
+    try:
+        assert paged.find("id1") == 0
+        assert paged.find("id4") == 3
+        assert paged.find("id") is None
+        assert paged.find("id9") is None
+    finally:
+        paged.close()
+
+
+def test_stale_or_missing_index_is_ignored(tmp_path):
+    data_file = write(tmp_path)
+    with open(data_file, "ab") as f:
+        f.write(b'{"id": "x", "name": "x", "url": "https://x.example.com"}\n')
+    assert PagedSnapshot.open(data_file) is None
+    assert PagedSnapshot.open(str(tmp_path / "missing.json")) is None
+
+
+def test_snapshot_can_be_replaced_while_paged(tmp_path):
+    data_file = write(tmp_path)
+    paged = PagedSnapshot.open(data_file)
+    # 不持有快照文件：压缩时可以替换它（Windows 上映射着的文件不能被替换）
+    write(tmp_path, SITES[:2])
+    os.remove(data_file)
+    assert paged.site(4) == SITES[4]
+    assert paged.find("id3") == 2
+    paged.close()
+    with pytest.raises(ValueError):
+        paged.load_all()
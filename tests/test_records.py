@@ -0,0 +1,58 @@
+# tests/test_records.py
+import json
+
+import pytest
+
+from weblauncher.records import Site, format_time, parse_time, to_json
+
+
+def test_round_trip_keeps_field_order_and_unknown_fields():
+    data = {"id": "a", "name": "甲", "url": "https://a.example.com", "category": "工具",
+            "created_at": "2024-05-06 07:08:09", "note": "备注"}
+    site = Site.from_dict(data)
+    assert site.created == parse_time("2024-05-06 07:08:09")
+    assert site.extra == {"note": "备注"}
+    assert list(site.to_dict().items()) == list(data.items())
+    assert json.loads(json.dumps(site, default=to_json)) == data
+
+
+def test_nonstandard_time_and_missing_category_are_preserved():
+    site = Site.from_dict({"id": "a", "name": "甲", "url": "https://a.example.com",
+                           "created_at": "昨天"})
+    assert site.created == 0
+    assert site.category == "其他"
+    assert site["created_at"] == "昨天"
+    assert site.to_dict()["created_at"] == "昨天"
+
+
+def test_dict_style_access():
+    site = Site("a", "甲", "https://a.example.com", "工具", parse_time("2024-01-02 03:04:05"))
+    assert site["name"] == "甲"
+    assert site["created_at"] == "2024-01-02 03:04:05"
+    assert site.get("note", "无") == "无"
+    assert "url" in site and "note" not in site
+    assert dict(site) == site.to_dict()
+    assert site == site.to_dict()
+    with pytest.raises(KeyError):
+        site["note"]
+    with pytest.raises(TypeError):
+        hash(site)
+
+
+def test_replace_returns_new_record():
+    site = Site("a", "甲", "https://a.example.com", "工具")
+    renamed = site.replace(name="乙", category="视频")
+    assert (site.name, site.category) == ("甲", "工具")
+    assert (renamed.id, renamed.name, renamed.category) == ("a", "乙", "视频")
+
+
+def test_categories_are_interned():
+    a = Site.from_dict({"id": "a", "name": "甲", "url": "u", "category": "".join(["工", "具"])})
+    b = Site.from_dict({"id": "b", "name": "乙", "url": "u", "category": "".join(["工", "具"])})
+    assert a.category is b.category
+
+
+def test_time_helpers():
+    assert format_time(parse_time("2024-02-29 23:59:59")) == "2024-02-29 23:59:59"
+    assert parse_time("2024-02-30 00:00:00") == 0
+    assert parse_time(None) == 0
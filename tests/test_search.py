@@ -0,0 +1,79 @@
+# tests/test_search.py
+import random
+
+from weblauncher.search import SearchIndex
+
+
+def site(n, name, url=None):
+    return {"id": f"id{n}", "name": name, "url": url or f"https://s{n}.example.com",
+            "category": "测试"}
+
+
+def ids(sites):
+    return [s["id"] for s in sites]
+
+
+def scan(sites, keyword):
+    keyword = keyword.lower()
+    return [s["id"] for s in sites
+            if keyword in s["name"].lower() or keyword in s["url"].lower()]
+
+
+SITES = [site(1, "百度地图", "https://map.baidu.com"), site(2, "百度网盘", "https://pan.baidu.com"),
+         site(3, "GitHub", "https://github.com"), site(4, "哔哩哔哩", "https://www.bilibili.com"),
+         site(5, "地图导航", "https://nav.example.com")]
+
+
+def test_search_matches_linear_scan():
+    index = SearchIndex(SITES)
+    for keyword in ["百度", "地图", "度", "GIT", "bili", "https://", ".com", "百度地", "不存在", "m/"]:
+        assert ids(index.search(keyword)) == scan(SITES, keyword), keyword
+
+
+def test_random_keywords_match_linear_scan():
+    rng = random.Random(7)
+    alphabet = "abc百度地图.:/"
+    sites = [site(n, "".join(rng.choice(alphabet) for _ in range(6)),
+                  "https://" + "".join(rng.choice("abc.") for _ in range(8)))
+             for n in range(300)]
+    index = SearchIndex(sites)
+    for _ in range(200):
+        keyword = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 3)))
+        index.clear_last_result()
+        assert ids(index.search(keyword)) == scan(sites, keyword), keyword
+
+
+def test_empty_keyword_returns_all_in_order():
+    assert ids(SearchIndex(SITES).search("")) == ["id1", "id2", "id3", "id4", "id5"]
+
+
+def test_remove_and_update_keep_order():
+    index = SearchIndex(SITES)
+    assert index.remove("id2")
+    assert not index.remove("id2")
+    assert ids(index.search("百度")) == ["id1"]
+
+    index.update(site(5, "百度导航", "https://nav.example.com"))
+    assert ids(index.search("百度")) == ["id1", "id5"]
+    assert ids(index.search("地图")) == ["id1"]
+    assert index.doc_ids["id5"] not in index.postings["地图"]
+
+
+def test_longer_keyword_narrows_last_result():
+    index = SearchIndex(SITES)
+    assert ids(index.search("百")) == ["id1", "id2"]
+    index.candidates = None  # 继续输入时不应再查倒排表
+    assert ids(index.search("百度")) == ["id1", "id2"]
+    assert ids(index.search("百度地")) == ["id1"]
+
+
+def test_narrowing_skipped_after_edit_or_unrelated_keyword():
+    index = SearchIndex(SITES)
+    assert ids(index.search("百度")) == ["id1", "id2"]
+    index.add(site(6, "百度翻译", "https://fanyi.baidu.com"))
+    assert ids(index.search("百度")) == ["id1", "id2", "id6"]
+
+    assert ids(index.search("地图")) == ["id1", "id5"]
+    assert ids(index.search("图导")) == ["id5"]
+    assert index._narrow("图导航") == [index.doc_ids["id5"]]
+    assert index._narrow("github") is None
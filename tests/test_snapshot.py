@@ -0,0 +1,46 @@
+# tests/test_snapshot.py
+from weblauncher.journal import SiteJournal
+from weblauncher.records import Site
+from weblauncher.snapshot import BinarySnapshot, write_binary_snapshot
+
+
+def sites():
+    return [Site("a", "甲", "https://a.example.com", "工具", 1700000000),
+            Site(None, "无ID", "https://b.example.com", "其他"),
+            Site("c", "丙", "https://c.example.com", "工具", 0, {"note": "备注"})]
+
+
+def test_binary_snapshot_round_trip(tmp_path):
+    data_file = str(tmp_path / "custom_sites.json")
+    with open(data_file, "w", encoding="utf-8") as f:
+        f.write("{}\n")
+    assert write_binary_snapshot(data_file, sites(), 7)
+
+    snapshot = BinarySnapshot.open(data_file)
+    try:
+        assert snapshot.seq == 7
+        assert snapshot.load_all() == sites()
+        assert [snapshot.site(pos) for pos in range(len(snapshot))] == sites()
+    finally:
+        snapshot.close()
+
+
+def test_binary_snapshot_ignored_when_jsonl_changes(tmp_path):
+    data_file = tmp_path / "custom_sites.json"
+    data_file.write_text("{}\n", encoding="utf-8")
+    write_binary_snapshot(str(data_file), sites(), 1)
+    data_file.write_text("{}\n{}\n", encoding="utf-8")
+
+    assert BinarySnapshot.open(str(data_file)) is None
+
+
+def test_compaction_with_missing_id_removes_rotated_journal(tmp_path):
+    journal = SiteJournal(str(tmp_path / "custom_sites.json"))
+    with journal.lock:
+        journal.write_snapshot([])
+    journal.append("add", site={"id": "a", "name": "甲", "url": "https://a.example.com"})
+
+    assert journal.compact(sites())
+    assert journal._journal_files() == []
+    loaded = SiteJournal(journal.data_file).load(factory=Site.from_dict)
+    assert sorted(site.name for site in loaded) == ["丙", "无ID", "甲"]
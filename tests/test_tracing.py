@@ -0,0 +1,47 @@
+# tests/test_tracing.py
+import json
+import threading
+import time
+
+from weblauncher.tracing import FrameStats, StartupTracer
+
+
+def test_phases_and_marks_are_relative_to_origin(tmp_path):
+    tracer = StartupTracer(origin=time.perf_counter() - 1.0)
+    with tracer.phase("kv_load"):
+        pass
+    worker = threading.Thread(target=lambda: tracer.record("data_load", tracer.origin + 1.5,
+                                                           tracer.origin + 1.75),
+                              name="loader")
+    worker.start()
+    worker.join()
+    tracer.mark("first_frame")
+    tracer.mark("first_frame")  # 同名只记第一次
+    tracer.info["mode"] = "deferred"
+
+    (name, start, end, thread), loaded = tracer.phases
+    assert name == "kv_load" and start >= 1.0 and end >= start
+    assert loaded == ("data_load", 1.5, 1.75, "loader")
+    assert list(tracer.marks) == ["first_frame"]
+    assert "data_load 250ms" in tracer.summary()
+
+    path = tmp_path / "logs" / "startup.log"
+    tracer.write(str(path))
+    tracer.write(str(path))
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2
+    entry = json.loads(lines[0])
+    assert entry["info"] == {"mode": "deferred"}
+    assert entry["phases"][1] == {"name": "data_load", "start_ms": 1500.0, "ms": 250.0,
+                                  "thread": "loader"}
+
+
+def test_frame_stats_percentiles():
+    stats = FrameStats()
+    assert stats.percentile(0.5) is None
+    assert stats.summary() == {"frames": 0}
+    for ms in [16, 17, 15, 16, 50, 16, 17, 16, 16, 33]:
+        stats.add(ms / 1000)
+    assert stats.summary() == {"frames": 10, "p50_ms": 16.0, "p95_ms": 50.0, "max_ms": 50.0}
+    assert stats.percentile(0.9) == 33.0
+    assert stats.percentile(0) == 15.0
@@ -0,0 +1,57 @@
+# tests/test_urls.py
+import pytest
+
+from weblauncher.urls import (UrlIndex, canonical_url, duplicate_groups, is_valid_url,
+                              unique_records, with_scheme)
+
+
+@pytest.mark.parametrize("url", [
+    "https://example.com", "example.com/docs/", "http://example.com:8080/a/b.html",
+    "https://www.baidu.com/s?wd=python&ie=utf-8", "https://example.com?x=1",
+    "https://example.com/page#section-2", "https://example.com/app?tab=1#/inbox",
+    "https://例子.中国", "例子.中国/文档", "https://例子.中国:8080/a?b=1",
+    "https://example.com/a%20b", "https://example.com/~user", "https://example.com/a+b=c@d!,;:",
+])
+def test_valid_urls(url):
+    assert is_valid_url(url)
+
+
+@pytest.mark.parametrize("url", [
+    "", "not a url", "javascript:void(0)", "ftp://example.com", "https://localhost",
+    "https://example.com/a b", "https://example.com?q=a b", "https://例子", "https://例 子.中国",
+])
+def test_invalid_urls(url):
+    assert not is_valid_url(url)
+
+
+def test_with_scheme():
+    assert with_scheme("example.com") == "https://example.com"
+    assert with_scheme("HTTP://example.com") == "HTTP://example.com"
+
+
+def test_canonical_url_equivalences():
+    key = canonical_url("https://example.com/docs")
+    assert canonical_url("http://www.Example.COM./docs/") == key
+    assert canonical_url("example.com:443/docs#intro") == key
+    assert canonical_url("https://example.com/%64ocs") == key
+    assert canonical_url("https://example.com:8443/docs") != key
+    assert canonical_url("https://example.com/docs?page=2") != key
+    assert canonical_url("https://例子.测试") == "xn--fsqu00a.xn--0zwm56d"
+    assert canonical_url("ftp://example.com") is None
+
+
+def test_url_index_and_unique_records():
+    sites = [{"id": "a", "url": "https://a.example.com"},
+             {"id": "b", "url": "a.example.com/"},
+             {"id": "c", "url": "https://c.example.com"}]
+    index = UrlIndex(sites)
+    assert index.find("http://www.a.example.com") == "a"
+    index.remove(sites[0])
+    assert index.find("https://a.example.com") == "b"  # 剩下的重复网站仍能查到
+    index.remove(sites[1])
+    assert index.find("https://a.example.com") is None
+    assert [(kept["id"], [s["id"] for s in dups]) for kept, dups in duplicate_groups(sites)] == [("a", ["b"])]
+
+    records = [("甲", "https://c.example.com/", "其他"), ("乙", "https://d.example.com", "其他"),
+               ("乙2", "http://d.example.com", "其他")]
+    assert unique_records(records, UrlIndex(sites).ids) == [records[1]]
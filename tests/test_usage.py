@@ -0,0 +1,93 @@
+# tests/test_usage.py
+import pytest
+
+from weblauncher import usage
+from weblauncher.journal import SiteJournal
+from weblauncher.paging import PagedSnapshot
+from weblauncher.usage import RankedView, UsageLog, rank_by_usage, snapshot_head
+
+
+def counts(log):
+    return {site_id: entry[1] for site_id, entry in log.scores.items()}
+
+
+def open_log(path):
+    log = UsageLog(str(path))
+    log.load()
+    return log
+
+
+def test_checkpoint_replays_only_new_records(tmp_path):
+    log = open_log(tmp_path / "usage.log")
+    log.record("a", 1700000000)
+    log.record("b", 1700000100)
+    log.record("b", 1700000200)
+    log.save()
+    log.record("a", 1700000300)
+
+    reloaded = open_log(tmp_path / "usage.log")
+    assert counts(reloaded) == {"a": 2, "b": 2}
+    assert reloaded.top() == ["a", "b"]
+
+
+@pytest.mark.parametrize("limit", [10 ** 9, 0])
+def test_checkpoints_keep_other_processes_launches(tmp_path, monkeypatch, limit):
+    """两个进程交替打开网站、先后退出，检查点包含双方的全部打开记录（日志轮转时也一样）"""
+    monkeypatch.setattr(usage, "USAGE_LOG_LIMIT", limit)
+    a = open_log(tmp_path / "usage.log")
+    b = open_log(tmp_path / "usage.log")
+    a.record("x")
+    b.record("y")
+    b.record("y")
+    a.record("x")
+    a.save()
+    b.record("z")
+    a.record("x")
+    b.save()
+    a.save()
+
+    assert counts(a) == {"x": 3, "y": 2, "z": 1}
+    assert counts(open_log(tmp_path / "usage.log")) == {"x": 3, "y": 2, "z": 1}
+
+
+def test_checkpoint_after_two_rotations_by_peer(tmp_path, monkeypatch):
+    monkeypatch.setattr(usage, "USAGE_LOG_LIMIT", 0)
+    a = open_log(tmp_path / "usage.log")
+    b = open_log(tmp_path / "usage.log")
+    a.record("x")
+    b.record("y")
+    b.save()
+    b.record("y")
+    b.save()  # a 读到的日志已经被轮转掉了
+    a.save()
+
+    assert counts(open_log(tmp_path / "usage.log")) == {"x": 1, "y": 2}
+
+
+def test_ranked_view_puts_top_sites_first():
+    base = list("abcdefg")
+    view = RankedView(base, [4, 1])
+    assert list(view) == ["e", "b", "a", "c", "d", "f", "g"]
+    assert view[-1] == "g"
+    assert view[1:4] == ["b", "a", "c"]
+    with pytest.raises(IndexError):
+        view[7]
+    assert rank_by_usage([{"id": c} for c in "abc"], ["c", "x"])[0] == {"id": "c"}
+    assert rank_by_usage(base, []) is base
+
+
+def test_snapshot_head_maps_checkpoint_positions(tmp_path):
+    journal = SiteJournal(str(tmp_path / "custom_sites.json"))
+    sites = [{"id": f"id{n}", "name": f"网站{n}", "url": f"https://s{n}.example.com",
+              "category": "视频" if n % 2 else "工具"} for n in range(6)]
+    with journal.lock:
+        journal.write_snapshot(sites)
+    paged = PagedSnapshot.open(journal.data_file)
+    try:
+        positions = {"id3": 3, "id4": 4, "id5": 0}  # id5 的位置已经过期
+        assert snapshot_head(paged.sites(), positions, ["id4", "id3", "id5"]) == [4, 3]
+        videos = paged.sites("视频")
+        assert snapshot_head(videos, positions, ["id4", "id3"]) == [1]
+        assert [s["id"] for s in RankedView(videos, [1])] == ["id3", "id1", "id5"]
+    finally:
+        paged.close()
@@ -0,0 +1,82 @@
+# tests/test_writer.py
+import threading
+
+from weblauncher.writer import WriteBehind
+
+
+class FakeJournal:
+    """记下每次 append_records 的一批记录；failures 次之前的写入失败"""
+    def __init__(self, failures=0):
+        self.batches = []
+        self.failures = failures
+        self.calls = 0
+
+    def append_records(self, records):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise OSError("磁盘已满")
+        self.batches.append(list(records))
+
+
+def test_burst_is_coalesced_into_one_write():
+    journal = FakeJournal()
+    writer = WriteBehind(journal, interval=60)
+    writer.submit("add", [{"n": 1}, {"n": 2}])
+    writer.submit_records([("delete", {"id": "a"})])
+    assert writer.pending()
+    assert journal.batches == []
+
+    assert writer.flush()
+    assert journal.batches == [[("add", {"n": 1}), ("add", {"n": 2}), ("delete", {"id": "a"})]]
+    assert not writer.pending()
+    writer.stop()
+
+
+def test_interval_flushes_without_request():
+    written = threading.Event()
+    journal = FakeJournal()
+    writer = WriteBehind(journal, interval=0.05, on_written=written.set)
+    writer.submit("add", [{"n": 1}])
+    assert written.wait(5)
+    assert journal.batches == [[("add", {"n": 1})]]
+    writer.stop()
+
+
+def test_failed_write_is_reported_once_and_retried():
+    errors = []
+    journal = FakeJournal(failures=2)
+    writer = WriteBehind(journal, interval=60, on_error=errors.append)
+    writer.submit("add", [{"n": 1}])
+    assert not writer.flush()
+    writer.submit("add", [{"n": 2}])
+    assert not writer.flush()
+    assert errors == ["保存数据失败: 磁盘已满"]
+    assert writer.pending()
+
+    assert writer.flush()
+    assert journal.batches == [[("add", {"n": 1}), ("add", {"n": 2})]]
+    writer.stop()
+
+
+def test_stop_writes_remaining_records():
+    journal = FakeJournal()
+    writer = WriteBehind(journal, interval=60)
+    assert writer.flush()  # 线程还没启动
+    writer.submit("add", [{"n": 1}])
+    writer.stop()
+    assert journal.batches == [[("add", {"n": 1})]]
+    assert not writer.pending()
+
+
+def test_without_interval_writes_on_the_calling_thread():
+    journal = FakeJournal(failures=1)
+    errors = []
+    writer = WriteBehind(journal, interval=None, on_error=errors.append)
+    writer.submit("add", [{"n": 1}])
+    assert writer.pending() and errors == ["保存数据失败: 磁盘已满"]
+
+    writer.submit("add", [{"n": 2}])  # 下一次写入时重试
+    assert not writer.pending()
+    assert journal.batches == [[("add", {"n": 1}), ("add", {"n": 2})]]
+    assert writer._thread is None
+    writer.stop()
@@ -0,0 +1,40 @@
+# weblauncher/__init__.py
+"""智能官网直达工具的核心逻辑（不依赖任何界面库）"""
+from .backups import BackupStore
+from .categories import (ALL_CATEGORY, FREQUENT_CATEGORY, CategoryIndex, category_choices,
+                         navigation_order)
+from .complete import COMPLETE_TOP_K, PrefixTrie, SiteCompleter
+from .database import SiteDatabase
+from .filelock import FileLock
+from .favicons import FaviconCache, FaviconFetcher, scale_rgba, site_origin
+from .fuzzy import FUZZY_TOP_K, FuzzyIndex, merge_ranked
+from .health import ALIVE, HealthCache, LinkChecker, check_links
+from .importer import BookmarkImporter
+from .journal import SiteJournal
+from .launcher import BrowserLauncher, LaunchBatch
+from .manager import (DATA_DIR, SqliteWebsiteManager, WebsiteManager, default_services,
+                      open_manager)
+from .metrics import METRICS_ENABLED, Metrics, RollingStats, memory_counters
+from .paging import PAGE_SIZE, PagedSnapshot
+from .records import Site, local_now
+from .search import SEARCH_DEBOUNCE, SearchIndex
+from .snapshot import BinarySnapshot
+from .tracing import FrameStats, StartupTracer
+from .urls import UrlIndex, canonical_url, duplicate_groups, is_valid_url, with_scheme
+from .usage import TOP_K, RankedView, UsageLog, rank_by_usage, snapshot_head
+from .watch import FileWatcher
+from .writer import FLUSH_INTERVAL, WriteBehind
+
+__all__ = [
+    "ALIVE", "ALL_CATEGORY", "BackupStore", "BinarySnapshot", "BookmarkImporter",
+    "BrowserLauncher", "COMPLETE_TOP_K", "CategoryIndex", "DATA_DIR", "FLUSH_INTERVAL",
+    "FREQUENT_CATEGORY", "FUZZY_TOP_K", "FaviconCache", "FaviconFetcher", "FileLock",
+    "FileWatcher", "FrameStats", "FuzzyIndex", "HealthCache", "LaunchBatch", "LinkChecker",
+    "METRICS_ENABLED", "Metrics", "PAGE_SIZE", "PagedSnapshot", "PrefixTrie", "RankedView",
+    "RollingStats", "SEARCH_DEBOUNCE", "SearchIndex", "Site", "SiteCompleter", "SiteDatabase",
+    "SiteJournal", "SqliteWebsiteManager", "StartupTracer", "TOP_K", "UrlIndex", "UsageLog",
+    "WebsiteManager", "WriteBehind", "canonical_url", "category_choices", "check_links",
+    "default_services", "duplicate_groups", "is_valid_url", "local_now", "memory_counters",
+    "merge_ranked", "navigation_order", "open_manager", "rank_by_usage", "scale_rgba",
+    "site_origin", "snapshot_head", "with_scheme",
+]
@@ -0,0 +1,178 @@
+# weblauncher/backups.py
+"""多版本备份：数据按内容切块、按哈希去重存放，每个版本只是一份块列表"""
+import hashlib
+import json
+import os
+import time
+import zlib
+
+from .filelock import FileLock
+from .records import to_json
+
+# 保留最近多少个版本；更早的版本每天只保留最后一个，超过 BACKUP_DAYS 天的删除
+BACKUP_KEEP = int(os.environ.get("WEBLAUNCHER_BACKUP_KEEP", "20"))
+BACKUP_DAYS = int(os.environ.get("WEBLAUNCHER_BACKUP_DAYS", "30"))
+CHUNK_MASK = 0x3F  # 行哈希的低 6 位为 0 时切块，平均每块 64 个网站
+MAX_CHUNK = 64 * 1024  # 单块最大字节数
+
+
+def site_lines(sites):
+    """每个网站一行 JSON（字节），与快照文件中的行相同"""
+    for site in sites:
+        yield json.dumps(site, ensure_ascii=False, default=to_json).encode("utf-8") + b"\n"
+
+
+def chunk_lines(lines):
+    """把网站的 JSON 行按内容切块
+
+    是否在某一行之后切开只取决于这一行本身，增删改一个网站只影响
+    它所在的块，前后的块不变（不会像固定大小切块那样整体错位）。
+    """
+    chunk = []
+    size = 0
+    for line in lines:
+        chunk.append(line)
+        size += len(line)
+        if zlib.crc32(line) & CHUNK_MASK == 0 or size >= MAX_CHUNK:
+            yield b"".join(chunk)
+            chunk = []
+            size = 0
+    if chunk:
+        yield b"".join(chunk)
+
+
+class BackupStore:
+    """backups 目录下的版本化备份
+
+    chunks/ 中每块以内容的 SHA-256 命名（zlib 压缩），versions/ 中每个
+    版本是一个 JSON 清单（时间、说明、网站数、块列表）。保存新版本时
+    只写入还不存在的块，没有变化时不产生新版本；prune() 按保留策略
+    删除旧版本并回收没有版本引用的块。多个进程共用时由文件锁串行化。
+    """
+    def __init__(self, path):
+        self.path = path
+        self.chunk_dir = os.path.join(path, "chunks")
+        self.version_dir = os.path.join(path, "versions")
+        os.makedirs(self.chunk_dir, exist_ok=True)
+        os.makedirs(self.version_dir, exist_ok=True)
+        self.lock = FileLock(os.path.join(path, "backups.lock"))
+
+    def _chunk_path(self, digest):
+        return os.path.join(self.chunk_dir, digest[:2], digest)
+
+    def _write_file(self, path, data):
+        """临时文件 + 原子重命名"""
+        tmp_file = path + ".tmp"
+        with open(tmp_file, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, path)
+
+    def save(self, lines, label=""):
+        """保存一个新版本（lines 为每个网站一行的 JSON 字节，见 site_lines）
+
+        返回新版本的清单；与最新版本内容相同时返回 None。
+        """
+        with self.lock:
+            digests = []
+            size = written = count = 0
+            for chunk in chunk_lines(lines):
+                digest = hashlib.sha256(chunk).hexdigest()
+                digests.append(digest)
+                size += len(chunk)
+                count += chunk.count(b"\n")
+                path = self._chunk_path(digest)
+                if not os.path.exists(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    data = zlib.compress(chunk)
+                    self._write_file(path, data)
+                    written += len(data)
+            versions = self.versions()
+            if versions and versions[0]["chunks"] == digests:
+                return None
+            now = time.time()
+            version_id = time.strftime("%Y%m%d-%H%M%S", time.localtime(now))
+            version_id += f"-{int(now * 1000) % 1000:03d}"
+            while os.path.exists(self._version_path(version_id)):
+                version_id += "+"
+            manifest = {"id": version_id, "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+                        "label": label, "count": count, "size": size, "written": written,
+                        "chunks": digests}
+            self._write_file(self._version_path(version_id),
+                             json.dumps(manifest, ensure_ascii=False).encode("utf-8"))
+        return manifest
+
+    def _version_path(self, version_id):
+        return os.path.join(self.version_dir, version_id + ".json")
+
+    def versions(self):
+        """全部版本的清单，最新的在前（读不了的清单跳过）"""
+        manifests = []
+        for name in os.listdir(self.version_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.version_dir, name), "r", encoding="utf-8") as f:
+                    manifests.append(json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"读取备份清单失败: {name}: {str(e)}")
+        manifests.sort(key=lambda manifest: manifest["id"], reverse=True)
+        return manifests
+
+    def get(self, version_id):
+        """按ID取版本清单，找不到时抛出 KeyError"""
+        try:
+            with open(self._version_path(version_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise KeyError(version_id) from None
+
+    def load(self, version_id):
+        """读出一个版本的全部网站（dict 列表，按保存时的顺序）"""
+        sites = []
+        for digest in self.get(version_id)["chunks"]:
+            with open(self._chunk_path(digest), "rb") as f:
+                chunk = zlib.decompress(f.read())
+            if hashlib.sha256(chunk).hexdigest() != digest:
+                raise ValueError(f"备份数据块已损坏: {digest}")
+            sites.extend(json.loads(line) for line in chunk.splitlines())
+        return sites
+
+    def prune(self, keep=BACKUP_KEEP, days=BACKUP_DAYS):
+        """按保留策略删除旧版本并回收不再引用的块，返回删除的版本ID"""
+        with self.lock:
+            versions = self.versions()
+            cutoff = time.strftime("%Y-%m-%d", time.localtime(time.time() - days * 86400))
+            kept_days = set()
+            removed = []
+            for i, manifest in enumerate(versions):
+                day = manifest["time"][:10]
+                if i < keep or (day >= cutoff and day not in kept_days):
+                    kept_days.add(day)
+                    continue
+                os.remove(self._version_path(manifest["id"]))
+                removed.append(manifest["id"])
+            if removed:
+                self._collect_garbage()
+        return removed
+
+    def _collect_garbage(self):
+        """删除没有任何版本引用的块（调用方持有锁）"""
+        referenced = set()
+        for manifest in self.versions():
+            referenced.update(manifest["chunks"])
+        for prefix in os.listdir(self.chunk_dir):
+            directory = os.path.join(self.chunk_dir, prefix)
+            for name in os.listdir(directory):
+                if name not in referenced:
+                    os.remove(os.path.join(directory, name))
+
+    def disk_usage(self):
+        """块文件占用的字节数"""
+        total = 0
+        for prefix in os.listdir(self.chunk_dir):
+            directory = os.path.join(self.chunk_dir, prefix)
+            total += sum(os.path.getsize(os.path.join(directory, name))
+                         for name in os.listdir(directory))
+        return total
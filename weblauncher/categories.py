@@ -0,0 +1,98 @@
+# weblauncher/categories.py
+"""分类索引：分类 -> 网站，并维护每个分类的数量"""
+
+ALL_CATEGORY = "全部"
+MY_CATEGORY = "我的"
+FREQUENT_CATEGORY = "常用"  # 按打开记录排出的常用网站，不是真正的分类
+DEFAULT_CATEGORIES = ["我的", "社交", "购物", "视频", "音乐", "技术", "新闻", "工具", "教育", "直播", "其他"]
+
+
+class CategoryIndex:
+    """按分类分桶保存网站
+
+    每个分类是一个按添加顺序排列的 {网站ID: 网站} 字典，
+    增删都是 O(1)，按分类筛选只需复制该分类的网站。
+    """
+    def __init__(self, sites=()):
+        self.buckets = {}
+        self.total = 0
+        self._sorted = None  # 排序后的分类列表缓存，分类增减时失效
+        for site in sites:
+            self.add(site)
+
+    def add(self, site):
+        """把网站加入所属分类"""
+        category = site.get("category", "其他")
+        bucket = self.buckets.get(category)
+        if bucket is None:
+            bucket = self.buckets[category] = {}
+            self._sorted = None
+        if site["id"] not in bucket:
+            self.total += 1
+        bucket[site["id"]] = site
+
+    def remove(self, site):
+        """把网站从所属分类中移除"""
+        category = site.get("category", "其他")
+        bucket = self.buckets.get(category)
+        if bucket is None or bucket.pop(site["id"], None) is None:
+            return False
+        self.total -= 1
+        if not bucket:
+            del self.buckets[category]
+            self._sorted = None
+        return True
+
+    def update(self, old_site, new_site):
+        """网站信息变化后更新索引，分类不变时保持原有位置"""
+        if old_site.get("category", "其他") == new_site.get("category", "其他"):
+            self.buckets[new_site.get("category", "其他")][new_site["id"]] = new_site
+        else:
+            self.remove(old_site)
+            self.add(new_site)
+
+    def find(self, site_id):
+        """按ID查找网站（逐个分类查找，分类数量很少）"""
+        for bucket in self.buckets.values():
+            site = bucket.get(site_id)
+            if site is not None:
+                return site
+        return None
+
+    def sites(self, category):
+        """返回某个分类的网站列表，耗时与结果数量成正比"""
+        bucket = self.buckets.get(category)
+        return list(bucket.values()) if bucket else []
+
+    def count(self, category):
+        """某个分类的网站数量，"全部" 返回总数"""
+        if category == ALL_CATEGORY:
+            return self.total
+        return len(self.buckets.get(category, ()))
+
+    def categories(self):
+        """所有有网站的分类（排序）"""
+        if self._sorted is None:
+            self._sorted = sorted(self.buckets)
+        return self._sorted
+
+    def navigation(self):
+        """分类导航顺序："常用"、"我的"、"全部"，然后是其余分类"""
+        return navigation_order(self.categories())
+
+    def choices(self):
+        """添加网站时可选的分类：默认分类加上数据中出现的分类"""
+        return category_choices(self.categories())
+
+
+def navigation_order(categories):
+    """分类导航顺序："常用"、"我的"、"全部"，然后是其余分类（已排序）"""
+    rest = [c for c in categories if c not in (FREQUENT_CATEGORY, MY_CATEGORY, ALL_CATEGORY)]
+    return [FREQUENT_CATEGORY, MY_CATEGORY, ALL_CATEGORY] + rest
+
+
+def category_choices(categories):
+    """默认分类加上数据中出现的其他分类"""
+    extra = [c for c in categories
+             if c not in DEFAULT_CATEGORIES and c not in (ALL_CATEGORY, FREQUENT_CATEGORY)]
+    return DEFAULT_CATEGORIES + extra
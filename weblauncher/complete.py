@@ -0,0 +1,283 @@
+# weblauncher/complete.py
+"""添加网站时的输入联想：主机名/路径前缀和名称的前缀树，按常用度给出前几个补全"""
+from urllib.parse import urlsplit
+
+from .pinyin import name_keys
+
+COMPLETE_TOP_K = 8  # 每次最多给出的补全数
+PATH_DEPTH = 2      # 主机名之后最多补全几级路径
+MAX_KEY = 64        # 更长的词截断（避免过深的树）
+
+
+class _Node:
+    __slots__ = ("label", "children", "word", "top", "dirty")
+
+    def __init__(self, label=""):
+        self.label = label    # 从父节点到这里的边上的字符串
+        self.children = {}    # 边的第一个字符 -> 子节点
+        self.word = None      # 在这里结束的词
+        self.top = []         # 子树中得分最高的 k 个词
+        self.dirty = True     # top 需要从子节点重新合并
+
+
+class PrefixTrie:
+    """压缩前缀树（边上存字符串），每个节点缓存子树中得分最高的 k 个词
+
+    complete() 只走过前缀经过的几个节点，取缓存的 top，耗时与词的
+    总数无关。add() 沿路径更新缓存；remove() 或得分降低时只把路径上
+    受影响的节点标记为过期，下次查询时由子节点的 top 合并。批量
+    建立时所有节点都是过期的，第一次查到时才计算。
+    """
+    def __init__(self, k=COMPLETE_TOP_K):
+        self.k = k
+        self.root = _Node()
+        self.scores = {}  # 词 -> 得分
+
+    def __len__(self):
+        return len(self.scores)
+
+    def __contains__(self, word):
+        return word in self.scores
+
+    def _rank(self, word):
+        return -self.scores[word], word
+
+    def add(self, word, score):
+        """加入词或更新它的得分"""
+        old = self.scores.get(word)
+        self.scores[word] = score
+        for node in self._path(word, create=True):
+            if node.dirty:
+                continue
+            if word in node.top:
+                if old is not None and score < old:
+                    node.dirty = True  # 子树中其他词可能排到它前面
+                else:
+                    node.top.sort(key=self._rank)
+            elif len(node.top) < self.k or self._rank(word) < self._rank(node.top[-1]):
+                node.top.append(word)
+                node.top.sort(key=self._rank)
+                del node.top[self.k:]
+
+    def remove(self, word):
+        if word not in self.scores:
+            return
+        path = self._path(word)
+        path[-1].word = None
+        for node in path:
+            if word in node.top:
+                node.dirty = True
+        del self.scores[word]
+
+    def _path(self, word, create=False):
+        """从根到 word 所在节点经过的节点（create 时不存在的节点和词一起建立）"""
+        node = self.root
+        path = [node]
+        i = 0
+        while i < len(word):
+            child = node.children.get(word[i])
+            if child is None:
+                child = node.children[word[i]] = _Node(word[i:])
+                i = len(word)
+            else:
+                label = child.label
+                if word.startswith(label, i):
+                    common = len(label)
+                else:
+                    common = 1
+                    limit = min(len(label), len(word) - i)
+                    while common < limit and label[common] == word[i + common]:
+                        common += 1
+                if common < len(label):
+                    # 在边的中间分开，插入一个中间节点
+                    middle = _Node(label[:common])
+                    child.label = label[common:]
+                    middle.children[child.label[0]] = child
+                    node.children[word[i]] = middle
+                    child = middle
+                i += common
+            node = child
+            path.append(node)
+        if create:
+            node.word = word
+        return path
+
+    def _top(self, node):
+        if node.dirty:
+            candidates = [node.word] if node.word is not None else []
+            for child in node.children.values():
+                candidates.extend(self._top(child))
+            candidates.sort(key=self._rank)
+            node.top = candidates[:self.k]
+            node.dirty = False
+        return node.top
+
+    def complete(self, prefix, k=None):
+        """以 prefix 开头、得分最高的 k 个词（不超过建立时的 k）"""
+        node = self.root
+        i = 0
+        while i < len(prefix):
+            child = node.children.get(prefix[i])
+            if child is None:
+                return []
+            rest = prefix[i:]
+            if not (rest.startswith(child.label) or child.label.startswith(rest)):
+                return []
+            i += len(child.label)
+            node = child
+        return self._top(node)[:k or self.k]
+
+
+def url_keys(url):
+    """网址 -> [(补全用的键, 补全出的网址)]：主机名（去掉 www.）和前几级路径"""
+    try:
+        parts = urlsplit(url.strip())
+        host = parts.hostname
+    except ValueError:
+        return []
+    if not host:
+        return []
+    key = host[4:] if host.startswith("www.") else host
+    prefix = f"{parts.scheme}://{parts.netloc}"
+    keys = [(key[:MAX_KEY], prefix)]
+    for segment in [s for s in parts.path.split("/") if s][:PATH_DEPTH]:
+        key += "/" + segment.lower()
+        prefix += "/" + segment
+        keys.append((key[:MAX_KEY], prefix))
+    return keys
+
+
+def parent_domains(host):
+    """"a.b.example.com" -> a.b.example.com、b.example.com、example.com"""
+    domains = [host]
+    while host.count(".") >= 2:
+        host = host.split(".", 1)[1]
+        domains.append(host)
+    return domains
+
+
+def normalize_url_prefix(text):
+    """输入框中的网址 -> 在主机名树中查找的前缀（去掉协议和 www.，转小写）"""
+    text = text.strip().lower()
+    for scheme in ("https://", "http://"):
+        if text.startswith(scheme):
+            text = text[len(scheme):]
+            break
+    if text.startswith("www."):
+        text = text[4:]
+    return text
+
+
+class SiteCompleter:
+    """全部网站的补全索引：主机名/路径前缀树、名称（含拼音）前缀树、主机名 -> 分类
+
+    得分由 score(网站ID) 给出（通常是 1 + 常用度），多个网站共用的
+    键得分相加；add/remove/touch 随网站的增删和打开更新。
+    """
+    def __init__(self, sites=(), score=None, k=COMPLETE_TOP_K):
+        self.score = score or (lambda site_id: 1.0)
+        self.tries = {"url": PrefixTrie(k), "name": PrefixTrie(k)}
+        self.values = {"url": {}, "name": {}}  # 键 -> 补全出的网址/网站名称
+        self.owners = {}      # (树, 键) -> {网站ID: 得分}
+        self.categories = {}  # 主机名（去掉 www.）及其上级域名 -> {分类: 网站数}
+        for site in sites:
+            self.add(site)
+
+    def _keys(self, site):
+        """网站在两棵树中的 [(树, 键, 补全值)] 和主机名（没有时为 None）"""
+        urls = url_keys(site["url"])
+        keys = [("url", key, value) for key, value in urls]
+        name = site["name"].strip()
+        if name:
+            compact = "".join(name.lower().split())[:MAX_KEY]
+            keys.append(("name", compact, name))
+            for key in name_keys(name):
+                if key and key[:MAX_KEY] != compact:
+                    keys.append(("name", key[:MAX_KEY], name))
+        return keys, urls[0][0] if urls else None
+
+    def _set_score(self, kind, key, owners):
+        self.tries[kind].add(key, sum(owners.values()))
+
+    def add(self, site):
+        score = self.score(site["id"])
+        keys, host = self._keys(site)
+        for kind, key, value in keys:
+            owners = self.owners.setdefault((kind, key), {})
+            owners[site["id"]] = score
+            self.values[kind].setdefault(key, value)
+            self._set_score(kind, key, owners)
+        if host is not None:
+            category = site["category"]
+            for domain in parent_domains(host):
+                counts = self.categories.setdefault(domain, {})
+                counts[category] = counts.get(category, 0) + 1
+
+    def remove(self, site):
+        keys, host = self._keys(site)
+        for kind, key, value in keys:
+            owners = self.owners.get((kind, key))
+            if owners is None or owners.pop(site["id"], None) is None:
+                continue
+            if owners:
+                self._set_score(kind, key, owners)
+            else:
+                del self.owners[(kind, key)]
+                del self.values[kind][key]
+                self.tries[kind].remove(key)
+        if host is None:
+            return
+        category = site["category"]
+        for domain in parent_domains(host):
+            counts = self.categories.get(domain)
+            if counts is None or category not in counts:
+                continue
+            counts[category] -= 1
+            if not counts[category]:
+                del counts[category]
+            if not counts:
+                del self.categories[domain]
+
+    def update(self, old, new):
+        self.remove(old)
+        self.add(new)
+
+    def touch(self, site):
+        """网站被打开后按新的常用度调整排序"""
+        score = self.score(site["id"])
+        for kind, key, value in self._keys(site)[0]:
+            owners = self.owners.get((kind, key))
+            if owners is not None and site["id"] in owners:
+                owners[site["id"]] = score
+                self._set_score(kind, key, owners)
+
+    def complete_url(self, text, k=None):
+        """输入的网址 -> 补全出的完整网址列表（常用的在前）"""
+        prefix = normalize_url_prefix(text)
+        if not prefix:
+            return []
+        return [self.values["url"][key] for key in self.tries["url"].complete(prefix, k)]
+
+    def complete_name(self, text, k=None):
+        """输入的名称（或全拼、首字母）-> 网站名称列表（去重，常用的在前）"""
+        prefix = "".join(text.lower().split())
+        if not prefix:
+            return []
+        names = []
+        for key in self.tries["name"].complete(prefix, k):
+            name = self.values["name"][key]
+            if name not in names:
+                names.append(name)
+        return names
+
+    def suggest_category(self, url):
+        """同一主机名（没有时看上级域名）下最多的分类，没有线索时返回 None"""
+        url = url.strip()
+        keys = url_keys(url if "://" in url else "https://" + url)
+        if not keys:
+            return None
+        for domain in parent_domains(keys[0][0]):
+            counts = self.categories.get(domain)
+            if counts:
+                return max(counts, key=counts.get)
+        return None
@@ -0,0 +1,343 @@
+# weblauncher/database.py
+"""可选的 SQLite 存储：分类索引、FTS5 全文检索，网站按需从数据库读取"""
+import json
+import os
+import sqlite3
+import threading
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
+
+from .fuzzy import FUZZY_CANDIDATES, FUZZY_TOP_K
+from .paging import PAGE_SIZE
+from .pinyin import name_keys
+from .records import Site
+from .urls import canonical_url
+
+SCHEMA_VERSION = 2  # 2: 增加 canonical 列（规范化URL，判断重复）
+MIN_TRIGRAM = 3  # trigram 分词只能匹配至少 3 个字符的关键词
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS sites (
+    seq INTEGER PRIMARY KEY,           -- 显示顺序
+    id TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    url TEXT NOT NULL,
+    category TEXT NOT NULL,
+    created INTEGER NOT NULL DEFAULT 0,
+    extra TEXT,                        -- 其他字段的 JSON
+    name_key TEXT NOT NULL DEFAULT '', -- 去掉空白的小写名称
+    pinyin TEXT NOT NULL DEFAULT '',
+    initials TEXT NOT NULL DEFAULT '',
+    canonical TEXT                     -- 规范化URL，无法解析时为 NULL
+);
+CREATE INDEX IF NOT EXISTS sites_category ON sites (category, seq);
+CREATE INDEX IF NOT EXISTS sites_name_key ON sites (name_key);
+CREATE INDEX IF NOT EXISTS sites_pinyin ON sites (pinyin);
+CREATE INDEX IF NOT EXISTS sites_initials ON sites (initials);
+"""
+
+# 外部内容的 FTS5 表，由触发器与 sites 保持同步
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS sites_fts USING fts5(
+    name, url, content='sites', content_rowid='seq', tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS sites_ai AFTER INSERT ON sites BEGIN
+    INSERT INTO sites_fts (rowid, name, url) VALUES (new.seq, new.name, new.url);
+END;
+CREATE TRIGGER IF NOT EXISTS sites_ad AFTER DELETE ON sites BEGIN
+    INSERT INTO sites_fts (sites_fts, rowid, name, url) VALUES ('delete', old.seq, old.name, old.url);
+END;
+CREATE TRIGGER IF NOT EXISTS sites_au AFTER UPDATE OF name, url ON sites BEGIN
+    INSERT INTO sites_fts (sites_fts, rowid, name, url) VALUES ('delete', old.seq, old.name, old.url);
+    INSERT INTO sites_fts (rowid, name, url) VALUES (new.seq, new.name, new.url);
+END;
+"""
+
+_COLUMNS = "seq, id, name, url, category, created, extra"
+_ROW_COLUMNS = "id, name, url, category, created, extra, name_key, pinyin, initials, canonical"
+
+
+def _row_values(site):
+    """Site -> 插入 sites 表的列值（不含 seq）"""
+    full, initials = name_keys(site.name)
+    return (site.id, site.name, site.url, site.category, site.created,
+            json.dumps(site.extra, ensure_ascii=False) if site.extra else None,
+            "".join(site.name.lower().split()), full, initials, canonical_url(site.url))
+
+
+def _escape_like(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class SiteDatabase:
+    """网站数据的 SQLite 存储
+
+    sites 表的 seq 即显示顺序（新网站追加在最后），分类按 (category, seq)
+    建索引；名称和URL的子串搜索用 trigram 分词的 FTS5 表，SQLite 不支持
+    trigram 或关键词太短时退回 LIKE 扫描。使用 WAL 模式，写入不阻塞读取。
+    连接可以跨线程使用（延迟初始化时在后台线程打开），访问由锁串行化。
+    """
+    def __init__(self, db_file):
+        self.db_file = db_file
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        try:
+            self._conn.executescript(_FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            # 编译时没有 FTS5 或版本低于 3.34（没有 trigram 分词）
+            self.fts = False
+        self._upgrade()
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sites_canonical ON sites (canonical)")
+        self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('schema', ?)", (str(SCHEMA_VERSION),))
+        self._conn.commit()
+        self._cache = {}  # seq -> Site，只缓存最近读取的几页
+        self._data_version = self._read_data_version()
+
+    def _upgrade(self):
+        """升级旧版本建立的数据库"""
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+        if row is None or int(row[0]) >= 2:
+            return
+        self._conn.execute("ALTER TABLE sites ADD COLUMN canonical TEXT")
+        self._conn.executemany(
+            "UPDATE sites SET canonical = ? WHERE seq = ?",
+            [(canonical_url(url), seq) for seq, url in self._conn.execute("SELECT seq, url FROM sites")])
+
+    def _read_data_version(self):
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def changed(self):
+        """其他连接（进程）在上次检查之后是否提交过修改"""
+        version = self._read_data_version()
+        if version == self._data_version:
+            return False
+        self._data_version = version
+        self._cache.clear()
+        return True
+
+    def get_meta(self, key, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return default if row is None else row[0]
+
+    def set_meta(self, key, value):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    def import_sites(self, sites, source=None):
+        """在一个事务中批量写入网站（迁移、首次创建），source 记为迁移来源"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO sites ({_ROW_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                map(_row_values, sites))
+            if source is not None:
+                self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('migrated_from', ?)",
+                                   (source,))
+        self._cache.clear()
+
+    def add(self, site):
+        self.import_sites([site])
+
+    def delete(self, site_id):
+        """删除网站，返回是否存在"""
+        with self._lock, self._conn:
+            deleted = self._conn.execute("DELETE FROM sites WHERE id = ?", (site_id,)).rowcount
+        self._cache.clear()
+        return deleted > 0
+
+    def update(self, site):
+        """按ID更新网站内容（保持原有顺序）"""
+        values = _row_values(site)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE sites SET name = ?, url = ?, category = ?, created = ?, extra = ?, "
+                "name_key = ?, pinyin = ?, initials = ?, canonical = ? WHERE id = ?",
+                values[1:] + values[:1])
+        self._cache.clear()
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sites").fetchone()[0]
+
+    def category_counts(self):
+        """{分类: 网站数量}，只扫描分类索引"""
+        with self._lock:
+            return dict(self._conn.execute(
+                "SELECT category, COUNT(*) FROM sites GROUP BY category"))
+
+    def _seqs(self, sql, params=()):
+        with self._lock:
+            return array("q", (row[0] for row in self._conn.execute(sql, params)))
+
+    def all(self):
+        """全部网站的只读视图"""
+        return SiteRows(self, self._seqs("SELECT seq FROM sites ORDER BY seq"))
+
+    def category(self, category):
+        """某个分类的只读视图（走 (category, seq) 索引）"""
+        return SiteRows(self, self._seqs(
+            "SELECT seq FROM sites WHERE category = ? ORDER BY seq", (category,)))
+
+    def seqs_of(self, site_ids):
+        """{网站ID: seq}"""
+        site_ids = list(site_ids)
+        if not site_ids:
+            return {}
+        marks = ",".join("?" * len(site_ids))
+        with self._lock:
+            return dict(self._conn.execute(
+                f"SELECT id, seq FROM sites WHERE id IN ({marks})", site_ids))
+
+    def get(self, site_id):
+        """按ID读取网站，找不到返回 None"""
+        with self._lock:
+            row = self._conn.execute(f"SELECT {_COLUMNS} FROM sites WHERE id = ?",
+                                     (site_id,)).fetchone()
+        return None if row is None else self._site(row)
+
+    def find_canonical(self, keys):
+        """{规范化URL: 网站ID}，只包含已存在的（同一URL有多个网站时取最早的）"""
+        keys = [key for key in keys if key is not None]
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                marks = ",".join("?" * len(chunk))
+                for key, site_id in self._conn.execute(
+                        f"SELECT canonical, id FROM sites WHERE canonical IN ({marks}) "
+                        "ORDER BY seq DESC", chunk):
+                    found[key] = site_id
+        return found
+
+    def canonical_rows(self):
+        """按显示顺序的 (seq, 网站ID, 规范化URL)，用于整理重复网站"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT seq, id, canonical FROM sites WHERE canonical IS NOT NULL ORDER BY seq"
+            ).fetchall()
+
+    def delete_many(self, site_ids):
+        """在一个事务中删除多个网站"""
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM sites WHERE id = ?", ((i,) for i in site_ids))
+        self._cache.clear()
+
+    def replace_all(self, sites):
+        """在一个事务中用 sites 替换全部网站（恢复备份）"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sites")
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO sites ({_ROW_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                map(_row_values, sites))
+        self._cache.clear()
+
+    def urls(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT url FROM sites ORDER BY seq")]
+
+    def search(self, keyword):
+        """名称或URL包含关键词（不区分大小写）的网站视图，按显示顺序"""
+        keyword = keyword.lower()
+        if self.fts and len(keyword) >= MIN_TRIGRAM:
+            phrase = '"' + keyword.replace('"', '""') + '"'
+            return SiteRows(self, self._seqs(
+                "SELECT rowid FROM sites_fts WHERE sites_fts MATCH ? ORDER BY rowid", (phrase,)))
+        pattern = f"%{_escape_like(keyword)}%"
+        return SiteRows(self, self._seqs(
+            "SELECT seq FROM sites WHERE name LIKE ? ESCAPE '\\' OR url LIKE ? ESCAPE '\\' "
+            "ORDER BY seq", (pattern, pattern)))
+
+    def prefix_search(self, keyword, k=FUZZY_TOP_K):
+        """名称、全拼或首字母以关键词开头的网站（首字母匹配排在后面，再按长度）"""
+        query = "".join(keyword.lower().split())
+        if not query:
+            return SiteRows(self, array("q"))
+        low, high = query, query + "\U0010ffff"
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, MIN(tier) AS best, MIN(length) FROM ("
+                " SELECT seq, tier, length FROM ("
+                "  SELECT seq, 0 AS tier, length(name_key) AS length FROM sites"
+                "   WHERE name_key >= ? AND name_key < ?"
+                "  UNION ALL SELECT seq, 0, length(pinyin) FROM sites WHERE pinyin >= ? AND pinyin < ?"
+                "  UNION ALL SELECT seq, 1, length(initials) FROM sites"
+                "   WHERE initials >= ? AND initials < ?)"
+                " LIMIT ?) GROUP BY seq ORDER BY best, 3, seq LIMIT ?",
+                (low, high, low, high, low, high, FUZZY_CANDIDATES, k)).fetchall()
+        return SiteRows(self, array("q", (row[0] for row in rows)))
+
+    def sites(self, seqs):
+        """按 seq 读取网站（结果缓存，缓存满时整体清空）"""
+        cache = self._cache
+        missing = [seq for seq in seqs if seq not in cache]
+        if missing:
+            if len(cache) > 8 * PAGE_SIZE:
+                cache.clear()
+            with self._lock:
+                for start in range(0, len(missing), 500):
+                    chunk = missing[start:start + 500]
+                    marks = ",".join("?" * len(chunk))
+                    for row in self._conn.execute(
+                            f"SELECT {_COLUMNS} FROM sites WHERE seq IN ({marks})", chunk):
+                        cache[row[0]] = self._site(row)
+        return [cache[seq] for seq in seqs if seq in cache]
+
+    @staticmethod
+    def _site(row):
+        _, site_id, name, url, category, created, extra = row
+        return Site(site_id, name, url, category, created, json.loads(extra) if extra else None)
+
+    def checkpoint(self):
+        """把 WAL 中的修改写回数据库文件并截断 WAL"""
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        with self._lock:
+            self._conn.execute("PRAGMA optimize")
+            self._conn.close()
+
+
+class SiteRows(Sequence):
+    """数据库中一组网站的只读序列，访问时按页读取
+
+    seqs 为网站的 seq 列表；分类和全部网站的视图按 seq 升序排列。
+    """
+    def __init__(self, db, seqs):
+        self.db = db
+        self.seqs = seqs
+
+    def __len__(self):
+        return len(self.seqs)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self.db.sites(self.seqs[i])
+        if i < 0:
+            i += len(self.seqs)
+        seq = self.seqs[i]
+        site = self.db._cache.get(seq)
+        if site is None:
+            # 连同同一页的网站一起读取
+            start = i - i % PAGE_SIZE
+            self.db.sites(self.seqs[start:start + PAGE_SIZE])
+            site = self.db._cache.get(seq)
+            if site is None:
+                site = self.db.sites([seq])[0]
+        return site
+
+    def index_of(self, seq):
+        """seq 在视图中的下标，不在视图中返回 None（要求 seqs 升序）"""
+        i = bisect_left(self.seqs, seq)
+        return i if i < len(self.seqs) and self.seqs[i] == seq else None
+
+
+def database_path(data_file):
+    """与 custom_sites.json 同目录的数据库文件"""
+    return os.path.join(os.path.dirname(data_file), "sites.db")
@@ -0,0 +1,273 @@
+# weblauncher/favicons.py
+"""后台下载网站图标，保存在大小受限的磁盘 LRU 缓存中"""
+import hashlib
+import os
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit
+
+FAVICON_CACHE_BYTES = 8 * 1024 * 1024  # 磁盘缓存上限
+FAVICON_MAX_BYTES = 256 * 1024          # 单个图标的大小上限
+FAVICON_MISS_TTL = 24 * 3600            # 没有图标的网站多久后再试
+FAVICON_WORKERS = 4
+FETCH_TIMEOUT = 10.0
+PAGE_PEEK_BYTES = 64 * 1024             # 查找 <link rel="icon"> 时最多读取的首页字节数
+USER_AGENT = "Mozilla/5.0 (compatible; WebLauncher favicon fetcher)"
+_MISS_EXT = "none"                      # 空文件，表示该网站没有可用的图标
+
+# 文件头 -> 扩展名（界面按扩展名选择解码器）
+_SIGNATURES = [
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\x00\x00\x01\x00", "ico"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+    (b"\xff\xd8\xff", "jpg"),
+    (b"BM", "bmp"),
+]
+
+
+def sniff_image(data):
+    """根据文件头判断图片格式，不是支持的图片时返回 None"""
+    for signature, ext in _SIGNATURES:
+        if data.startswith(signature):
+            return ext
+    return None
+
+
+def site_origin(url):
+    """图标按站点（协议 + 主机 + 端口）缓存，无法解析时返回 None"""
+    try:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            return None
+        host = parts.hostname.encode("idna").decode("ascii")
+        netloc = host if parts.port is None else f"{host}:{parts.port}"
+    except (ValueError, UnicodeError):
+        return None
+    return f"{parts.scheme}://{netloc}"
+
+
+def scale_rgba(pixels, size, target):
+    """把 RGBA 像素缩放为 target x target（最近邻，图标很小，纯 Python 足够）"""
+    width, height = size
+    if (width, height) == (target, target):
+        return pixels
+    columns = [x * width // target * 4 for x in range(target)]
+    rows = []
+    for y in range(target):
+        start = (y * height // target) * width * 4
+        row = pixels[start:start + width * 4]
+        rows.append(b"".join(row[c:c + 4] for c in columns))
+    return b"".join(rows)
+
+
+class _IconLinkParser(HTMLParser):
+    """在首页中查找 <link rel="icon" href="...">"""
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.href = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "link" or self.href is not None:
+            return
+        attrs = dict(attrs)
+        rel = (attrs.get("rel") or "").lower().split()
+        if attrs.get("href") and ("icon" in rel or "apple-touch-icon" in rel):
+            self.href = attrs["href"]
+
+
+class FaviconCache:
+    """图标的磁盘 LRU 缓存
+
+    每个站点一个文件（文件名为站点的哈希），最近使用时间记在文件的
+    修改时间上，启动时按它恢复 LRU 顺序；总大小超过上限时删除最久
+    没有用过的图标。没有图标的站点保存为空文件，过期后再试。
+    """
+    def __init__(self, directory, max_bytes=FAVICON_CACHE_BYTES, miss_ttl=FAVICON_MISS_TTL):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.miss_ttl = miss_ttl
+        self.entries = OrderedDict()  # 键 -> (文件名, 大小, 修改时间)，最久未用的在前
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def load(self):
+        """扫描缓存目录，按最近使用时间恢复 LRU 顺序"""
+        os.makedirs(self.directory, exist_ok=True)
+        found = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                key, _, ext = entry.name.partition(".")
+                if ext and not ext.endswith("tmp") and entry.is_file():
+                    stat = entry.stat()
+                    found.append((stat.st_mtime, key, entry.name, stat.st_size))
+        with self._lock:
+            self.entries.clear()
+            self.total = 0
+            for mtime, key, name, size in sorted(found):
+                self.entries[key] = (name, size, mtime)
+                self.total += size
+        return self
+
+    @staticmethod
+    def key(origin):
+        return hashlib.sha1(origin.encode("utf-8")).hexdigest()[:24]
+
+    def get(self, origin):
+        """返回 (图标路径, 扩展名) 并标记为最近使用；没有缓存或没有图标时返回 None"""
+        key = self.key(origin)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0].endswith("." + _MISS_EXT):
+                return None
+            self.entries.move_to_end(key)
+        path = os.path.join(self.directory, entry[0])
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path, entry[0].rsplit(".", 1)[1]
+
+    def needs_fetch(self, origin, now=None):
+        """还没有缓存，或者上次没有找到图标且已经过期"""
+        with self._lock:
+            entry = self.entries.get(self.key(origin))
+        if entry is None:
+            return True
+        if not entry[0].endswith("." + _MISS_EXT):
+            return False
+        return (time.time() if now is None else now) - entry[2] >= self.miss_ttl
+
+    def put(self, origin, data, ext):
+        """保存图标（临时文件 + 原子重命名），超出上限时淘汰最久未用的"""
+        key = self.key(origin)
+        name = f"{key}.{ext}"
+        path = os.path.join(self.directory, name)
+        tmp_file = path + ".tmp"
+        with open(tmp_file, "wb") as f:
+            f.write(data)
+        os.replace(tmp_file, path)
+        with self._lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.total -= old[1]
+                if old[0] != name:
+                    self._remove_file(old[0])
+            self.entries[key] = (name, len(data), time.time())
+            self.total += len(data)
+            self._evict()
+        return path
+
+    def put_missing(self, origin):
+        """记下该站点没有可用的图标"""
+        self.put(origin, b"", _MISS_EXT)
+
+    def _evict(self):
+        while self.total > self.max_bytes and len(self.entries) > 1:
+            _, (name, size, _) = self.entries.popitem(last=False)
+            self.total -= size
+            self._remove_file(name)
+
+    def _remove_file(self, name):
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except OSError:
+            pass
+
+
+class FaviconFetcher:
+    """后台线程池下载图标
+
+    request(url) 在缓存命中时立即返回 (路径, 扩展名)，否则安排下载并
+    返回 None；下载完成后在工作线程中调用 on_ready(站点, 路径, 扩展名)，
+    界面需要自己切回界面线程。同一站点同时只下载一次。
+    先尝试 /favicon.ico，失败时在首页查找 <link rel="icon">。
+    """
+    def __init__(self, cache, workers=FAVICON_WORKERS, timeout=FETCH_TIMEOUT, on_ready=None):
+        self.cache = cache
+        self.timeout = timeout
+        self.on_ready = on_ready
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="favicon")
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def request(self, url):
+        origin = site_origin(url)
+        if origin is None:
+            return None
+        cached = self.cache.get(origin)
+        if cached is not None or not self.cache.needs_fetch(origin):
+            return cached
+        with self._lock:
+            if origin in self._pending:
+                return None
+            self._pending.add(origin)
+        self._pool.submit(self._fetch_and_store, origin)
+        return None
+
+    def _fetch_and_store(self, origin):
+        try:
+            found = self.fetch(origin)
+            if found is None:
+                self.cache.put_missing(origin)
+                return
+            data, ext = found
+            path = self.cache.put(origin, data, ext)
+        except Exception as e:
+            print(f"下载图标失败: {str(e)}")
+            return
+        finally:
+            with self._lock:
+                self._pending.discard(origin)
+        if self.on_ready is not None:
+            self.on_ready(origin, path, ext)
+
+    def fetch(self, origin):
+        """下载站点图标，返回 (数据, 扩展名)，找不到时返回 None"""
+        found = self._download_image(origin + "/favicon.ico")
+        if found is not None:
+            return found
+        href = self._find_icon_link(origin + "/")
+        if href is None:
+            return None
+        return self._download_image(urljoin(origin + "/", href))
+
+    def _open(self, url):
+        request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+        return urllib.request.urlopen(request, timeout=self.timeout)
+
+    def _download_image(self, url):
+        try:
+            with self._open(url) as response:
+                data = response.read(FAVICON_MAX_BYTES + 1)
+        except (OSError, ValueError):
+            return None
+        ext = sniff_image(data)
+        if ext is None or len(data) > FAVICON_MAX_BYTES:
+            return None
+        return data, ext
+
+    def _find_icon_link(self, url):
+        try:
+            with self._open(url) as response:
+                charset = response.headers.get_content_charset() or "utf-8"
+                page = response.read(PAGE_PEEK_BYTES)
+        except (OSError, ValueError):
+            return None
+        parser = _IconLinkParser()
+        try:
+            parser.feed(page.decode(charset, "replace"))
+        except LookupError:
+            parser.feed(page.decode("utf-8", "replace"))
+        return parser.href
+
+    def shutdown(self, wait=False):
+        """停止下载；wait 为 True 时等待全部下载完成，否则取消排队中的任务"""
+        if wait:
+            self._pool.shutdown(wait=True)
+        else:
+            self._pool.shutdown(wait=False, cancel_futures=True)
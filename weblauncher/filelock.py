@@ -0,0 +1,67 @@
+# weblauncher/filelock.py
+"""跨进程的建议性文件锁：同时运行的多个前端轮流写数据文件"""
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    try:
+        import msvcrt
+    except ImportError:
+        msvcrt = None
+
+
+class FileLock:
+    """with FileLock(path): ... 独占持有锁文件
+
+    每次加锁都重新打开锁文件，同一进程的不同线程之间也互斥
+    （flock 按打开的文件计算）。不支持加锁的平台上只是空操作。
+    """
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        f = open(self.path, "a+b")
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            elif msvcrt is not None:
+                f.seek(0)
+                # LK_LOCK 最多重试 10 秒，仍然拿不到时继续等待
+                while True:
+                    try:
+                        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+        except BaseException:
+            f.close()
+            raise
+        self._file = f
+        return self
+
+    def __exit__(self, *exc_info):
+        f, self._file = self._file, None
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            f.close()
+
+
+def lock_path(data_file):
+    return data_file + ".lock"
+
+
+def file_identity(path):
+    """(设备, inode)，用来判断文件是否被替换；文件不存在时返回 None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_dev, stat.st_ino
@@ -0,0 +1,158 @@
+# weblauncher/fuzzy.py
+"""按拼音和模糊程度排序的名称搜索"""
+import heapq
+from bisect import bisect_left, insort
+
+from .pinyin import name_keys
+
+FUZZY_TOP_K = 20          # 排序结果最多返回的网站数
+FUZZY_CANDIDATES = 2000   # 每一层最多检查的候选键数
+
+# 匹配层级，数值越小越靠前
+PREFIX, INITIALS, SUBSEQUENCE, TYPO = range(4)
+
+
+def is_subsequence(query, text):
+    """query 的字符是否按顺序出现在 text 中"""
+    it = iter(text)
+    return all(char in it for char in query)
+
+
+def within_distance(a, b, limit):
+    """a、b 的编辑距离不超过 limit 时返回距离，否则返回 None"""
+    if abs(len(a) - len(b)) > limit:
+        return None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= limit else None
+
+
+def typo_limit(query):
+    """允许的拼写错误数：太短的关键词不做纠错"""
+    if len(query) < 3:
+        return 0
+    return 1 if len(query) <= 5 else 2
+
+
+class FuzzyIndex:
+    """名称的拼音前缀索引和分层模糊匹配
+
+    每个网站的小写名称、全拼和首字母作为键放进一个有序列表，
+    查询时用二分查找取出以关键词开头的一段，结果分层排序：
+    名称/全拼前缀 > 首字母前缀 > 子序列 > 少量拼写错误。
+    每层只检查有限个候选，前一层凑够 k 个结果就不再往下找，
+    耗时与网站总数基本无关。
+    """
+    def __init__(self, sites=()):
+        self.entries = {}   # 网站ID -> (网站, 去掉空白的小写名称, 全拼, 首字母)
+        self.keys = []      # 排序的 (键, 网站ID)
+        self.add_many(sites)
+
+    @staticmethod
+    def _entry(site):
+        name = "".join(site["name"].lower().split())
+        full, initials = name_keys(site["name"])
+        return site, name, full, initials
+
+    @staticmethod
+    def _entry_keys(entry):
+        return {key for key in entry[1:] if key}
+
+    def add(self, site):
+        """索引一个新网站"""
+        self.remove(site["id"])
+        entry = self._entry(site)
+        self.entries[site["id"]] = entry
+        for key in self._entry_keys(entry):
+            insort(self.keys, (key, site["id"]))
+
+    def add_many(self, sites):
+        """批量索引新网站：追加后整体排序一次，避免逐个插入"""
+        entries = self.entries
+        keys = self.keys
+        for site in sites:
+            if site["id"] in entries:
+                self.remove(site["id"])
+            entry = self._entry(site)
+            entries[site["id"]] = entry
+            keys.extend((key, site["id"]) for key in self._entry_keys(entry))
+        keys.sort()
+
+    def remove(self, site_id):
+        """从索引中删除网站"""
+        entry = self.entries.pop(site_id, None)
+        if entry is None:
+            return False
+        keys = self.keys
+        for key in self._entry_keys(entry):
+            i = bisect_left(keys, (key, site_id))
+            if i < len(keys) and keys[i] == (key, site_id):
+                del keys[i]
+        return True
+
+    def update(self, site):
+        """网站名称变化后重新索引"""
+        self.add(site)
+
+    def _range(self, prefix):
+        """以 prefix 开头的键，最多 FUZZY_CANDIDATES 个"""
+        keys = self.keys
+        i = bisect_left(keys, (prefix,))
+        end = min(len(keys), i + FUZZY_CANDIDATES)
+        while i < end and keys[i][0].startswith(prefix):
+            yield keys[i]
+            i += 1
+
+    def _better(self, best, site_id, score):
+        if score is not None and (site_id not in best or score < best[site_id]):
+            best[site_id] = score
+
+    def search(self, keyword, k=FUZZY_TOP_K):
+        """返回最匹配的至多 k 个网站（按层级、再按名称长度排序）"""
+        query = "".join(keyword.lower().split())
+        if not query:
+            return []
+        entries = self.entries
+        best = {}  # 网站ID -> (层级, 附加分)
+        # 前缀层：二分查找到的一段键
+        for key, site_id in self._range(query):
+            _, name, full, initials = entries[site_id]
+            if key == initials and key not in (name, full):
+                self._better(best, site_id, (INITIALS, len(key)))
+            else:
+                self._better(best, site_id, (PREFIX, len(key)))
+        # 前缀结果不够时，在首字符相同的键中找子序列
+        if len(best) < k and len(query) > 1:
+            for key, site_id in self._range(query[0]):
+                if site_id not in best and is_subsequence(query, key):
+                    best[site_id] = (SUBSEQUENCE, len(key))
+        # 仍然不够时找拼写错误：假定关键词前一半没有输错，只检查这一半开头的键
+        limit = typo_limit(query)
+        if len(best) < k and limit:
+            half = len(query) // 2
+            tail = query[half:]
+            distances = {}  # 键的后半段 -> 编辑距离，相同的后半段只算一次
+            for key, site_id in self._range(query[:half]):
+                if site_id in best:
+                    continue
+                key_tail = key[half:len(query)]
+                if key_tail not in distances:
+                    distances[key_tail] = within_distance(tail, key_tail, limit)
+                distance = distances[key_tail]
+                if distance is not None:
+                    self._better(best, site_id, (TYPO, distance, len(key)))
+        ranked = heapq.nsmallest(k, best.items(), key=lambda item: item[1])
+        return [entries[site_id][0] for site_id, _ in ranked]
+
+
+def merge_ranked(ranked, matched):
+    """排序结果在前，其余子串匹配结果按原顺序接在后面（去重）"""
+    seen = {site["id"] for site in ranked}
+    return ranked + [site for site in matched if site["id"] not in seen]
@@ -0,0 +1,234 @@
+# weblauncher/health.py
+"""异步检查网站链接是否有效，结果带有效期缓存到磁盘"""
+import asyncio
+import json
+import os
+import ssl
+import time
+from urllib.parse import urljoin, urlsplit
+
+HEALTH_TTL = 24 * 3600     # 检查结果的有效期（秒），过期后才重新检查
+CHECK_CONCURRENCY = 16     # 同时进行的请求数
+HOST_INTERVAL = 1.0        # 同一主机两次请求的最小间隔（秒）
+CHECK_TIMEOUT = 10.0       # 单次请求（连接 + 读取响应头）的超时（秒）
+MAX_REDIRECTS = 5
+PROGRESS_INTERVAL = 0.25   # 进度回调的最小间隔（秒）
+
+# 检查结果
+ALIVE = "ok"
+BROKEN = "broken"            # 服务器返回错误状态码
+UNREACHABLE = "unreachable"  # 连接失败、超时、证书错误等
+HEALTH_BADGES = {BROKEN: "[失效]", UNREACHABLE: "[无法访问]"}
+# 服务器在线但拒绝匿名访问或限流，仍算有效
+_ALIVE_CODES = {401, 403, 429}
+USER_AGENT = "Mozilla/5.0 (compatible; WebLauncher link checker)"
+
+
+class TooManyRedirects(Exception):
+    """重定向次数超过上限（通常是重定向循环）"""
+    def __init__(self, code):
+        super().__init__(f"重定向超过 {MAX_REDIRECTS} 次")
+        self.code = code
+
+
+class HealthCache:
+    """链接检查结果的磁盘缓存：{URL: [结果, 状态码, 检查时间]}，path 为 None 时只在内存中"""
+    def __init__(self, path, ttl=HEALTH_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.entries = {}
+
+    def load(self):
+        """读取缓存文件，文件缺失或损坏时从空缓存开始"""
+        if self.path is None:
+            return self
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            self.entries = entries if isinstance(entries, dict) else {}
+        except (OSError, ValueError):
+            self.entries = {}
+        return self
+
+    def status(self, url):
+        """URL 最近一次的检查结果，没有检查过返回 None"""
+        entry = self.entries.get(url)
+        return entry[0] if entry else None
+
+    def badge(self, url):
+        """界面上显示的标记，有效或未检查时为空字符串"""
+        return HEALTH_BADGES.get(self.status(url), "")
+
+    def stale(self, urls, now=None):
+        """需要重新检查的 URL（去重，保持顺序）"""
+        if now is None:
+            now = time.time()
+        entries = self.entries
+        result = []
+        for url in dict.fromkeys(urls):
+            entry = entries.get(url)
+            if entry is None or now - entry[2] >= self.ttl:
+                result.append(url)
+        return result
+
+    def put(self, url, status, code, checked_at=None):
+        self.entries[url] = [status, code, time.time() if checked_at is None else checked_at]
+
+    def save(self):
+        """原子写入缓存文件"""
+        if self.path is None:
+            return
+        tmp_file = self.path + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp_file, self.path)
+
+
+class LinkChecker:
+    """基于 asyncio 的链接检查器
+
+    同时进行的请求数由信号量限制，同一主机的请求之间至少间隔
+    host_interval 秒。每个链接先发 HEAD，服务器不支持或返回错误时
+    再用 GET 确认（只读响应头）；最多跟随 max_redirects 次重定向。
+    只用标准库的 asyncio 流实现 HTTP/1.1，不需要额外依赖。
+    """
+    def __init__(self, concurrency=CHECK_CONCURRENCY, host_interval=HOST_INTERVAL,
+                 timeout=CHECK_TIMEOUT, max_redirects=MAX_REDIRECTS):
+        self.concurrency = concurrency
+        self.host_interval = host_interval
+        self.timeout = timeout
+        self.max_redirects = max_redirects
+        self._ssl = ssl.create_default_context()
+
+    def run(self, urls, on_result=None):
+        """在当前线程运行事件循环检查全部 URL，返回 {URL: (结果, 状态码)}"""
+        return asyncio.run(self.check_all(urls, on_result))
+
+    async def check_all(self, urls, on_result=None):
+        """并发检查，on_result(url, 结果, 状态码) 在每个链接检查完后调用"""
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._host_locks = {}
+        self._host_next = {}
+        results = {}
+
+        async def one(url):
+            status, code = await self.check(url)
+            results[url] = (status, code)
+            if on_result is not None:
+                on_result(url, status, code)
+
+        await asyncio.gather(*(one(url) for url in dict.fromkeys(urls)))
+        return results
+
+    async def check(self, url):
+        """检查一个链接，返回 (结果, 状态码)；连接失败时状态码为 None"""
+        try:
+            code = await self._follow("HEAD", url)
+            if code >= 400 and code not in _ALIVE_CODES:
+                # 不少服务器不支持 HEAD（405/501）或对 HEAD 返回错误
+                code = await self._follow("GET", url)
+        except TooManyRedirects as e:
+            return BROKEN, e.code
+        except (OSError, asyncio.TimeoutError, ValueError, UnicodeError):
+            return UNREACHABLE, None
+        if code < 400 or code in _ALIVE_CODES:
+            return ALIVE, code
+        return BROKEN, code
+
+    async def _follow(self, method, url):
+        """发送请求并跟随重定向，返回最终的状态码"""
+        for _ in range(self.max_redirects + 1):
+            code, location = await self._request(method, url)
+            if code not in (301, 302, 303, 307, 308) or not location:
+                return code
+            url = urljoin(url, location)
+        raise TooManyRedirects(code)
+
+    async def _wait_turn(self, host):
+        """同一主机的请求按 host_interval 排队"""
+        lock = self._host_locks.setdefault(host, asyncio.Lock())
+        loop = asyncio.get_running_loop()
+        async with lock:
+            delay = self._host_next.get(host, 0) - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._host_next[host] = loop.time() + self.host_interval
+
+    async def _request(self, method, url):
+        """一次 HTTP 请求，只读取状态行和响应头，返回 (状态码, Location)"""
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"不支持的URL: {url}")
+        host = parts.hostname.encode("idna").decode("ascii")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        await self._wait_turn(host)
+        async with self._semaphore:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port,
+                                        ssl=self._ssl if parts.scheme == "https" else None),
+                self.timeout)
+            try:
+                default_port = 443 if parts.scheme == "https" else 80
+                host_header = host if port == default_port else f"{host}:{port}"
+                writer.write((f"{method} {path} HTTP/1.1\r\n"
+                              f"Host: {host_header}\r\n"
+                              f"User-Agent: {USER_AGENT}\r\n"
+                              "Accept: */*\r\n"
+                              "Connection: close\r\n\r\n").encode("latin-1"))
+                await writer.drain()
+                return await asyncio.wait_for(self._read_head(reader), self.timeout)
+            finally:
+                writer.close()
+                try:
+                    await asyncio.wait_for(writer.wait_closed(), self.timeout)
+                except (OSError, asyncio.TimeoutError):
+                    pass
+
+    @staticmethod
+    async def _read_head(reader):
+        status_line = await reader.readline()
+        fields = status_line.split(None, 2)
+        if len(fields) < 2 or not fields[0].startswith(b"HTTP/"):
+            raise ValueError("无效的HTTP响应")
+        code = int(fields[1])
+        location = None
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"location":
+                location = value.strip().decode("latin-1")
+        return code, location
+
+
+def check_links(urls, cache, checker=None, progress=None, now=None):
+    """只检查缓存中过期或缺失的 URL，结果写回缓存并保存
+
+    供界面在后台线程调用；progress(已完成, 总数) 最多每
+    PROGRESS_INTERVAL 秒调用一次，最后一定会调用一次。
+    返回本次检查的 {URL: (结果, 状态码)}。
+    """
+    pending = cache.stale(urls, now)
+    if checker is None:
+        checker = LinkChecker()
+    done = 0
+    last_report = 0.0
+
+    def on_result(url, status, code):
+        nonlocal done, last_report
+        cache.put(url, status, code)
+        done += 1
+        if progress is not None and time.monotonic() - last_report >= PROGRESS_INTERVAL:
+            last_report = time.monotonic()
+            progress(done, len(pending))
+
+    results = checker.run(pending, on_result) if pending else {}
+    cache.save()
+    if progress is not None:
+        progress(done, len(pending))
+    return results
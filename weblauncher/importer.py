@@ -0,0 +1,279 @@
+# weblauncher/importer.py
+"""浏览器书签批量导入（Netscape HTML、Chrome/Firefox JSON、CSV）
+
+文件按块流式读取，不会整体载入内存；URL 按批校验并报告进度，
+结果由调用方一次性批量写入。
+"""
+import csv
+import json
+import os
+import re
+from html.parser import HTMLParser
+
+from .urls import is_valid_url
+
+try:
+    import ijson  # 可选：流式解析大型 JSON 导出
+except ImportError:
+    ijson = None
+
+IMPORT_BATCH = 2000   # 每校验这么多个书签报告一次进度
+READ_CHUNK = 64 * 1024
+# 浏览器的根文件夹不作为分类
+ROOT_FOLDERS = {"", "书签栏", "书签菜单", "其他书签", "移动设备书签",
+                "Bookmarks bar", "Bookmarks Bar", "Bookmarks Menu", "Bookmarks Toolbar",
+                "Other bookmarks", "Other Bookmarks", "Mobile bookmarks", "Mobile Bookmarks",
+                "bookmark_bar", "other", "synced", "menu", "toolbar", "unfiled", "mobile"}
+
+
+class _NetscapeParser(HTMLParser):
+    """Netscape 书签格式：<H3> 是文件夹名，<DL> 开始其内容，<A> 是书签"""
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.folders = []
+        self.pending = []        # 已解析但还没交出去的 (名称, URL, 文件夹)
+        self._next_folder = None
+        self._text = None        # 正在收集的 <H3>/<A> 文字
+        self._href = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            self._href = dict(attrs).get("href", "")
+            self._text = []
+        elif tag == "h3":
+            self._text = []
+        elif tag == "dl":
+            self.folders.append(self._next_folder or "")
+            self._next_folder = None
+
+    def handle_endtag(self, tag):
+        if tag == "a" and self._href is not None:
+            folder = self.folders[-1] if self.folders else ""
+            self.pending.append(("".join(self._text).strip(), self._href, folder))
+            self._href = self._text = None
+        elif tag == "h3" and self._text is not None:
+            self._next_folder = "".join(self._text).strip()
+            self._text = None
+        elif tag == "dl" and self.folders:
+            self.folders.pop()
+
+    def handle_data(self, data):
+        if self._text is not None:
+            self._text.append(data)
+
+
+def iter_netscape_html(f):
+    """逐块解析 Netscape 书签 HTML，产出 (名称, URL, 文件夹)"""
+    parser = _NetscapeParser()
+    while True:
+        chunk = f.read(READ_CHUNK)
+        if not chunk:
+            break
+        parser.feed(chunk)
+        yield from parser.pending
+        parser.pending.clear()
+    parser.close()
+    yield from parser.pending
+
+
+# 一个 JSON 记号：标点、字符串或数字/true/false/null
+_JSON_TOKEN = re.compile(r'\s*(?:([{}\[\],:])|("(?:[^"\\]|\\.)*")|([^\s{}\[\],:"]+))')
+
+
+def _json_events(f):
+    """没有 ijson 时的增量 JSON 解析：按块读取，产出与 ijson.parse 形式相同的 (前缀, 事件, 值)
+
+    只用于遍历书签树，前缀一律为空。
+    """
+    buf = ""
+    pos = 0
+    eof = False
+    stack = []   # 每层一项："key"/"value" 为对象中下一个字符串的角色，"array" 为数组
+    while True:
+        match = _JSON_TOKEN.match(buf, pos)
+        if match is None or (match.end() == len(buf) and not eof):
+            # 缓冲区末尾的记号可能还没读完整
+            if eof:
+                if buf[pos:].strip():
+                    raise ValueError(f"JSON 格式错误: {buf[pos:pos + 40]!r}")
+                if stack:
+                    raise ValueError("JSON 文件不完整")
+                return
+            chunk = f.read(READ_CHUNK)
+            buf = buf[pos:] + chunk
+            pos = 0
+            eof = not chunk
+            continue
+        pos = match.end()
+        punct, string, scalar = match.groups()
+        if punct == "{":
+            stack.append("key")
+            yield "", "start_map", None
+        elif punct == "[":
+            stack.append("array")
+            yield "", "start_array", None
+        elif punct == "}" or punct == "]":
+            if not stack:
+                raise ValueError(f"JSON 格式错误: 多余的 {punct}")
+            yield "", "end_map" if stack.pop() != "array" else "end_array", None
+        elif punct == ",":
+            if stack and stack[-1] == "value":
+                stack[-1] = "key"
+        elif string is not None:
+            if stack and stack[-1] == "key":
+                stack[-1] = "value"
+                yield "", "map_key", json.loads(string)
+            else:
+                yield "", "string", json.loads(string)
+        elif scalar is not None:
+            value = json.loads(scalar)
+            event = "null" if value is None else "boolean" if isinstance(value, bool) else "number"
+            yield "", event, value
+
+
+class _Folder:
+    """流式 JSON 中的文件夹；Chrome 把 name 写在 children 之后，名称读完才能确定"""
+    __slots__ = ("name",)
+
+    def __init__(self):
+        self.name = ""
+
+
+def iter_bookmarks_json(f):
+    """解析 Chrome Bookmarks 或 Firefox 书签备份 JSON，产出 (名称, URL, 文件夹)
+
+    逐个书签流式读取（文件夹为 _Folder，名称稍后填入）；
+    安装了 ijson 时用它解析，否则用 _json_events。
+    """
+    events = ijson.parse(f) if ijson is not None else _json_events(f)
+    # 每个 JSON 对象一帧：[字段, 当前键, 文件夹(有 children 时)]
+    frames = []
+    for _, event, value in events:
+        if event == "start_map":
+            frames.append([{}, None, None])
+        elif event == "map_key":
+            frames[-1][1] = value
+        elif event == "string" and frames:
+            frames[-1][0][frames[-1][1]] = value
+        elif event == "start_array" and frames and frames[-1][1] == "children":
+            frames[-1][2] = _Folder()
+        elif event == "end_map":
+            fields, _, folder = frames.pop()
+            title = fields.get("name") or fields.get("title") or ""
+            if folder is not None:
+                folder.name = title
+                continue
+            url = fields.get("url") or fields.get("uri")
+            if url:
+                parent = next((frame[2] for frame in reversed(frames) if frame[2] is not None), "")
+                yield title, url, parent
+
+
+def iter_csv(f):
+    """解析 CSV：表头含 name/title、url/href、category/folder 列；无表头时依次为名称、URL、分类"""
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = [h.strip().lower() for h in header]
+
+    def find(*names):
+        return next((columns.index(n) for n in names if n in columns), None)
+
+    url_col = find("url", "href", "uri", "link", "网址")
+    if url_col is None:
+        name_col, url_col, folder_col = 0, 1, 2
+        rows = [header]
+    else:
+        name_col = find("name", "title", "名称")
+        folder_col = find("category", "folder", "分类", "文件夹")
+        rows = []
+    for row in _chain(rows, reader):
+        if len(row) <= url_col:
+            continue
+        name = row[name_col] if name_col is not None and name_col < len(row) else ""
+        folder = row[folder_col] if folder_col is not None and folder_col < len(row) else ""
+        yield name.strip(), row[url_col].strip(), folder.strip()
+
+
+def _chain(first, rest):
+    yield from first
+    yield from rest
+
+
+def detect_format(path):
+    """根据扩展名和文件开头判断书签格式"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".html", ".htm"):
+        return "html"
+    if ext == ".json":
+        return "json"
+    if ext == ".csv":
+        return "csv"
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        head = f.read(512).lstrip().lower()
+    if head.startswith("<!doctype netscape-bookmark") or head.startswith("<"):
+        return "html"
+    if head.startswith("{"):
+        return "json"
+    return "csv"
+
+
+class BookmarkImporter:
+    """流式导入书签：解析 -> 按批校验 -> 收集为网站记录
+
+    progress(已读取, 有效数, 无效数, 进度0~1) 在每批校验完成后调用。
+    category_map 可把文件夹名映射为应用内分类；
+    不在映射中的文件夹直接作为分类名，根文件夹归入 default_category。
+    """
+    def __init__(self, default_category="其他", category_map=None,
+                 batch_size=IMPORT_BATCH, progress=None):
+        self.default_category = default_category
+        self.category_map = category_map or {}
+        self.batch_size = batch_size
+        self.progress = progress
+
+    def category_for(self, folder):
+        """文件夹名 -> 分类"""
+        if folder in self.category_map:
+            return self.category_map[folder]
+        if folder in ROOT_FOLDERS:
+            return self.default_category
+        return folder
+
+    def _open(self, path, fmt):
+        if fmt == "json" and ijson is not None:
+            return open(path, "rb")
+        if fmt == "csv":
+            return open(path, "r", encoding="utf-8-sig", newline="")
+        return open(path, "r", encoding="utf-8", errors="replace")
+
+    def run(self, path, fmt=None):
+        """导入一个书签文件，返回 [(名称, URL, 分类), ...]"""
+        fmt = fmt or detect_format(path)
+        parse = {"html": iter_netscape_html, "json": iter_bookmarks_json, "csv": iter_csv}[fmt]
+        total_bytes = os.path.getsize(path) or 1
+        valid = []
+        read = rejected = 0
+        # 校验是纯 Python 的正则匹配，进程池的序列化开销比校验本身还大，
+        # 这里直接在调用线程（界面的导入线程）中按批校验
+        with self._open(path, fmt) as f:
+            raw = getattr(f, "buffer", f)
+            for item in parse(f):
+                read += 1
+                if is_valid_url(item[1]):
+                    valid.append(item)
+                else:
+                    rejected += 1
+                if read % self.batch_size == 0:
+                    self._report(read, len(valid), rejected, raw.tell() / total_bytes)
+
+        # 文件夹名称到这里都已确定
+        records = [(name or url, url, self.category_for(folder if isinstance(folder, str) else folder.name))
+                   for name, url, folder in valid]
+        self._report(read, len(records), rejected, 1.0)
+        return records
+
+    def _report(self, read, valid, rejected, fraction):
+        if self.progress is not None:
+            self.progress(read, valid, rejected, min(fraction, 1.0))
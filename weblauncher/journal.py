@@ -0,0 +1,412 @@
+# weblauncher/journal.py
+"""追加式日志存储：快照文件 + 操作日志"""
+import glob
+import json
+import os
+import threading
+import uuid
+from array import array
+
+from .filelock import FileLock, file_identity, lock_path
+from .paging import PagedSnapshot, write_index
+from .records import Site, to_json
+from .snapshot import BinarySnapshot, remove_binary_snapshot, write_binary_snapshot
+
+SNAPSHOT_VERSION = 1
+COMPACT_THRESHOLD = 256 * 1024  # 日志超过该字节数后在后台压缩为新快照
+
+
+class SiteJournal:
+    """网站数据的追加式日志存储
+
+    custom_sites.json 仍是每行一个网站的快照（首行为元信息），
+    每次增删改只向 custom_sites.json.journal 追加一行操作记录，
+    加载时在快照上按序号重放日志。快照旁另有同样内容的二进制快照
+    （custom_sites.json.bin），完整加载时优先读取它，只解析和校验
+    日志中的增量；它缺失、版本不符或与 JSONL 快照对不上时读取 JSONL。
+
+    多个进程可以共用同一份数据：写日志、轮转和写快照都持有文件锁
+    （custom_sites.json.lock），写之前先读入其他进程追加的记录，
+    序号不会重复。记下本进程在日志中读到的位置，read_new() 只读取
+    之后新增的记录；日志被其他进程轮转时先读完旧文件剩下的部分。
+    需要合并的记录排在本进程写入的记录之前时，本进程的记录也交给
+    界面按日志顺序重新应用，两边的结果与重新加载一致。
+    """
+    def __init__(self, data_file, compact_threshold=COMPACT_THRESHOLD):
+        self.data_file = data_file
+        self.journal_file = data_file + ".journal"
+        self.compact_threshold = compact_threshold
+        self.seq = 0
+        self.lock = FileLock(lock_path(data_file))
+        self.needs_reload = False  # 漏掉了已被合并删除的日志，只能完整重新加载
+        self.renamed = 0           # 上次加载时换了新ID的网站数（旧数据），见 _load_jsonl
+        self._lock = threading.Lock()
+        self._compactor = None
+        self._offset = 0           # 本进程已读到的日志位置
+        self._identity = None      # 读取时日志文件的 (设备, inode)
+        self._pending = []         # 已读入但还没交给界面合并的记录（其他进程的，及排在其后的本进程的）
+
+    def load(self, validate=None, factory=None):
+        """读取快照并重放日志，返回网站列表
+
+        factory 把校验通过的 dict 转换为 Site（如 Site.from_dict）；有
+        factory 时可以使用二进制快照，其中的网站直接是 Site。
+        """
+        with self._lock, self.lock:
+            return self._load(validate, factory)
+
+    def _load(self, validate, factory):
+        self.renamed = 0
+        snapshot = self._load_binary() if factory is not None else None
+        if snapshot is not None:
+            snapshot_seq, sites = snapshot
+        else:
+            snapshot_seq, sites = self._load_jsonl(validate)
+
+        self.seq = snapshot_seq
+        for path in self._journal_files():
+            self._replay(path, sites, snapshot_seq, validate)
+        self._mark_read()
+        if factory is not None:
+            return [site if isinstance(site, Site) else factory(site) for site in sites.values()]
+        return list(sites.values())
+
+    def _load_binary(self):
+        """(快照序号, {网站ID: Site})，没有可用的二进制快照时返回 None"""
+        snapshot = BinarySnapshot.open(self.data_file)
+        if snapshot is None:
+            return None
+        try:
+            return snapshot.seq, {site.id: site for site in snapshot.load_all()}
+        except (ValueError, IndexError, UnicodeDecodeError) as e:
+            print(f"读取二进制快照失败，改用 JSONL: {str(e)}")
+            return None
+        finally:
+            snapshot.close()
+
+    def _load_jsonl(self, validate):
+        """(快照序号, {网站ID: dict})：逐行解析并校验 JSONL 快照
+
+        旧版本的数据可能没有ID或有重复的ID（旧 tkinter 版本按分类中的
+        网站数编号，删除后再添加会重号）。这些网站换上由行号和内容算出
+        的新ID（几个进程同时迁移时结果相同），个数记在 renamed 中，由
+        调用方尽快写成新快照；不能用的行也打印出来，不会悄悄丢掉。
+        """
+        sites = {}
+        snapshot_seq = 0
+        skipped = 0
+        with open(self.data_file, "r", encoding="utf-8") as f:
+            for lineno, line in enumerate(f):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    skipped += 1
+                    continue
+                if not isinstance(record, dict):
+                    skipped += 1
+                    continue
+                if "_meta" in record:
+                    snapshot_seq = record["_meta"].get("seq", 0)
+                    continue
+                if validate is not None and not validate(record):
+                    skipped += 1
+                    continue
+                site_id = record.get("id")
+                if not isinstance(site_id, str) or not site_id or site_id in sites:
+                    record = dict(record, id=self._fresh_id(record, lineno, sites))
+                    self.renamed += 1
+                sites[record["id"]] = record
+        if skipped:
+            print(f"数据文件中有 {skipped} 行无法读取或不是有效的网站，已跳过")
+        return snapshot_seq, sites
+
+    def _fresh_id(self, record, lineno, sites):
+        """给没有ID或ID重复的网站一个新ID（同样的内容总是得到同样的ID）"""
+        category = record.get("category")
+        if not isinstance(category, str) or not category:
+            category = "其他"
+        key = f"{lineno}:{record.get('id')}:{record.get('url')}"
+        site_id = f"{category}_{uuid.uuid5(uuid.NAMESPACE_URL, key).hex}"
+        while site_id in sites:
+            site_id += "_"
+        return site_id
+
+    def _journal_files(self):
+        """按顺序列出压缩中轮转出的旧日志和当前日志"""
+        rotated = []
+        for path in glob.glob(glob.escape(self.journal_file) + ".*"):
+            suffix = path.rsplit(".", 1)[1]
+            if suffix.isdigit():
+                rotated.append((int(suffix), path))
+        paths = [path for _, path in sorted(rotated)]
+        if os.path.exists(self.journal_file):
+            paths.append(self.journal_file)
+        return paths
+
+    def _replay(self, path, sites, snapshot_seq, validate):
+        """在快照上重放一个日志文件，跳过快照已包含的记录"""
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    seq = entry["seq"]
+                    op = entry["op"]
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    continue  # 崩溃时写了一半的行
+                self.seq = max(self.seq, seq)
+                if seq <= snapshot_seq:
+                    continue
+                if op == "add":
+                    site = entry.get("site")
+                    if isinstance(site, dict) and (validate is None or validate(site)):
+                        sites[site.get("id")] = site
+                elif op == "delete":
+                    sites.pop(entry.get("id"), None)
+                elif op == "update":
+                    site_id = entry.get("id")
+                    if site_id in sites:
+                        updated = dict(sites[site_id], **entry.get("fields", {}))
+                        if validate is None or validate(updated):
+                            sites[site_id] = updated
+
+    def _mark_read(self):
+        """加载完成：之后只需要读取日志中新增的部分"""
+        self._identity = file_identity(self.journal_file)
+        self._offset = os.path.getsize(self.journal_file) if self._identity else 0
+        self._pending = []
+        self.needs_reload = False
+
+    def _catch_up(self):
+        """读入其他进程追加的记录（调用时必须持有文件锁）
+
+        日志文件换了（被轮转，或本进程轮转后由其他进程新建）时，先读
+        轮转出的旧文件中序号比已读到的大的记录，再从头读新日志。序号
+        按写入顺序分配，轮转出的文件以其中最大的序号为后缀，序号不超过
+        已读到的序号的文件可以整个跳过。其他进程已经把本进程没读到的
+        记录合并进快照并删掉旧文件时，只能完整重新加载；之后的序号接在
+        快照后面，否则新记录会被下次加载当作快照已包含的记录跳过。
+        """
+        known = self.seq
+        identity = file_identity(self.journal_file)
+        if identity != self._identity or (
+                identity is not None and os.path.getsize(self.journal_file) < self._offset):
+            for path in self._journal_files():
+                if path == self.journal_file or int(path.rsplit(".", 1)[1]) <= known:
+                    continue
+                offset = self._offset if file_identity(path) == self._identity else 0
+                self._read_tail(path, offset, known)
+            self._offset = 0
+        snapshot_seq = self.snapshot_seq()
+        if snapshot_seq > self.seq:
+            self.needs_reload = True
+            self.seq = snapshot_seq
+        self._identity = identity
+        if identity is not None:
+            self._offset = self._read_tail(self.journal_file, self._offset, known)
+
+    def snapshot_seq(self):
+        """快照首行元信息中的序号（读不到时为 0）"""
+        try:
+            with open(self.data_file, "r", encoding="utf-8") as f:
+                return json.loads(f.readline())["_meta"].get("seq", 0)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return 0
+
+    def _read_tail(self, path, offset, after=0):
+        """读取日志 offset 之后、序号大于 after 的完整行，返回读到的位置"""
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            try:
+                entry = json.loads(line)
+                seq = entry["seq"]
+            except (ValueError, KeyError, TypeError):
+                continue
+            if seq <= after:
+                continue
+            self.seq = max(self.seq, seq)
+            self._pending.append(entry)
+        return offset + end
+
+    def read_new(self):
+        """其他进程在本进程上次读取之后追加的记录（按顺序）"""
+        with self._lock, self.lock:
+            self._catch_up()
+            entries, self._pending = self._pending, []
+        return entries
+
+    def discard_pending(self):
+        """放弃其他进程追加、本进程还没合并的记录（整体恢复数据之前调用）"""
+        with self._lock, self.lock:
+            self._catch_up()
+            self._pending = []
+            self.needs_reload = False
+
+    def append(self, op, **payload):
+        """追加一条操作记录（add/delete/update）"""
+        self.append_many(op, [payload])
+
+    def append_many(self, op, payloads):
+        """批量追加同一种操作，一次写入、一次 fsync"""
+        self.append_records([(op, payload) for payload in payloads])
+
+    def append_records(self, records):
+        """按顺序追加若干条 (操作, 内容)，一次写入、一次 fsync"""
+        with self._lock, self.lock:
+            # 先读入其他进程的记录，序号接在它们后面
+            self._catch_up()
+            lines = []
+            for op, payload in records:
+                self.seq += 1
+                entry = {"seq": self.seq, "op": op}
+                entry.update(payload)
+                lines.append(json.dumps(entry, ensure_ascii=False, default=to_json) + "\n")
+            with open(self.journal_file, "ab") as f:
+                f.write("".join(lines).encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+                self._offset = f.tell()
+            if self._identity is None:
+                self._identity = file_identity(self.journal_file)
+            if self._pending:
+                # 其他进程的记录排在这些记录前面：合并时按日志顺序重新应用，
+                # 与重新加载的结果一致
+                self._pending.extend(json.loads(line) for line in lines)
+
+    def snapshot_lines(self):
+        """快照文件中每个网站的一行（字节，不含首行元信息）"""
+        with open(self.data_file, "rb") as f:
+            f.readline()
+            return f.readlines()
+
+    def is_clean(self):
+        """快照之后没有任何日志记录（可以直接按索引读取快照）"""
+        return all(os.path.getsize(path) == 0 for path in self._journal_files())
+
+    def open_paged(self, factory=None):
+        """日志为空且偏移索引有效时，返回按需解码的快照，否则返回 None"""
+        with self._lock, self.lock:
+            if not self.is_clean():
+                return None
+            paged = PagedSnapshot.open(self.data_file, factory)
+            if paged is not None:
+                self.seq = paged.seq
+                self._mark_read()
+            return paged
+
+    def is_indexed(self):
+        """快照之后没有日志，并且偏移索引与快照一致"""
+        paged = self.open_paged()
+        if paged is None:
+            return False
+        paged.close()
+        return True
+
+    def journal_size(self):
+        """当前日志文件大小（字节）"""
+        try:
+            return os.path.getsize(self.journal_file)
+        except OSError:
+            return 0
+
+    def maybe_compact(self, sites):
+        """日志超过阈值且没有正在进行的压缩时，启动后台压缩"""
+        if self.journal_size() < self.compact_threshold:
+            return False
+        if self._compactor is not None and self._compactor.is_alive():
+            return False
+        rotated = self._rotate(sites)
+        if rotated is None:
+            return False
+        seq, snapshot = rotated
+        # 非守护线程：程序退出前会等待压缩写完
+        self._compactor = threading.Thread(
+            target=self._write_compacted, args=(snapshot, seq), name="journal-compactor")
+        self._compactor.start()
+        return True
+
+    def compact(self, sites):
+        """立即把当前数据写成新快照并清空日志
+
+        有其他进程的记录还没合并进 sites 时不压缩，返回 False。
+        """
+        self.wait()
+        rotated = self._rotate(sites)
+        if rotated is None:
+            return False
+        seq, snapshot = rotated
+        return self._write_compacted(snapshot, seq)
+
+    def _rotate(self, sites):
+        """记下当前序号并轮转日志，之后的追加写入新日志文件
+
+        sites 必须已包含日志中的全部记录：有其他进程新追加、
+        本进程还没合并的记录时返回 None。
+        """
+        with self._lock, self.lock:
+            self._catch_up()
+            if self._pending or self.needs_reload:
+                return None
+            seq = self.seq
+            if os.path.exists(self.journal_file):
+                os.replace(self.journal_file, f"{self.journal_file}.{seq}")
+            self._identity = None
+            self._offset = 0
+            return seq, list(sites)
+
+    def _write_compacted(self, sites, seq):
+        """写入快照后删除已被快照包含的旧日志"""
+        with self.lock:
+            try:
+                self.write_snapshot(sites, seq)
+            except Exception as e:
+                print(f"压缩数据文件失败: {str(e)}")
+                return False
+            self._remove_rotated(seq)
+        return True
+
+    def _remove_rotated(self, seq):
+        for path in self._journal_files():
+            suffix = path.rsplit(".", 1)[1]
+            if suffix.isdigit() and int(suffix) <= seq:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def write_snapshot(self, sites, seq=None):
+        """原子写入快照：先写临时文件再重命名替换，随后更新偏移索引"""
+        if seq is None:
+            seq = self.seq
+        offsets = array("Q")
+        categories = {}
+        tmp_file = self.data_file + ".tmp"
+        with open(tmp_file, "wb") as f:
+            meta = {"version": SNAPSHOT_VERSION, "seq": seq}
+            offset = f.write((json.dumps({"_meta": meta}) + "\n").encode("utf-8"))
+            for pos, site in enumerate(sites):
+                offsets.append(offset)
+                categories.setdefault(site.get("category", "其他"), array("I")).append(pos)
+                line = json.dumps(site, ensure_ascii=False, default=to_json) + "\n"
+                offset += f.write(line.encode("utf-8"))
+            offsets.append(offset)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.data_file)
+        write_index(self.data_file, offsets, categories, seq)
+        try:
+            write_binary_snapshot(self.data_file, sites, seq)
+        except Exception as e:
+            # 二进制快照只是加速启动：写不成时删掉旧的，启动时读取 JSONL
+            print(f"写入二进制快照失败: {str(e)}")
+            remove_binary_snapshot(self.data_file)
+
+    def wait(self):
+        """等待后台压缩完成"""
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
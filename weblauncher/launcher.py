@@ -0,0 +1,144 @@
+# weblauncher/launcher.py
+"""在后台线程中打开浏览器，批量打开时限制并发和速率"""
+import os
+import threading
+import time
+import webbrowser
+from concurrent.futures import ThreadPoolExecutor
+
+# 同时启动浏览器的线程数（批量打开的并发上限）
+LAUNCH_WORKERS = int(os.environ.get("WEBLAUNCHER_LAUNCH_WORKERS", "2"))
+# 批量打开时每秒最多打开的网站数
+LAUNCH_RATE = float(os.environ.get("WEBLAUNCHER_LAUNCH_RATE", "2"))
+
+
+class BrowserLauncher:
+    """后台线程池调用 webbrowser.open
+
+    open(url, on_done) 立即返回，打开完成后在工作线程中调用
+    on_done(url, 错误信息或 None)，界面需要自己切回界面线程。
+    open_many() 按 concurrency 和 rate 限制逐个派发，返回可以
+    cancel() 的 LaunchBatch。shutdown() 之后不再接受新的网站：
+    open() 返回 None，正在派发的批次被取消。
+    """
+    def __init__(self, workers=LAUNCH_WORKERS, rate=LAUNCH_RATE, opener=None):
+        self.workers = workers
+        self.rate = rate
+        self.opener = opener or webbrowser.open
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="launcher")
+        self._lock = threading.Lock()  # 判断是否已关闭和提交放在一起，关闭时不会有提交插进来
+        self._closed = False
+        self._batches = set()
+
+    def open(self, url, on_done=None):
+        """打开一个网站（不受速率限制），已关闭时返回 None"""
+        return self._submit(url, on_done)
+
+    def _submit(self, url, on_done):
+        with self._lock:
+            if self._closed:
+                return None
+            return self._pool.submit(self._launch, url, on_done)
+
+    def open_many(self, urls, on_done=None, on_finished=None, concurrency=None, rate=None):
+        """批量打开，全部派发完成后调用 on_finished(打开数, 失败数, 是否被取消)"""
+        batch = LaunchBatch(self, list(urls), on_done, on_finished,
+                            min(concurrency or self.workers, self.workers), rate or self.rate)
+        with self._lock:
+            if self._closed:
+                batch.cancel()
+            else:
+                self._batches.add(batch)
+        batch.start()
+        return batch
+
+    def _launch(self, url, on_done):
+        try:
+            error = None if self.opener(url) else "没有可用的浏览器"
+        except Exception as e:
+            error = str(e)
+        if on_done is not None:
+            try:
+                on_done(url, error)
+            except Exception as e:
+                print(f"处理打开结果失败: {str(e)}")
+        return error
+
+    def shutdown(self):
+        """取消正在派发的批次并关闭线程池（已经提交的仍会打开）"""
+        with self._lock:
+            self._closed = True
+            batches, self._batches = self._batches, set()
+        for batch in batches:
+            batch.cancel()
+        self._pool.shutdown(wait=False)
+
+
+class LaunchBatch:
+    """一次批量打开：派发线程按速率提交，同时进行的不超过 concurrency 个"""
+    def __init__(self, launcher, urls, on_done, on_finished, concurrency, rate):
+        self.launcher = launcher
+        self.urls = urls
+        self.on_done = on_done
+        self.on_finished = on_finished
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.opened = 0
+        self.failed = 0
+        self._slots = threading.Semaphore(concurrency)
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._dispatch, name="launch-batch", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def cancel(self):
+        """不再派发剩下的网站（已经在打开的不受影响）"""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def is_running(self):
+        return self._thread.is_alive()
+
+    def _dispatch(self):
+        futures = []
+        next_at = time.monotonic()
+        for url in self.urls:
+            # 先等速率，再等空闲的并发名额
+            delay = next_at - time.monotonic()
+            if delay > 0 and self._cancelled.wait(delay):
+                break
+            self._slots.acquire()
+            if self._cancelled.is_set():
+                self._slots.release()
+                break
+            next_at = time.monotonic() + self.interval
+            future = self.launcher._submit(url, self._done)
+            if future is None:
+                # 启动器已关闭
+                self._slots.release()
+                self._cancelled.set()
+                break
+            futures.append(future)
+        for future in futures:
+            future.result()
+        with self.launcher._lock:
+            self.launcher._batches.discard(self)
+        if self.on_finished is not None:
+            try:
+                self.on_finished(self.opened, self.failed, self.cancelled)
+            except Exception as e:
+                print(f"处理批量打开结果失败: {str(e)}")
+
+    def _done(self, url, error):
+        with self._lock:
+            if error is None:
+                self.opened += 1
+            else:
+                self.failed += 1
+        self._slots.release()
+        if self.on_done is not None:
+            self.on_done(url, error)
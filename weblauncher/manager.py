@@ -0,0 +1,1163 @@
+# weblauncher/manager.py
+"""网站数据管理：不依赖界面，Kivy 和 tkinter 两个前端共用"""
+import os
+import shutil
+import sqlite3
+import uuid
+from array import array
+
+from .backups import BackupStore, site_lines
+from .categories import (ALL_CATEGORY, FREQUENT_CATEGORY, CategoryIndex, category_choices,
+                         navigation_order)
+from .complete import SiteCompleter
+from .database import SiteDatabase, SiteRows, database_path
+from .favicons import FaviconCache, FaviconFetcher
+from .fuzzy import FuzzyIndex, merge_ranked
+from .health import HealthCache, check_links
+from .journal import SiteJournal
+from .records import Site, local_now
+from .search import SearchIndex
+from .urls import (UrlIndex, canonical_url, duplicate_groups, is_valid_url, unique_records,
+                   with_scheme)
+from .usage import RankedView, UsageLog, rank_by_usage, snapshot_head
+from .watch import FileWatcher
+from .writer import FLUSH_INTERVAL, WriteBehind
+
+DATA_DIR = os.path.join(os.path.expanduser("~"), ".weblauncher")
+# 存储方式：默认 jsonl（custom_sites.json + 操作日志），设为 sqlite 使用 sites.db
+BACKEND = os.environ.get("WEBLAUNCHER_BACKEND", "jsonl")
+UNDO_LIMIT = 50  # 撤销时记住的最近修改数
+
+DEFAULT_SITES = [
+    {"id": "social_1", "name": "微博", "url": "https://weibo.com", "category": "社交"},
+    {"id": "social_2", "name": "微信", "url": "https://wx.qq.com", "category": "社交"},
+    {"id": "social_3", "name": "QQ", "url": "https://im.qq.com", "category": "社交"},
+    {"id": "social_4", "name": "知乎", "url": "https://www.zhihu.com", "category": "社交"},
+    {"id": "social_5", "name": "豆瓣", "url": "https://www.douban.com", "category": "社交"},
+    {"id": "tech_1", "name": "GitHub", "url": "https://github.com", "category": "技术"},
+    {"id": "tech_2", "name": "百度网盘", "url": "https://pan.baidu.com", "category": "工具"},
+    {"id": "tech_3", "name": "阿里云", "url": "https://www.aliyun.com", "category": "工具"},
+    {"id": "tech_4", "name": "CSDN", "url": "https://www.csdn.net", "category": "技术"},
+    {"id": "tech_5", "name": "Stack Overflow", "url": "https://stackoverflow.com", "category": "技术"},
+    {"id": "shopping_1", "name": "淘宝", "url": "https://www.taobao.com", "category": "购物"},
+    {"id": "shopping_2", "name": "京东", "url": "https://www.jd.com", "category": "购物"},
+    {"id": "shopping_3", "name": "拼多多", "url": "https://www.pinduoduo.com", "category": "购物"},
+    {"id": "shopping_4", "name": "唯品会", "url": "https://www.vip.com", "category": "购物"},
+    {"id": "shopping_5", "name": "网易严选", "url": "https://you.163.com", "category": "购物"},
+    {"id": "news_1", "name": "腾讯新闻", "url": "https://news.qq.com", "category": "新闻"},
+    {"id": "news_2", "name": "人民日报", "url": "https://www.people.com.cn", "category": "新闻"},
+    {"id": "news_3", "name": "36氪", "url": "https://www.36kr.com", "category": "新闻"},
+    {"id": "news_4", "name": "虎嗅", "url": "https://www.huxiu.com", "category": "新闻"},
+    {"id": "video_1", "name": "哔哩哔哩", "url": "https://www.bilibili.com", "category": "视频"},
+    {"id": "video_2", "name": "腾讯视频", "url": "https://v.qq.com", "category": "视频"},
+    {"id": "video_3", "name": "爱奇艺", "url": "https://www.iqiyi.com", "category": "视频"},
+    {"id": "video_4", "name": "优酷", "url": "https://www.youku.com", "category": "视频"},
+    {"id": "video_5", "name": "芒果TV", "url": "https://www.mgtv.com", "category": "视频"},
+    {"id": "education_1", "name": "知乎日报", "url": "https://daily.zhihu.com", "category": "新闻"},
+    {"id": "education_2", "name": "中国大学MOOC", "url": "https://www.icourse163.org", "category": "教育"},
+    {"id": "education_3", "name": "W3School", "url": "https://www.w3school.com.cn", "category": "技术"},
+    {"id": "education_4", "name": "LeetCode", "url": "https://leetcode.cn", "category": "技术"},
+    {"id": "live_1", "name": "斗鱼直播", "url": "https://www.douyu.com", "category": "直播"},
+    {"id": "live_2", "name": "虎牙直播", "url": "https://www.huya.com", "category": "直播"},
+    {"id": "ai_1", "name": "deepseek", "url": "https://www.deepseek.com/zh", "category": "工具"}
+]
+
+
+def _with_schemes(records):
+    """给导入的 (名称, URL, 分类) 补上协议，与 add_website 一致"""
+    return [(name, with_scheme(url), category) for name, url, category in records]
+
+
+class WebsiteManager:
+    """核心逻辑：网站数据管理
+
+    data_dir 默认为 ~/.weblauncher（只有默认目录会迁移旧版本数据，
+    基准测试可以指定临时目录）。保存失败等需要告诉用户的错误交给
+    on_error(消息)，没有设置时打印出来；后台写入失败时 on_error 在
+    写入线程中调用。
+
+    可选的服务由调用方传入，界面通过 open_manager 带上 default_services
+    中的全部服务；不传时只有数据层：修改直接写入日志（不启动写入线程），
+    常用度和链接检查结果只在内存中，没有图标、备份（批量修改不能撤销）
+    和按需解码，测试和基准测试不会启动线程或读写这些缓存。
+    flush_interval 为秒数时修改在这段时间内合并后由后台线程写入日志，
+    应用暂停时调用 flush()，退出时调用 close()。
+    """
+    def __init__(self, data_dir=None, build_indexes=True, on_error=None,
+                 flush_interval=None, usage=None, health=None, backups=None, favicons=None,
+                 paging=False):
+        self.on_error = on_error
+        self.watcher = None  # 监视其他进程的修改，见 start_watching
+        
+        # 跨平台数据文件路径
+        app_data_path = DATA_DIR if data_dir is None else data_dir
+        self.data_file = os.path.join(app_data_path, "custom_sites.json")
+        os.makedirs(app_data_path, exist_ok=True)
+        self.journal = SiteJournal(self.data_file)
+        self.writer = WriteBehind(self.journal, flush_interval, on_error=self.report_error,
+                                  on_written=self._after_write)
+        
+        # 打开记录（常用度）和链接检查结果缓存
+        self.usage = UsageLog(None) if usage is None else usage
+        self.health = HealthCache(None) if health is None else health
+        
+        # 多版本备份：保存时记下一个版本，可以恢复到任意版本或逐步撤销
+        self.backups = backups
+        self._undo = None  # (撤销后的 revision, 撤销到的版本ID)，连续撤销时继续往前退
+        self._changes = []  # 本次运行中可以撤销的修改：(说明, 操作, 撤销需要的内容)
+        
+        # 网站图标：后台下载，磁盘 LRU 缓存
+        self.favicons = favicons
+        self.paging = paging  # 日志为空时通过偏移索引按需解码快照
+        
+        # 迁移旧数据
+        if data_dir is None:
+            self.migrate_old_data()
+        
+        # 加载网站数据
+        self.paged = None  # 按需解码的快照，第一次修改或搜索时才完整载入
+        self.search_index = None
+        self.fuzzy_index = None
+        self.category_index = None
+        self.url_index = None  # 规范化URL -> 网站ID，第一次判断重复时建立
+        self.completer = None  # 添加网站时的输入联想，第一次使用时建立
+        self.indexing = False  # 后台正在建立索引，见 build_search_indexes
+        self.revision = 0  # 每次增删改加一，用于判断后台建好的索引是否过期
+        self.websites = self.load_websites()
+        if self.paged is None:
+            if build_indexes:
+                self.materialize()
+            else:
+                # 搜索索引稍后由 build_search_indexes 在后台建立
+                self.category_index = CategoryIndex(self.websites)
+        self.current_filter = "全部"
+    
+    def migrate_old_data(self):
+        """迁移旧版本数据"""
+        old_paths = [
+            os.path.join(os.path.expanduser("~"), "Library", "Application Support", "WebLauncher", "custom_sites.json"),
+            os.path.join(os.getenv('APPDATA', ''), "WebLauncher", "custom_sites.json"),
+            os.path.join(os.path.expanduser("~"), ".config", "WebLauncher", "custom_sites.json")
+        ]
+        
+        for old_path in old_paths:
+            if os.path.exists(old_path) and not os.path.exists(self.data_file):
+                try:
+                    shutil.copy2(old_path, self.data_file)
+                    print(f"迁移旧数据: {old_path} -> {self.data_file}")
+                except Exception as e:
+                    print(f"数据迁移失败: {str(e)}")
+    
+    def load_websites(self):
+        """加载已保存的网站数据"""
+        default_sites = [Site.from_dict(site) for site in DEFAULT_SITES]
+        
+        if not os.path.exists(self.data_file):
+            try:
+                with self.journal.lock:
+                    self.journal.write_snapshot(default_sites)
+                return default_sites
+            except Exception as e:
+                self.report_error(f"创建默认数据文件失败: {str(e)}")
+                return default_sites[:5]  # 返回部分默认数据
+        
+        # 日志为空时通过偏移索引按需解码：快照由已校验的数据写成，
+        # 启动时只读取第一屏需要的网站
+        paged = self.journal.open_paged(Site.from_dict) if self.paging else None
+        if paged is not None:
+            if len(paged):
+                self.paged = paged
+                return paged.sites()
+            paged.close()
+        
+        try:
+            # 快照 + 操作日志重放
+            sites = self.journal.load(self.validate_site, Site.from_dict)
+        except Exception as e:
+            self.report_error(f"加载数据文件失败: {str(e)}")
+            return default_sites
+        
+        if self.journal.renamed:
+            # 旧数据中没有ID或ID重复的网站换了新ID：立即写成新快照，
+            # 之后的日志记录都按新ID保存
+            print(f"{self.journal.renamed} 个网站的ID缺失或重复，已换上新ID")
+            self.journal.compact(sites)
+        
+        return sites or default_sites
+    
+    def materialize(self):
+        """把按需解码的快照完整载入内存并建立索引"""
+        if self.paged is not None:
+            self.websites = list(self.websites)
+            self.paged.close()
+            self.paged = None
+        if self.category_index is None:
+            self.category_index = CategoryIndex(self.websites)
+        if self.search_index is None:
+            self.search_index = SearchIndex(self.websites)
+            self.fuzzy_index = FuzzyIndex(self.websites)
+    
+    def build_search_indexes(self):
+        """在后台线程建立全部索引，返回值在界面线程交给 attach_search_indexes
+
+        按需解码快照时另外完整解码一份网站列表（不碰界面线程用的视图），
+        挂上时替换视图。建立期间 indexing 为真，输入联想先不给出结果，
+        不在界面线程中重复建立。
+        """
+        if self.search_index is not None and self.completer is not None:
+            return None
+        self.indexing = True
+        revision = self.revision
+        if self.search_index is not None:
+            # 已经完整载入：只建立按网站ID记录的URL索引和联想
+            sites = list(self.websites)
+            return revision, {"url_index": UrlIndex(sites), "completer": self._new_completer(sites)}
+        return revision, self._build_indexes(self._current_sites())
+    
+    def _current_sites(self):
+        """全部网站的一份列表（可在后台线程调用，按需解码时从快照另外解码）"""
+        paged = self.paged
+        if paged is not None:
+            try:
+                return paged.load_all()
+            except ValueError:
+                pass  # 界面线程刚换上完整的列表并关闭了快照
+        return list(self.websites)
+    
+    def _build_indexes(self, sites, url_index=None):
+        """sites 及其全部索引，交给 _attach_indexes"""
+        if url_index is None:
+            url_index = UrlIndex(sites)
+        return {"websites": sites, "category_index": CategoryIndex(sites),
+                "search_index": SearchIndex(sites), "fuzzy_index": FuzzyIndex(sites),
+                "url_index": url_index, "completer": self._new_completer(sites)}
+    
+    def _attach_indexes(self, indexes):
+        """换上后台建好的列表和索引（替换按需解码的视图）"""
+        if self.paged is not None:
+            self.paged.close()
+            self.paged = None
+        for name, index in indexes.items():
+            setattr(self, name, index)
+    
+    def attach_search_indexes(self, built):
+        """在界面线程挂上后台建好的索引；期间数据有变化时丢弃，需要时再重建
+
+        建立失败时也要调用（built 为 None），结束 indexing。
+        """
+        self.indexing = False
+        if built is None:
+            return False
+        revision, indexes = built
+        if revision != self.revision:
+            return False
+        if self.search_index is not None:
+            # 界面线程已经完整载入（如先搜索了）：列表和搜索索引用界面线程的，
+            # 只补上按网站ID记录的URL索引和联想
+            indexes = {name: indexes[name] for name in ("url_index", "completer")}
+        # 界面线程已经建好的（联想还记下了之后的打开）保留
+        self._attach_indexes({name: index for name, index in indexes.items()
+                              if name not in ("url_index", "completer")
+                              or getattr(self, name) is None})
+        return True
+    
+    def close(self):
+        """退出前调用：把日志合并进快照，下次启动可以按索引读取"""
+        if self.watcher is not None:
+            self.watcher.stop()
+        if self.favicons is not None:
+            self.favicons.shutdown()
+        self.writer.stop()
+        self.journal.wait()
+        if self.paged is None and not self.journal.is_indexed():
+            self.save_websites()
+        self.save_usage()
+    
+    def flush(self):
+        """立即写入还在内存中的修改和常用度（应用切到后台时调用）"""
+        self.writer.flush()
+        self.save_usage()
+    
+    def save_usage(self):
+        """保存常用度检查点，并记下常用网站在快照中的序号"""
+        top = self.usage.top()
+        if self.paged is not None:
+            positions = {}
+            for site_id in top:
+                pos = self.paged.find(site_id)
+                if pos is not None:
+                    positions[site_id] = pos
+            seq = self.paged.seq
+        else:
+            # 快照刚按 websites 的顺序写成
+            wanted = set(top)
+            positions = {s["id"]: i for i, s in enumerate(self.websites) if s["id"] in wanted}
+            seq = self.journal.seq
+        try:
+            self.usage.save(positions, seq)
+        except Exception as e:
+            print(f"保存打开记录失败: {str(e)}")
+    
+    def report_error(self, message):
+        """需要告诉用户的错误：交给界面显示，没有界面时打印"""
+        if self.on_error is not None:
+            self.on_error(message)
+        else:
+            print(message)
+    
+    def validate_site(self, site):
+        """验证网站数据有效性"""
+        return ("name" in site and "url" in site and 
+                isinstance(site["name"], str) and 
+                isinstance(site["url"], str) and
+                self.is_valid_url(site["url"]))
+    
+    def is_valid_url(self, url):
+        """增强型URL验证"""
+        return is_valid_url(url)
+    
+    def add_website(self, name, url, category="我的"):
+        """添加新网站"""
+        url = with_scheme(url)
+            
+        if not self.is_valid_url(url):
+            raise ValueError("URL格式无效")
+        
+        duplicate = self.find_duplicate(url)
+        if duplicate is not None:
+            raise ValueError(f"网站已存在: {duplicate['name']}")
+        
+        # 生成唯一ID - 使用UUID确保唯一性
+        site_id = f"{category}_{uuid.uuid4().hex}"
+        new_site = Site(site_id, name, url, category, local_now())
+        
+        # 保存数据
+        self.store_sites([new_site])
+        self._remember(f"添加「{name}」", "add", site_id)
+        return new_site
+    
+    def add_websites(self, records):
+        """批量添加已校验的 (名称, URL, 分类)，跳过重复的网站，只写一次日志"""
+        return self.finish_import(self.prepare_import(records))
+    
+    def prepare_import(self, records):
+        """导入中耗时的部分（可在后台线程调用），返回值在界面线程交给 finish_import
+
+        去掉重复的记录，导入前先备份，再连同新网站重建全部索引；
+        界面线程只需要换上索引、登记日志。
+        """
+        revision = self.revision
+        sites = self._current_sites()
+        url_index = UrlIndex(sites)
+        records = unique_records(_with_schemes(records), url_index.ids)
+        if not records:
+            return revision, [], None, None, None
+        version = self._undo_point("导入前", sites)
+        created = local_now()
+        new_sites = [Site(f"{category}_{uuid.uuid4().hex}", name, url, category, created)
+                     for name, url, category in records]
+        for site in new_sites:
+            url_index.add(site)
+        # 日志记录也在这里建好：界面线程上分配大量对象会触发对整个堆的垃圾回收
+        entries = [("add", {"site": site}) for site in new_sites]
+        indexes = self._build_indexes(sites + new_sites, url_index)
+        return revision, new_sites, indexes, entries, version
+    
+    def finish_import(self, prepared):
+        """在界面线程写入 prepare_import 准备好的网站，返回新加入的网站
+
+        准备期间数据有变化时重新去重，按逐个加入索引的方式写入。
+        """
+        revision, new_sites, indexes, entries, version = prepared
+        if not new_sites:
+            return []
+        if revision != self.revision:
+            existing = self.ensure_url_index()
+            new_sites = [site for site in new_sites if existing.find(site.url) is None]
+            self.store_sites(new_sites)
+        else:
+            self._attach_indexes(indexes)
+            self.revision += 1
+            self.writer.submit_records(entries)
+        self._remember(f"导入的 {len(new_sites)} 个网站", "restore", version)
+        return new_sites
+    
+    def find_duplicate(self, url):
+        """与 url 是同一网站（规范化后相同）的已有网站，没有时返回 None"""
+        site_id = self.ensure_url_index().find(url)
+        return None if site_id is None else self.get_site(site_id)
+    
+    def ensure_url_index(self):
+        """返回URL索引，第一次使用时建立"""
+        self.materialize()
+        if self.url_index is None:
+            self.url_index = UrlIndex(self.websites)
+        return self.url_index
+    
+    def unique_records(self, records):
+        """去掉与已有网站或同一批中前面的记录重复的 (名称, URL, 分类)"""
+        return unique_records(records, self.ensure_url_index().ids)
+    
+    def merge_duplicates(self):
+        """一遍扫描删除重复的网站，返回被删除的网站
+
+        每组保留打开得最多的一个（一样多时保留列表中靠前的）。
+        """
+        self.materialize()
+        removed = []
+        for kept, duplicates in duplicate_groups(self.websites):
+            group = [kept] + duplicates
+            best = max(group, key=lambda site: self.usage.frecency(site["id"]))
+            removed.extend(site for site in group if site is not best)
+        if not removed:
+            return []
+        version = self._undo_point("合并重复前")
+        dropped = {site["id"] for site in removed}
+        self.revision += 1
+        self.websites = [s for s in self.websites if s["id"] not in dropped]
+        for site_id in dropped:
+            self.usage.forget(site_id)
+        # 删除的可能很多：整体重建索引，保持线性时间
+        self.search_index = None
+        self.fuzzy_index = None
+        self.category_index = None
+        self.url_index = None
+        self.completer = None
+        self.materialize()
+        self.writer.submit("delete", [{"id": site["id"]} for site in removed])
+        self._remember(f"合并重复网站（删除了 {len(removed)} 个）", "restore", version)
+        return removed
+    
+    def store_sites(self, new_sites):
+        """把新网站加入索引并写入日志"""
+        self._insert_sites(new_sites)
+        self.writer.submit("add", [{"site": site} for site in new_sites])
+    
+    def _insert_sites(self, new_sites):
+        """把新网站加入列表和索引（不写日志）"""
+        self.materialize()
+        self.revision += 1
+        for site in new_sites:
+            self.search_index.add(site)
+            self.category_index.add(site)
+        if len(new_sites) == 1:
+            self.fuzzy_index.add(new_sites[0])
+        else:
+            self.fuzzy_index.add_many(new_sites)
+        if self.url_index is not None:
+            for site in new_sites:
+                self.url_index.add(site)
+        if self.completer is not None:
+            for site in new_sites:
+                self.completer.add(site)
+        self.websites.extend(new_sites)
+    
+    def delete_website(self, site_id):
+        """删除网站"""
+        site = self.get_site(site_id)
+        if self._remove_site(site_id):
+            self.append_journal("delete", id=site_id)
+            self._remember(f"删除「{site['name']}」", "delete", site)
+            return True
+        return False
+    
+    def _remove_site(self, site_id):
+        """从列表和索引中删除网站（不写日志）"""
+        self.materialize()
+        removed = [s for s in self.websites if s["id"] == site_id]
+        if not removed:
+            return False
+        self.revision += 1
+        self.websites = [s for s in self.websites if s["id"] != site_id]
+        self.search_index.remove(site_id)
+        self.fuzzy_index.remove(site_id)
+        self.usage.forget(site_id)
+        for site in removed:
+            self.category_index.remove(site)
+            if self.url_index is not None:
+                self.url_index.remove(site)
+            if self.completer is not None:
+                self.completer.remove(site)
+        return True
+    
+    def update_website(self, site_id, **fields):
+        """更新网站信息"""
+        if "url" in fields and not self.is_valid_url(fields["url"]):
+            raise ValueError("URL格式无效")
+        
+        old = self.get_site(site_id)
+        site = self._replace_site(site_id, fields)
+        if site is not None:
+            self.append_journal("update", id=site_id, fields=fields)
+            self._remember(f"修改「{old['name']}」", "update",
+                           (site_id, {key: old.get(key) for key in fields}))
+        return site
+    
+    def _replace_site(self, site_id, fields):
+        """更新列表和索引中的网站（不写日志），找不到时返回 None"""
+        self.materialize()
+        for i, site in enumerate(self.websites):
+            if site["id"] == site_id:
+                self.revision += 1
+                self.websites[i] = site.replace(**fields)
+                self.search_index.update(self.websites[i])
+                self.fuzzy_index.update(self.websites[i])
+                self.category_index.update(site, self.websites[i])
+                if self.url_index is not None:
+                    self.url_index.update(site, self.websites[i])
+                if self.completer is not None:
+                    self.completer.update(site, self.websites[i])
+                return self.websites[i]
+        return None
+    
+    def start_watching(self, on_change):
+        """监视数据文件，其他进程保存时在监视线程中调用 on_change()
+
+        界面收到通知后应在界面线程中调用 sync()。
+        """
+        names = {os.path.basename(self.data_file), os.path.basename(self.journal.journal_file)}
+        self.watcher = FileWatcher(os.path.dirname(self.data_file), names,
+                                   lambda changed: on_change()).start()
+    
+    def sync(self):
+        """合并其他进程追加到日志中的修改（只读取新增的部分）
+
+        返回 {"added": [...], "deleted": [...], "updated": [...]}（网站ID），
+        没有新修改时各项为空；漏掉了已被合并删除的日志、只能完整
+        重新加载时返回 None。
+        """
+        changes = {"added": [], "deleted": [], "updated": []}
+        # 先写入本进程还没写的修改：它们排在已读到的记录之后，按日志
+        # 顺序一起合并；重新加载时也不会丢掉
+        self.writer.flush()
+        entries = self.journal.read_new()
+        if self.journal.needs_reload:
+            self.reload()
+            return None
+        batch = []  # 连续的添加一起写入索引（导入书签会产生大量添加）
+        for entry in entries:
+            op = entry.get("op")
+            site_id = entry.get("site", {}).get("id") if op == "add" else entry.get("id")
+            if op != "add" and batch:
+                self._insert_sites(batch)
+                batch = []
+            if op == "add":
+                site = entry.get("site")
+                if not isinstance(site, dict) or not self.validate_site(site):
+                    continue
+                if self.get_site(site_id) is not None:
+                    self._remove_site(site_id)  # 与日志重放一致：同ID的添加覆盖原网站
+                batch.append(Site.from_dict(site))
+                changes["added"].append(site_id)
+            elif op == "delete":
+                if self._remove_site(site_id):
+                    changes["deleted"].append(site_id)
+            elif op == "update":
+                if self._replace_site(site_id, entry.get("fields", {})) is not None:
+                    changes["updated"].append(site_id)
+        if batch:
+            self._insert_sites(batch)
+        return changes
+    
+    def reload(self):
+        """无法增量合并时完整重新加载数据"""
+        if self.paged is not None:
+            self.paged.close()
+            self.paged = None
+        self.search_index = None
+        self.fuzzy_index = None
+        self.category_index = None
+        self.url_index = None
+        self.completer = None
+        self.revision += 1
+        self.websites = self.load_websites()
+        if self.paged is None:
+            self.materialize()
+    
+    def filter_sites(self, category):
+        """分类过滤，常用网站排在前面"""
+        self.current_filter = category
+        if category == FREQUENT_CATEGORY:
+            return self.frequent_sites()
+        if category == ALL_CATEGORY:
+            sites = self.websites
+        elif self.paged is not None:
+            sites = self.paged.sites(category)
+        else:
+            sites = self.category_index.sites(category)
+        return self.rank_by_usage(sites)
+    
+    def rank_by_usage(self, sites):
+        """默认排序：常用度最高的网站在前，其余保持原顺序"""
+        top = self.usage.top()
+        if self.paged is None:
+            return rank_by_usage(sites, top)
+        if self.usage.snapshot_seq != self.paged.seq:
+            return sites  # 检查点中的序号已过期，完整载入后再排序
+        head = snapshot_head(sites, self.usage.positions, top)
+        return RankedView(sites, head) if head else sites
+    
+    def frequent_sites(self):
+        """常用网站，常用度从高到低"""
+        sites = []
+        for site_id in self.usage.top():
+            site = self.get_site(site_id)
+            if site is not None:
+                sites.append(site)
+        return sites
+    
+    def get_site(self, site_id):
+        """按ID取网站，找不到返回 None"""
+        if self.paged is not None:
+            pos = None
+            if self.usage.snapshot_seq == self.paged.seq:
+                pos = self.usage.positions.get(site_id)
+            if pos is None or self.paged.site(pos)["id"] != site_id:
+                pos = self.paged.find(site_id)
+            return None if pos is None else self.paged.site(pos)
+        if self.search_index is None:
+            return self.category_index.find(site_id)
+        doc = self.search_index.doc_ids.get(site_id)
+        return None if doc is None else self.search_index.docs[doc]
+    
+    def link_badge(self, url):
+        """链接检查结果的标记（失效/无法访问），有效或未检查时为空"""
+        return self.health.badge(url)
+    
+    def all_urls(self):
+        """全部网站的URL（在界面线程取出，交给后台检查）"""
+        self.materialize()
+        return [site["url"] for site in self.websites]
+    
+    def check_links(self, urls, progress=None):
+        """检查过期或未检查的链接（耗时，应在后台线程调用）"""
+        return check_links(urls, self.health, progress=progress)
+    
+    def record_visit(self, site_id):
+        """记录一次打开，更新常用度"""
+        try:
+            self.usage.record(site_id)
+        except Exception as e:
+            print(f"保存打开记录失败: {str(e)}")
+        if self.completer is not None:
+            site = self.get_site(site_id)
+            if site is not None:
+                self.completer.touch(site)
+    
+    def ensure_completer(self):
+        """返回输入联想索引，第一次使用时从全部网站建立"""
+        if self.completer is None:
+            self.completer = self._new_completer(self.websites)
+        return self.completer
+    
+    def _new_completer(self, sites):
+        # 没打开过的网站得分为 1，多个网站共用的主机名排在前面
+        return SiteCompleter(sites, score=lambda site_id: 1.0 + self.usage.frecency(site_id))
+    
+    def complete_url(self, text):
+        """网址输入框的补全：已有网站的主机名和路径前缀，常用的在前"""
+        if self.completer is None and self.indexing:
+            return []  # 后台还在建立，不在界面线程中重复建立
+        return self.ensure_completer().complete_url(text)
+    
+    def complete_name(self, text):
+        """名称输入框的补全（也可以输入拼音或首字母）"""
+        if self.completer is None and self.indexing:
+            return []
+        return self.ensure_completer().complete_name(text)
+    
+    def suggest_category(self, url):
+        """按已有网站的主机名推荐分类，没有线索时返回 None"""
+        if self.completer is None and self.indexing:
+            return None
+        return self.ensure_completer().suggest_category(url)
+    
+    def search_website(self, keyword):
+        """搜索网站"""
+        if not keyword:
+            return self.filter_sites(self.current_filter)
+        
+        # 拼音/模糊匹配排序的前几个结果在前，其余子串匹配结果在后
+        self.materialize()
+        ranked = self.fuzzy_index.search(keyword)
+        return merge_ranked(ranked, self.search_index.search(keyword))
+    
+    def append_journal(self, op, **payload):
+        """登记一条操作记录，由后台线程合并写入"""
+        self.writer.submit(op, [payload])
+    
+    def _after_write(self):
+        """写入线程中调用：日志过大时在后台压缩"""
+        self.journal.maybe_compact(self.websites)
+    
+    def save_websites(self):
+        """保存完整快照到文件（临时文件 + 原子重命名），并记下一个备份版本"""
+        try:
+            self.writer.flush()
+            self.materialize()
+            if not self.journal.compact(self.websites):
+                # 其他进程刚写入了新记录：先合并再压缩
+                self.sync()
+                self.materialize()
+                if not self.journal.compact(self.websites):
+                    return False
+            self.backup()
+            return True
+        except Exception as e:
+            self.report_error(f"保存数据失败: {str(e)}")
+            return False
+    
+    def backup(self, label="保存", sites=None):
+        """把当前数据存为一个备份版本（只写入变化了的块）并清理旧版本
+
+        sites 为在后台线程中调用时取好的全部网站。返回新版本的清单，
+        与最新版本相同、备份失败或没有备份时返回 None。
+        """
+        if self.backups is None:
+            return None
+        try:
+            manifest = self.backups.save(self._backup_lines(sites), label)
+            if manifest is not None:
+                self.backups.prune()
+            return manifest
+        except Exception as e:
+            print(f"备份数据失败: {str(e)}")
+            return None
+    
+    def _backup_lines(self, sites=None):
+        """当前数据的 JSON 行；快照已包含全部修改时直接读快照文件，不用重新序列化"""
+        if not self.writer.pending() and self.journal.is_clean():
+            return self.journal.snapshot_lines()
+        return site_lines(self.websites if sites is None else sites)
+    
+    def list_backups(self):
+        """全部备份版本的清单（id、time、label、count 等），最新的在前"""
+        return [] if self.backups is None else self.backups.versions()
+    
+    def restore_backup(self, version_id):
+        """把数据恢复为某个备份版本，返回恢复的网站数
+
+        恢复前先把当前数据存为一个版本，恢复之后还可以再恢复回来（也可以撤销）。
+        """
+        version = self._undo_point("恢复前")
+        count = self._restore(version_id)
+        self._remember("恢复备份", "restore", version)
+        return count
+    
+    def _remember(self, label, op, payload):
+        """记下一次可以撤销的修改；payload 为 None（备份失败）时这次修改和更早的都不能再撤销"""
+        if payload is None:
+            self._changes.clear()
+            return
+        self._changes.append((label, op, payload))
+        del self._changes[:-UNDO_LIMIT]
+    
+    def _undo_point(self, label, sites=None):
+        """批量修改前备份，返回撤销时要恢复的版本ID，备份失败或没有备份时返回 None"""
+        if self.backups is None:
+            return None
+        try:
+            manifest = self.backups.save(self._backup_lines(sites), label)
+            if manifest is None:
+                return self.backups.versions()[0]["id"]  # 与最新版本相同
+            self.backups.prune()
+            return manifest["id"]
+        except Exception as e:
+            print(f"备份数据失败: {str(e)}")
+            return None
+    
+    def undo(self):
+        """撤销本次运行中最近的一次修改，返回给用户看的说明
+
+        只撤销这一次修改，之前的修改都保留；批量修改（导入、合并重复、
+        恢复备份）恢复到修改前自动备份的版本。本次运行中没有可撤销的修改时
+        退回上一个备份版本，连续调用时依次退回更早的版本；
+        没有更早的版本时抛出 ValueError。
+        """
+        if not self._changes:
+            manifest = self._undo_version()
+            return f"已恢复到 {manifest['time']} 的版本（{manifest['count']} 个网站）"
+        label, op, payload = self._changes.pop()
+        depth = len(self._changes)
+        if op == "add":
+            self.delete_website(payload)
+        elif op == "delete":
+            if self.get_site(payload["id"]) is None:
+                self.store_sites([payload])
+        elif op == "update":
+            site_id, fields = payload
+            self.update_website(site_id, **fields)
+        else:
+            self._restore(payload)
+        del self._changes[depth:]  # 撤销本身不再记为修改
+        return f"已撤销{label}"
+    
+    def _undo_version(self):
+        """退回上一个备份版本，返回该版本的清单"""
+        if self.backups is None:
+            raise ValueError("没有更早的备份")
+        if self._undo is not None and self._undo[0] == self.revision:
+            current = self._undo[1]
+        else:
+            self.backup("撤销前")
+            current = None
+        versions = self.backups.versions()
+        ids = [manifest["id"] for manifest in versions]
+        pos = ids.index(current) + 1 if current in ids else 1
+        if pos >= len(ids):
+            raise ValueError("没有更早的备份")
+        self._restore(ids[pos])
+        self._undo = (self.revision, ids[pos])
+        return versions[pos]
+    
+    def _restore(self, version_id):
+        """用备份版本替换全部数据并写成新快照"""
+        sites = [Site.from_dict(site) for site in self.backups.load(version_id)
+                 if self.validate_site(site)]
+        self.writer.flush()
+        self._replace_all(sites)
+        return len(sites)
+    
+    def _replace_all(self, sites):
+        """替换列表和索引，写成新快照（其他进程还没合并的修改被覆盖）"""
+        if self.paged is not None:
+            self.paged.close()
+            self.paged = None
+        self.revision += 1
+        self.websites = sites
+        self.search_index = None
+        self.fuzzy_index = None
+        self.category_index = None
+        self.url_index = None
+        self.completer = None
+        self.materialize()
+        self.journal.discard_pending()
+        if not self.journal.compact(self.websites):
+            self.journal.discard_pending()
+            if not self.journal.compact(self.websites):
+                raise RuntimeError("其他窗口正在修改数据，请稍后重试")
+    
+    def get_all_categories(self):
+        """获取所有分类"""
+        if self.paged is not None:
+            return sorted(self.paged.category_counts())
+        return self.category_index.categories()
+    
+    def get_category_counts(self):
+        """按导航顺序返回 (分类, 网站数量) 列表"""
+        if self.paged is not None:
+            # 数量来自偏移索引，不需要解码网站
+            counts = self.paged.category_counts()
+            counts[ALL_CATEGORY] = len(self.paged)
+        else:
+            counts = {c: self.category_index.count(c) for c in self.category_index.categories()}
+            counts[ALL_CATEGORY] = self.category_index.total
+        counts[FREQUENT_CATEGORY] = len(self.usage.top())
+        return [(c, counts.get(c, 0)) for c in navigation_order(self.get_all_categories())]
+    
+    def get_category_choices(self):
+        """添加网站时可选的分类"""
+        return category_choices(self.get_all_categories())
+
+
+class SqliteWebsiteManager(WebsiteManager):
+    """使用 SQLite 存储的网站管理（WEBLAUNCHER_BACKEND=sqlite）
+
+    接口与 WebsiteManager 相同，但网站不整体载入内存：分类筛选走
+    (category, seq) 索引，搜索用 FTS5，列表拿到的是按需读取的视图。
+    第一次使用时把 custom_sites.json（快照 + 日志）一次性迁移进数据库，
+    原文件保留不动。拼音/首字母只做前缀匹配，不做拼写纠错。
+    """
+    def __init__(self, data_dir=None, build_indexes=True, on_error=None, **services):
+        self.db = None
+        self._all = None  # 全部网站的视图，修改后重新读取
+        super().__init__(data_dir, build_indexes, on_error, **services)
+    
+    @property
+    def websites(self):
+        """全部网站（按需读取的视图）"""
+        if self._all is None:
+            self._all = self.db.all()
+        return self._all
+    
+    @websites.setter
+    def websites(self, view):
+        self._all = view
+    
+    def load_websites(self):
+        """打开数据库，第一次使用时迁移原有数据"""
+        self.db = SiteDatabase(database_path(self.data_file))
+        if self.db.get_meta("migrated_from") is None and not self.db.count():
+            self.migrate_to_database()
+        return None
+    
+    def migrate_to_database(self):
+        """把 custom_sites.json 的数据（没有时为默认网站）一次写入数据库"""
+        sites, source = None, self.data_file
+        if os.path.exists(self.data_file):
+            try:
+                self.journal.wait()
+                sites = self.journal.load(self.validate_site, Site.from_dict)
+            except Exception as e:
+                self.report_error(f"迁移数据失败: {str(e)}")
+                return
+        if not sites:
+            sites, source = [Site.from_dict(site) for site in DEFAULT_SITES], "default"
+        try:
+            self.db.import_sites(sites, source)
+            print(f"迁移数据: {source} -> {self.db.db_file}（{len(sites)} 个网站）")
+        except sqlite3.Error as e:
+            self.report_error(f"迁移数据失败: {str(e)}")
+    
+    def materialize(self):
+        """数据在数据库中，不需要载入内存"""
+    
+    def build_search_indexes(self):
+        """数据库自己有索引，后台只建立输入联想"""
+        if self.completer is not None:
+            return None
+        self.indexing = True
+        return self.revision, {"completer": self._new_completer(self.websites)}
+    
+    def start_watching(self, on_change):
+        """监视数据库文件（WAL 模式下其他进程的提交写入 sites.db-wal）"""
+        name = os.path.basename(self.db.db_file)
+        self.watcher = FileWatcher(os.path.dirname(self.db.db_file), {name, name + "-wal"},
+                                   lambda changed: on_change()).start()
+    
+    def sync(self):
+        """其他连接提交过修改时丢弃缓存的视图，返回 None 表示需要整体刷新"""
+        if not self.db.changed():
+            return {"added": [], "deleted": [], "updated": []}
+        self._all = None
+        self.completer = None
+        self.revision += 1
+        return None
+    
+    def close(self):
+        """退出前保存常用度、记下备份版本并关闭数据库"""
+        if self.watcher is not None:
+            self.watcher.stop()
+        if self.favicons is not None:
+            self.favicons.shutdown()
+        self.save_usage()
+        self.backup()
+        self.db.close()
+    
+    def save_usage(self):
+        """保存常用度检查点（数据库按ID查找，不需要记下序号）"""
+        try:
+            self.usage.save()
+        except Exception as e:
+            print(f"保存打开记录失败: {str(e)}")
+    
+    def store_sites(self, new_sites):
+        """在一个事务中写入新网站"""
+        try:
+            self.db.import_sites(new_sites)
+        except sqlite3.Error as e:
+            self.report_error(f"保存数据失败: {str(e)}")
+        self.revision += 1
+        self._all = None
+        if self.completer is not None:
+            for site in new_sites:
+                self.completer.add(site)
+    
+    def delete_website(self, site_id):
+        """删除网站"""
+        site = self.db.get(site_id)
+        try:
+            removed = self.db.delete(site_id)
+        except sqlite3.Error as e:
+            self.report_error(f"保存数据失败: {str(e)}")
+            return False
+        if removed:
+            self.revision += 1
+            self._all = None
+            self.usage.forget(site_id)
+            if self.completer is not None:
+                self.completer.remove(site)
+            self._remember(f"删除「{site['name']}」", "delete", site)
+        return removed
+    
+    def update_website(self, site_id, **fields):
+        """更新网站信息"""
+        if "url" in fields and not self.is_valid_url(fields["url"]):
+            raise ValueError("URL格式无效")
+        old = self.db.get(site_id)
+        if old is None:
+            return None
+        site = old.replace(**fields)
+        try:
+            self.db.update(site)
+        except sqlite3.Error as e:
+            self.report_error(f"保存数据失败: {str(e)}")
+        self.revision += 1
+        self._all = None
+        if self.completer is not None:
+            self.completer.update(old, site)
+        self._remember(f"修改「{old['name']}」", "update",
+                       (site_id, {key: old.get(key) for key in fields}))
+        return site
+    
+    def filter_sites(self, category):
+        """分类过滤，常用网站排在前面"""
+        self.current_filter = category
+        if category == FREQUENT_CATEGORY:
+            return self.frequent_sites()
+        if category == ALL_CATEGORY:
+            return self.rank_by_usage(self.websites)
+        return self.rank_by_usage(self.db.category(category))
+    
+    def rank_by_usage(self, sites):
+        """常用网站按常用度排在视图前面（按 seq 在视图中二分查找）"""
+        top = self.usage.top()
+        seqs = self.db.seqs_of(top)
+        head = []
+        for site_id in top:
+            i = sites.index_of(seqs[site_id]) if site_id in seqs else None
+            if i is not None:
+                head.append(i)
+        return RankedView(sites, head) if head else sites
+    
+    def get_site(self, site_id):
+        return self.db.get(site_id)
+    
+    def find_duplicate(self, url):
+        """用 canonical 列的索引查找重复的网站"""
+        site_id = self.db.find_canonical([canonical_url(url)]).get(canonical_url(url))
+        return None if site_id is None else self.db.get(site_id)
+    
+    def unique_records(self, records):
+        """去掉重复的 (名称, URL, 分类)，已有网站按批查询 canonical 列"""
+        existing = self.db.find_canonical({canonical_url(record[1]) for record in records})
+        return unique_records(records, existing)
+    
+    def prepare_import(self, records):
+        """在后台线程中去重、备份并在一个事务中写入数据库（写入失败时抛出 sqlite3.Error）"""
+        records = self.unique_records(_with_schemes(records))
+        if not records:
+            return None, [], None, None, None
+        version = self._undo_point("导入前")
+        created = local_now()
+        new_sites = [Site(f"{category}_{uuid.uuid4().hex}", name, url, category, created)
+                     for name, url, category in records]
+        self.db.import_sites(new_sites)
+        return None, new_sites, None, None, version
+    
+    def finish_import(self, prepared):
+        """丢弃缓存的视图；联想索引之后在后台重建"""
+        new_sites, version = prepared[1], prepared[4]
+        if new_sites:
+            self.revision += 1
+            self._all = None
+            self.completer = None
+            self._remember(f"导入的 {len(new_sites)} 个网站", "restore", version)
+        return new_sites
+    
+    def merge_duplicates(self):
+        """一遍扫描 canonical 列，在一个事务中删除重复的网站，返回被删除的网站"""
+        groups = {}
+        for seq, site_id, key in self.db.canonical_rows():
+            groups.setdefault(key, []).append(site_id)
+        dropped = []
+        for ids in groups.values():
+            if len(ids) > 1:
+                best = max(ids, key=self.usage.frecency)
+                dropped.extend(site_id for site_id in ids if site_id != best)
+        if not dropped:
+            return []
+        removed = [self.db.get(site_id) for site_id in dropped]
+        version = self._undo_point("合并重复前")
+        try:
+            self.db.delete_many(dropped)
+        except sqlite3.Error as e:
+            self.report_error(f"保存数据失败: {str(e)}")
+            return []
+        for site_id in dropped:
+            self.usage.forget(site_id)
+        self.revision += 1
+        self._all = None
+        if self.completer is not None:
+            for site in removed:
+                self.completer.remove(site)
+        self._remember(f"合并重复网站（删除了 {len(removed)} 个）", "restore", version)
+        return removed
+    
+    def all_urls(self):
+        return self.db.urls()
+    
+    def search_website(self, keyword):
+        """搜索网站：拼音/首字母前缀匹配在前，其余 FTS5 子串匹配结果在后"""
+        if not keyword:
+            return self.filter_sites(self.current_filter)
+        ranked = self.db.prefix_search(keyword)
+        seen = set(ranked.seqs)
+        seqs = array("q", ranked.seqs)
+        seqs.extend(seq for seq in self.db.search(keyword).seqs if seq not in seen)
+        return SiteRows(self.db, seqs)
+    
+    def save_websites(self):
+        """把 WAL 中的修改写回数据库文件，并记下一个备份版本"""
+        try:
+            self.db.checkpoint()
+        except sqlite3.Error as e:
+            self.report_error(f"保存数据失败: {str(e)}")
+            return False
+        self.backup()
+        return True
+    
+    def _backup_lines(self, sites=None):
+        return site_lines(self.websites if sites is None else sites)
+    
+    def _replace_all(self, sites):
+        """在一个事务中替换数据库中的全部网站"""
+        self.db.replace_all(sites)
+        self.revision += 1
+        self._all = None
+        self.completer = None
+    
+    def get_all_categories(self):
+        return sorted(self.db.category_counts())
+    
+    def get_category_counts(self):
+        """按导航顺序返回 (分类, 网站数量) 列表（数量来自分类索引）"""
+        counts = self.db.category_counts()
+        categories = sorted(counts)
+        counts[ALL_CATEGORY] = sum(counts.values())
+        counts[FREQUENT_CATEGORY] = len(self.usage.top())
+        return [(c, counts.get(c, 0)) for c in navigation_order(categories)]
+
+
+def default_services(data_dir=None):
+    """界面使用的全部可选服务，作为 WebsiteManager 的关键字参数
+
+    后台写入线程、打开记录、链接检查缓存、网站图标（后台下载线程池 +
+    磁盘 LRU）、多版本备份，以及按偏移索引按需解码快照。
+    """
+    app_data_path = DATA_DIR if data_dir is None else data_dir
+    os.makedirs(app_data_path, exist_ok=True)
+    # 打开记录：读取检查点，只重放之后的记录
+    usage = UsageLog(os.path.join(app_data_path, "usage.log"))
+    usage.load()
+    return {
+        "flush_interval": FLUSH_INTERVAL,
+        "usage": usage,
+        "health": HealthCache(os.path.join(app_data_path, "link_health.json")).load(),
+        "backups": BackupStore(os.path.join(app_data_path, "backups")),
+        "favicons": FaviconFetcher(FaviconCache(os.path.join(app_data_path, "favicons")).load()),
+        "paging": True,
+    }
+
+
+def open_manager(data_dir=None, backend=None, services=True, **kwargs):
+    """按 backend（默认取 WEBLAUNCHER_BACKEND）创建网站管理
+
+    services 为真时带上 default_services 中的全部服务（界面使用），
+    kwargs 中给出的服务优先。
+    """
+    if services:
+        kwargs = {**default_services(data_dir), **kwargs}
+    if (backend or BACKEND) == "sqlite":
+        return SqliteWebsiteManager(data_dir, **kwargs)
+    return WebsiteManager(data_dir, **kwargs)
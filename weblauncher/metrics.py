@@ -0,0 +1,176 @@
+# weblauncher/metrics.py
+"""运行时性能统计：热点函数耗时和帧间隔的滚动百分位、内存计数，可导出 JSON/CSV"""
+import csv
+import functools
+import gc
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# 启动时打开性能统计（界面中也可以随时切换）
+METRICS_ENABLED = os.environ.get("WEBLAUNCHER_METRICS", "0") == "1"
+METRICS_WINDOW = 512  # 每项统计保留最近多少个样本
+
+
+class RollingStats:
+    """最近 window 个样本（毫秒）的 p50/p95/最大值"""
+    def __init__(self, window=METRICS_WINDOW):
+        self.samples = deque(maxlen=window)
+        self.count = 0  # 累计样本数（包括已经滚出窗口的）
+
+    def add(self, ms):
+        self.samples.append(ms)
+        self.count += 1
+
+    def summary(self):
+        if not self.samples:
+            return {"count": self.count}
+        ordered = sorted(self.samples)
+        return {"count": self.count, "p50_ms": round(_nearest_rank(ordered, 0.5), 2),
+                "p95_ms": round(_nearest_rank(ordered, 0.95), 2),
+                "max_ms": round(ordered[-1], 2)}
+
+
+def _nearest_rank(ordered, fraction):
+    """最近秩法的百分位数（ordered 已排序且非空）"""
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def memory_counters():
+    """进程内存（MB）和垃圾回收次数；读不到的项省略"""
+    counters = {}
+    try:
+        # Linux/安卓：当前常驻内存
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        counters["rss_mb"] = round(pages * os.sysconf("SC_PAGE_SIZE") / 2 ** 20, 1)
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if resource is not None:
+        # ru_maxrss 在 macOS 上是字节，其他系统是 KB
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        counters["peak_mb"] = round(peak / (2 ** 20 if sys.platform == "darwin" else 2 ** 10), 1)
+    counters["gc_collections"] = sum(stats["collections"] for stats in gc.get_stats())
+    return counters
+
+
+class Metrics:
+    """按名称收集耗时，供界面上的性能面板显示和导出
+
+    watch(对象, 方法名) 登记要计时的方法；enable() 时才在对象上装上
+    计时包装（实例属性遮住类上的方法），disable() 删掉包装，关闭时
+    热点函数没有任何额外开销。帧间隔等由界面自己 add()。counters
+    中的函数（如网站数、缓存大小）在显示和导出时才调用。
+    """
+    def __init__(self, window=METRICS_WINDOW):
+        self.window = window
+        self.enabled = False
+        self.stats = {}      # 名称 -> RollingStats
+        self.counters = {}   # 名称 -> 无参函数
+        self._targets = []   # (对象, 方法名列表)
+        self._installed = []
+        self._lock = threading.Lock()
+
+    def add(self, name, ms):
+        """记录一个样本（毫秒），可以在任何线程中调用"""
+        with self._lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = RollingStats(self.window)
+            stats.add(ms)
+
+    def watch(self, obj, names):
+        """登记 obj 上要计时的方法，已经开启时立即装上包装"""
+        self._targets.append((obj, names))
+        if self.enabled:
+            self._install(obj, names)
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        for obj, names in self._targets:
+            self._install(obj, names)
+
+    def disable(self):
+        """去掉计时包装（已经收集的样本保留）"""
+        self.enabled = False
+        for obj, name in self._installed:
+            try:
+                delattr(obj, name)
+            except AttributeError:
+                pass
+        self._installed = []
+
+    def reset(self):
+        with self._lock:
+            self.stats = {}
+
+    def _install(self, obj, names):
+        for name in names:
+            setattr(obj, name, self._timed(name, getattr(obj, name)))
+            self._installed.append((obj, name))
+
+    def _timed(self, name, func):
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(name, (time.perf_counter() - start) * 1000)
+        return timed
+
+    def snapshot(self):
+        """当前的全部统计"""
+        with self._lock:
+            timings = {name: stats.summary() for name, stats in sorted(self.stats.items())}
+        counters = {}
+        for name, func in self.counters.items():
+            try:
+                counters[name] = func()
+            except Exception as e:
+                counters[name] = f"读取失败: {str(e)}"
+        return {"time": time.strftime("%Y-%m-%d %H:%M:%S"), "timings": timings,
+                "memory": memory_counters(), "counters": counters}
+
+    def text(self):
+        """性能面板上显示的多行文字"""
+        snapshot = self.snapshot()
+        lines = ["名称  次数  p50/p95/最大(ms)"]
+        for name, summary in snapshot["timings"].items():
+            if "p50_ms" in summary:
+                lines.append(f"{name}  {summary['count']}  {summary['p50_ms']}/"
+                             f"{summary['p95_ms']}/{summary['max_ms']}")
+        lines.append("  ".join(f"{name} {value}"
+                               for name, value in snapshot["memory"].items()))
+        lines += [f"{name}: {value}" for name, value in snapshot["counters"].items()]
+        return "\n".join(lines)
+
+    def export(self, path):
+        """导出到文件：.csv 每行一项（metric, field, value），其他扩展名写 JSON"""
+        snapshot = self.snapshot()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if path.lower().endswith(".csv"):
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["metric", "field", "value"])
+                for name, summary in snapshot["timings"].items():
+                    writer.writerows([name, field, value] for field, value in summary.items())
+                writer.writerows(["memory", field, value]
+                                 for field, value in snapshot["memory"].items())
+                writer.writerows(["counter", name, json.dumps(value, ensure_ascii=False)]
+                                 for name, value in snapshot["counters"].items())
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, ensure_ascii=False, indent=2)
+        return path
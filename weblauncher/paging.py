@@ -0,0 +1,158 @@
+# weblauncher/paging.py
+"""快照的行偏移索引：启动时只解码需要显示的网站"""
+import json
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
+
+INDEX_MAGIC = b"WLIX"
+INDEX_VERSION = 1
+PAGE_SIZE = 120  # 列表每次显示/追加的网站数
+
+
+def index_path(data_file):
+    return data_file + ".idx"
+
+
+def write_index(data_file, offsets, categories, seq):
+    """写入快照旁的偏移索引（临时文件 + 原子重命名）
+
+    offsets 为每条网站记录在快照中的字节偏移（最后多一个结束位置），
+    categories 为 {分类: 该分类网站在快照中的序号}。
+    """
+    stat = os.stat(data_file)
+    header = json.dumps({
+        "seq": seq,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "count": len(offsets) - 1,
+        "categories": [[name, len(positions)] for name, positions in categories.items()]
+    }, ensure_ascii=False).encode("utf-8")
+
+    index_file = index_path(data_file)
+    tmp_file = index_file + ".tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(INDEX_MAGIC + struct.pack("<II", INDEX_VERSION, len(header)))
+        f.write(header)
+        offsets.tofile(f)
+        for positions in categories.values():
+            positions.tofile(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, index_file)
+
+
+class PagedSnapshot:
+    """通过偏移索引按需解码快照中的网站
+
+    只读取索引（偏移和分类数量）；快照的字节一次读入内存后立即关闭文件
+    （不用 mmap：映射着的文件在 Windows 上无法被压缩时的 os.replace 替换），
+    某个网站第一次被访问时才解析对应的那一行。
+    """
+    def __init__(self, data_file, header, offsets, categories, data, factory=None):
+        self.data_file = data_file
+        self.factory = factory
+        self.seq = header["seq"]
+        self.offsets = offsets
+        self.categories = categories
+        self._cache = {}
+        self._data = data
+
+    @classmethod
+    def open(cls, data_file, factory=None):
+        """打开快照；索引缺失、版本不符或与快照不一致时返回 None"""
+        try:
+            with open(index_path(data_file), "rb") as f:
+                magic = f.read(4)
+                version, header_len = struct.unpack("<II", f.read(8))
+                if magic != INDEX_MAGIC or version != INDEX_VERSION:
+                    return None
+                header = json.loads(f.read(header_len).decode("utf-8"))
+                with open(data_file, "rb") as data_f:
+                    stat = os.fstat(data_f.fileno())
+                    if stat.st_size != header["size"] or stat.st_mtime_ns != header["mtime_ns"]:
+                        return None
+                    data = data_f.read()
+                offsets = array("Q")
+                offsets.fromfile(f, header["count"] + 1)
+                categories = {}
+                for name, count in header["categories"]:
+                    positions = array("I")
+                    positions.fromfile(f, count)
+                    categories[name] = positions
+            return cls(data_file, header, offsets, categories, data, factory)
+        except (OSError, ValueError, EOFError, KeyError, struct.error):
+            return None
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def _bytes(self):
+        data = self._data
+        if data is None:
+            raise ValueError("快照已关闭")
+        return data
+
+    def site(self, pos):
+        """解码快照中第 pos 个网站（结果会缓存）"""
+        site = self._cache.get(pos)
+        if site is None:
+            site = json.loads(self._bytes()[self.offsets[pos]:self.offsets[pos + 1]])
+            if self.factory is not None:
+                site = self.factory(site)
+            self._cache[pos] = site
+        return site
+
+    def load_all(self):
+        """解码全部网站（不经过也不填充缓存，可以在后台线程调用）"""
+        lines = self._bytes()[self.offsets[0]:self.offsets[-1]].splitlines()
+        if self.factory is None:
+            return [json.loads(line) for line in lines]
+        factory = self.factory
+        return [factory(json.loads(line)) for line in lines]
+
+    def find(self, site_id):
+        """网站在快照中的序号，找不到返回 None
+
+        先查已解码的网站，再在快照字节中查找以该ID开头的行（快照每行的第一个字段是 id）。
+        """
+        for pos, site in self._cache.items():
+            if site["id"] == site_id:
+                return pos
+        prefix = json.dumps({"id": site_id}, ensure_ascii=False)[:-1] + ", "
+        at = self._bytes().find(b"\n" + prefix.encode("utf-8"))
+        if at < 0:
+            return None
+        pos = bisect_left(self.offsets, at + 1)
+        return pos if pos < len(self) and self.offsets[pos] == at + 1 else None
+
+    def sites(self, category=None):
+        """全部网站或某个分类的只读视图"""
+        if category is None:
+            return SiteView(self, range(len(self)))
+        return SiteView(self, self.categories.get(category, ()))
+
+    def category_counts(self):
+        """{分类: 网站数量}，不需要解码任何网站"""
+        return {name: len(positions) for name, positions in self.categories.items()}
+
+    def close(self):
+        """释放读入的快照字节，之后再解码会抛出 ValueError"""
+        self._data = None
+
+
+class SiteView(Sequence):
+    """快照中一组网站的只读序列，元素在访问时才解码"""
+    def __init__(self, snapshot, positions):
+        self.snapshot = snapshot
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.snapshot.site(pos) for pos in self.positions[i]]
+        return self.snapshot.site(self.positions[i])
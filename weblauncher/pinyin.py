@@ -0,0 +1,62 @@
+# weblauncher/pinyin.py
+"""网站名称的拼音：全拼和首字母"""
+from bisect import bisect_right
+from functools import lru_cache
+
+try:
+    from pypinyin import lazy_pinyin  # 可选：完整的汉字拼音表
+except ImportError:
+    lazy_pinyin = None
+
+# 没有 pypinyin 时的退路：GB2312 一级汉字按拼音排序，
+# 由编码区间即可得到首字母（没有全拼）
+_GB2312_STARTS = [0xB0A1, 0xB0C5, 0xB2C1, 0xB4EE, 0xB6EA, 0xB7A2, 0xB8C1, 0xB9FE,
+                  0xBBF7, 0xBFA6, 0xC0AC, 0xC2E8, 0xC4C3, 0xC5B6, 0xC5BE, 0xC6DA,
+                  0xC8BB, 0xC8F6, 0xCBFA, 0xCDDA, 0xCEF4, 0xD1B9, 0xD4D1]
+_GB2312_LETTERS = "abcdefghjklmnopqrstwxyz"
+_GB2312_END = 0xD7F9
+
+
+def has_full_pinyin():
+    """是否可以得到全拼（安装了 pypinyin）"""
+    return lazy_pinyin is not None
+
+
+@lru_cache(maxsize=None)
+def char_pinyin(char):
+    """单个汉字的拼音（多音字取常用读音）；不是汉字或无法转换时返回 None"""
+    if not "一" <= char <= "鿿":
+        return None
+    if lazy_pinyin is not None:
+        reading = lazy_pinyin(char)[0]
+        return reading if reading != char else None
+    try:
+        code = int.from_bytes(char.encode("gb2312"), "big")
+    except UnicodeEncodeError:
+        return None
+    if not _GB2312_STARTS[0] <= code <= _GB2312_END:
+        return None
+    return _GB2312_LETTERS[bisect_right(_GB2312_STARTS, code) - 1]
+
+
+def name_keys(name):
+    """名称 -> (全拼, 首字母)，均为小写且去掉空白
+
+    "QQ音乐" -> ("qqyinyue", "qqyy")；汉字以外的字符原样保留。
+    没有 pypinyin 时全拼为空字符串。
+    """
+    full = []
+    initials = []
+    for char in name.lower():
+        if char.isspace():
+            continue
+        reading = char_pinyin(char)
+        if reading is None:
+            full.append(char)
+            initials.append(char)
+        else:
+            full.append(reading)
+            initials.append(reading[0])
+    if lazy_pinyin is None:
+        return "", "".join(initials)
+    return "".join(full), "".join(initials)
@@ -0,0 +1,126 @@
+# weblauncher/records.py
+"""紧凑的网站记录：__slots__ 对象代替每个网站一个 dict"""
+import calendar
+import sys
+import time
+from datetime import datetime, timedelta
+
+FIELDS = ("id", "name", "url", "category", "created_at")
+ATTRS = ("id", "name", "url", "category")  # 与属性同名的字段
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+_FIELD_SET = frozenset(FIELDS)
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+
+def parse_time(text):
+    """"YYYY-MM-DD HH:MM:SS" -> 整数时间戳（按原样保存，不做时区换算）；无法解析时返回 0"""
+    if not isinstance(text, str) or len(text) != 19:
+        return 0
+    try:
+        return (datetime.fromisoformat(text) - _EPOCH) // _SECOND
+    except ValueError:
+        return 0
+
+
+def local_now():
+    """当前本地时间的整数时间戳（与 parse_time 的存法一致）"""
+    return calendar.timegm(time.localtime())
+
+
+def format_time(timestamp):
+    """整数时间戳 -> "YYYY-MM-DD HH:MM:SS\""""
+    return time.strftime(TIME_FORMAT, time.gmtime(timestamp))
+
+
+class Site:
+    """一个网站
+
+    用 __slots__ 保存字段，分类字符串全局共享（sys.intern），
+    创建时间存为整数。界面代码仍可以像 dict 一样读取：
+    site["name"]、site.get("created_at")、"url" in site、dict(site)。
+    """
+    __slots__ = ("id", "name", "url", "category", "created", "extra")
+
+    def __init__(self, id, name, url, category="其他", created=0, extra=None):
+        self.id = id
+        self.name = name
+        self.url = url
+        self.category = sys.intern(category)
+        self.created = created  # 整数时间戳，0 表示没有创建时间
+        self.extra = extra      # 其他未知字段（通常为 None）
+
+    @classmethod
+    def from_dict(cls, data):
+        """从 JSON 解析出的 dict 创建"""
+        extra = None
+        if not data.keys() <= _FIELD_SET:
+            extra = {key: value for key, value in data.items() if key not in FIELDS}
+        created = parse_time(data.get("created_at"))
+        if not created and "created_at" in data:
+            # 非标准格式的时间原样保留
+            extra = dict(extra or {}, created_at=data["created_at"])
+        category = data.get("category")
+        if not isinstance(category, str) or not category:
+            category = "其他"
+        return cls(data.get("id"), data.get("name"), data.get("url"), category, created, extra)
+
+    def to_dict(self):
+        """转换为写入文件的 dict（字段顺序与旧格式一致）"""
+        data = {"id": self.id, "name": self.name, "url": self.url, "category": self.category}
+        if self.created:
+            data["created_at"] = format_time(self.created)
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def replace(self, **fields):
+        """返回更新了部分字段的新记录"""
+        return Site.from_dict(dict(self.to_dict(), **fields))
+
+    # dict 风格的只读访问
+    def __getitem__(self, key):
+        if key in ATTRS:
+            return getattr(self, key)
+        if key == "created_at" and self.created:
+            return format_time(self.created)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        if key in ATTRS or (key == "created_at" and self.created):
+            return True
+        return bool(self.extra and key in self.extra)
+
+    def keys(self):
+        return self.to_dict().keys()
+
+    def items(self):
+        return self.to_dict().items()
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __eq__(self, other):
+        if isinstance(other, (Site, dict)):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Site({self.to_dict()!r})"
+
+
+def to_json(obj):
+    """json.dumps 的 default：把 Site 转成 dict"""
+    if isinstance(obj, Site):
+        return obj.to_dict()
+    raise TypeError(f"无法序列化 {type(obj).__name__}")
@@ -0,0 +1,132 @@
+# weblauncher/search.py
+"""基于字符 n-gram 的倒排索引，用于名称/URL 子串搜索"""
+
+SEARCH_DEBOUNCE = 0.2  # 边输入边搜索的防抖间隔（秒）
+
+
+def _grams(text):
+    """返回文本的单字和相邻双字（中文按字切分，URL 同样按字符切分）"""
+    grams = set(text)
+    grams.update(map(str.__add__, text, text[1:]))
+    return grams
+
+
+class SearchIndex:
+    """名称和URL的倒排索引
+
+    每个网站按 name/url 的小写形式拆成单字和双字写入倒排表。
+    查询时取关键词所有双字的倒排表求交集（从最短的开始），
+    再对候选做一次子串确认，结果与逐条扫描完全一致，
+    但只需要检查很少的候选。
+
+    边输入边搜索时，新关键词包含上一次的关键词，
+    就只在上一次的结果里继续筛选。
+    """
+    def __init__(self, sites=()):
+        self.postings = {}   # gram -> {文档号}
+        self.docs = {}       # 文档号 -> 网站
+        self.texts = {}      # 文档号 -> 小写的 "名称\nURL"
+        self.doc_ids = {}    # 网站ID -> 文档号
+        self.version = 0     # 索引内容每次变化加一，用于判断上次结果是否过期
+        self._next_doc = 0
+        self._last = None    # (版本, 关键词, 文档号列表)
+        for site in sites:
+            self.add(site)
+
+    @staticmethod
+    def _text(site):
+        # 换行符不会出现在关键词中，拼接后一次子串判断即可
+        return f"{site['name']}\n{site['url']}".lower()
+
+    def add(self, site):
+        """索引一个新网站"""
+        doc = self._next_doc
+        self._next_doc += 1
+        self.doc_ids[site["id"]] = doc
+        self._index(doc, site)
+
+    def _index(self, doc, site):
+        text = self._text(site)
+        self.docs[doc] = site
+        self.texts[doc] = text
+        self.version += 1
+        postings = self.postings
+        for gram in _grams(text):
+            try:
+                postings[gram].add(doc)
+            except KeyError:
+                postings[gram] = {doc}
+
+    def _unindex(self, doc):
+        del self.docs[doc]
+        self.version += 1
+        for gram in _grams(self.texts.pop(doc)):
+            posting = self.postings.get(gram)
+            if posting is not None:
+                posting.discard(doc)
+                if not posting:
+                    del self.postings[gram]
+
+    def remove(self, site_id):
+        """从索引中删除网站"""
+        doc = self.doc_ids.pop(site_id, None)
+        if doc is None:
+            return False
+        self._unindex(doc)
+        return True
+
+    def update(self, site):
+        """网站内容变化后重新索引（保持原有顺序）"""
+        doc = self.doc_ids.get(site["id"])
+        if doc is None:
+            self.add(site)
+            return
+        self._unindex(doc)
+        self._index(doc, site)
+
+    def candidates(self, keyword):
+        """返回可能包含关键词的文档号集合"""
+        if len(keyword) == 1:
+            return self.postings.get(keyword, set())
+        keys = {keyword[i:i + 2] for i in range(len(keyword) - 1)}
+        postings = []
+        for key in keys:
+            posting = self.postings.get(key)
+            if not posting:
+                return set()
+            postings.append(posting)
+        postings.sort(key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result &= posting
+            if not result:
+                break
+        return result
+
+    def search(self, keyword):
+        """子串搜索，结果按添加顺序排列"""
+        keyword = keyword.lower()
+        if not keyword:
+            return [self.docs[doc] for doc in sorted(self.docs)]
+        texts = self.texts
+        matched = self._narrow(keyword)
+        if matched is None:
+            matched = [doc for doc in sorted(self.candidates(keyword))
+                       if keyword in texts[doc]]
+        self._last = (self.version, keyword, matched)
+        docs = self.docs
+        return [docs[doc] for doc in matched]
+
+    def clear_last_result(self):
+        """丢弃上一次的结果，下一次搜索从索引开始"""
+        self._last = None
+
+    def _narrow(self, keyword):
+        """新关键词包含上一次的关键词时，只在上一次的结果中筛选"""
+        if self._last is None:
+            return None
+        version, last_keyword, last_matched = self._last
+        if version != self.version or last_keyword not in keyword:
+            return None
+        texts = self.texts
+        return [doc for doc in last_matched if keyword in texts[doc]]
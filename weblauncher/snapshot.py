@@ -0,0 +1,165 @@
+# weblauncher/snapshot.py
+"""二进制快照：与 JSONL 快照内容相同，启动时不需要逐行解析和校验"""
+import json
+import mmap
+import os
+import struct
+from array import array
+
+from .records import Site
+
+BINARY_MAGIC = b"WLBS"
+BINARY_VERSION = 1  # 格式或校验规则变化时加一，旧文件会被忽略
+NO_EXTRA = 0xFFFFFFFF
+NO_STRING = 0xFFFFFFFE  # 字段为 None（如旧数据中没有ID的网站）
+_HEAD = struct.Struct("<4sII")
+
+
+def binary_path(data_file):
+    return data_file + ".bin"
+
+
+def write_binary_snapshot(data_file, sites, seq):
+    """在 JSONL 快照旁写入二进制快照（临时文件 + 原子重命名）
+
+    文件布局（小端，各数组按 8 字节对齐）：魔数、版本、头部长度、
+    JSON 头部，然后是字符串偏移表 (Q × 字符串数+1)、创建时间
+    (q × 网站数)、每个网站的字符串编号 (I × 网站数 × 5：id、名称、
+    URL、分类、其他字段的 JSON)，最后是以 \\0 分隔的 UTF-8 字符串区。
+    相同的字符串（分类、重复的名称）只存一次，为 None 的字段记为 NO_STRING。头部记下 JSONL 快照的
+    大小和修改时间，两者对不上时读取方改用 JSONL。
+    """
+    strings = {}
+
+    def ref(text):
+        if text is None:
+            return NO_STRING
+        index = strings.get(text)
+        if index is None:
+            index = strings[text] = len(strings)
+        return index
+
+    refs = array("I")
+    created = array("q")
+    for site in sites:
+        if not isinstance(site, Site):
+            site = Site.from_dict(site)
+        extra = NO_EXTRA
+        if site.extra:
+            extra = ref(json.dumps(site.extra, ensure_ascii=False, sort_keys=True))
+        refs.extend((ref(site.id), ref(site.name), ref(site.url), ref(site.category), extra))
+        created.append(site.created)
+
+    table = list(strings)
+    if any("\0" in text for text in table):
+        # 分隔符冲突（几乎不可能）：不写二进制快照，启动时读取 JSONL
+        remove_binary_snapshot(data_file)
+        return False
+    blob = "\0".join(table).encode("utf-8")
+    offsets = array("Q", [0])
+    position = 0
+    for text in table:
+        position += len(text.encode("utf-8")) + 1
+        offsets.append(position)
+
+    stat = os.stat(data_file)
+    header = json.dumps({"seq": seq, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                         "count": len(created), "strings": len(table)}).encode("utf-8")
+    header += b" " * (-(_HEAD.size + len(header)) % 8)
+    path = binary_path(data_file)
+    tmp_file = path + ".tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(_HEAD.pack(BINARY_MAGIC, BINARY_VERSION, len(header)))
+        f.write(header)
+        offsets.tofile(f)
+        created.tofile(f)
+        refs.tofile(f)
+        f.write(blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, path)
+    return True
+
+
+def remove_binary_snapshot(data_file):
+    try:
+        os.remove(binary_path(data_file))
+    except OSError:
+        pass
+
+
+class BinarySnapshot:
+    """用 mmap 打开的二进制快照
+
+    site(pos) 只解码一个网站用到的几个字符串；load_all() 一次解码
+    整个字符串区，用于完整载入。其中的网站保存时已经校验过，不再校验。
+    """
+    def __init__(self, path, header, offset):
+        self.seq = header["seq"]
+        self.count = header["count"]
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        strings = header["strings"]
+        self._offsets = memoryview(self._map)[offset:offset + 8 * (strings + 1)].cast("Q")
+        offset += 8 * (strings + 1)
+        self._created = memoryview(self._map)[offset:offset + 8 * self.count].cast("q")
+        offset += 8 * self.count
+        self._refs = memoryview(self._map)[offset:offset + 20 * self.count].cast("I")
+        self._blob = offset + 20 * self.count
+
+    @classmethod
+    def open(cls, data_file):
+        """版本不符、文件缺失或与 JSONL 快照不一致时返回 None"""
+        path = binary_path(data_file)
+        try:
+            with open(path, "rb") as f:
+                magic, version, header_len = _HEAD.unpack(f.read(_HEAD.size))
+                if magic != BINARY_MAGIC or version != BINARY_VERSION:
+                    return None
+                header = json.loads(f.read(header_len).decode("utf-8"))
+            stat = os.stat(data_file)
+            if stat.st_size != header["size"] or stat.st_mtime_ns != header["mtime_ns"]:
+                return None
+            return cls(path, header, _HEAD.size + header_len)
+        except (OSError, ValueError, KeyError, TypeError, struct.error):
+            return None
+
+    def __len__(self):
+        return self.count
+
+    def _string(self, index):
+        if index == NO_STRING:
+            return None
+        start = self._blob + self._offsets[index]
+        end = self._blob + self._offsets[index + 1] - 1
+        return self._map[start:end].decode("utf-8")
+
+    def site(self, pos):
+        """解码第 pos 个网站"""
+        site_id, name, url, category, extra = self._refs[5 * pos:5 * pos + 5]
+        return Site(self._string(site_id), self._string(name), self._string(url),
+                    self._string(category), self._created[pos],
+                    None if extra == NO_EXTRA else json.loads(self._string(extra)))
+
+    def load_all(self):
+        """解码全部网站（按快照顺序）"""
+        strings = self._map[self._blob:].decode("utf-8").split("\0")
+        refs = self._refs.tolist()
+        if NO_STRING in refs:
+            strings.append(None)
+            refs = [len(strings) - 1 if ref == NO_STRING else ref for ref in refs]
+        refs = iter(refs)
+        sites = []
+        for created, (site_id, name, url, category, extra) in zip(
+                self._created.tolist(), zip(refs, refs, refs, refs, refs)):
+            sites.append(Site(strings[site_id], strings[name], strings[url], strings[category],
+                              created,
+                              None if extra == NO_EXTRA else json.loads(strings[extra])))
+        return sites
+
+    def close(self):
+        self._offsets.release()
+        self._refs.release()
+        self._created.release()
+        self._map.close()
+        self._file.close()
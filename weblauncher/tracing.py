@@ -0,0 +1,91 @@
+# weblauncher/tracing.py
+"""启动过程计时：记录各阶段耗时并追加到日志文件；界面帧间隔统计"""
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupTracer:
+    """记录启动各阶段的开始/结束时间和关键时刻
+
+    时间都是相对 origin（通常是 main.py 第一行取的 perf_counter）的秒数。
+    阶段可以在后台线程中记录；write() 把一次启动追加为日志中的一行 JSON。
+    """
+    def __init__(self, origin=None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self.phases = []  # (阶段, 开始, 结束, 线程名)
+        self.marks = {}   # 时刻名 -> 时间
+        self.info = {}    # 其他信息（启动模式、网站数量等）
+        self._lock = threading.Lock()
+
+    def now(self):
+        return time.perf_counter() - self.origin
+
+    def record(self, name, start, end):
+        """记录一个阶段（start/end 为 perf_counter 的值）"""
+        with self._lock:
+            self.phases.append((name, start - self.origin, end - self.origin,
+                                threading.current_thread().name))
+
+    @contextmanager
+    def phase(self, name):
+        """with tracer.phase("kv_load"): ... 记录代码块的耗时"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    def mark(self, name):
+        """记录一个时刻（同名只记第一次）"""
+        with self._lock:
+            self.marks.setdefault(name, self.now())
+
+    def summary(self):
+        """一行文字摘要：各阶段耗时和关键时刻"""
+        parts = [f"{name} {(end - start) * 1000:.0f}ms" for name, start, end, _ in self.phases]
+        parts += [f"{name} @{at * 1000:.0f}ms" for name, at in sorted(self.marks.items(),
+                                                                      key=lambda item: item[1])]
+        return " | ".join(parts)
+
+    def write(self, path):
+        """把本次启动追加到日志（每次启动一行 JSON）"""
+        entry = {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "info": self.info,
+            "phases": [{"name": name, "start_ms": round(start * 1000, 1),
+                        "ms": round((end - start) * 1000, 1), "thread": thread}
+                       for name, start, end, thread in self.phases],
+            "marks": {name: round(at * 1000, 1) for name, at in self.marks.items()},
+        }
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+class FrameStats:
+    """收集一段时间内的帧间隔（秒），汇总为 p50/p95/最大值（毫秒）"""
+    def __init__(self):
+        self.samples = []
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+
+    def percentile(self, fraction):
+        """最近秩法的百分位数（毫秒），没有样本时返回 None"""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        rank = max(0, math.ceil(fraction * len(ordered)) - 1)
+        return ordered[rank] * 1000
+
+    def summary(self):
+        if not self.samples:
+            return {"frames": 0}
+        return {"frames": len(self.samples),
+                "p50_ms": round(self.percentile(0.5), 2),
+                "p95_ms": round(self.percentile(0.95), 2),
+                "max_ms": round(max(self.samples) * 1000, 2)}
@@ -0,0 +1,145 @@
+# weblauncher/urls.py
+"""URL 校验和规范化（判断重复网站）"""
+import re
+from urllib.parse import unquote, urlsplit
+
+URL_PATTERN = re.compile(
+    r'^(https?://)?'  # 协议可选
+    r'([A-Za-z0-9-]+\.)+([A-Za-z]{2,}|xn--[A-Za-z0-9-]+)'  # 域名部分（国际化顶级域为 punycode）
+    r'(:\d+)?'  # 端口
+    r"(/[/\w.~%!$&'()*+,;=:@-]*)*"  # 路径（RFC 3986 允许的字符，含百分号编码）
+    r'(\?[^\s#]*)?'  # 查询参数
+    r'(#\S*)?$', re.IGNORECASE)  # 片段
+
+
+def is_valid_url(url):
+    """增强型URL验证；国际化域名先转为 punycode 再校验"""
+    if URL_PATTERN.match(url) is not None:
+        return True
+    if url.isascii():
+        return False
+    url = _idna_host(url)
+    return url is not None and URL_PATTERN.match(url) is not None
+
+
+def _idna_host(url):
+    """把 URL 中的主机名转为 IDNA（punycode），无法转换时返回 None"""
+    scheme, sep, rest = url.partition("://")
+    if not sep:
+        scheme, rest = "", url
+    end = next((i for i, ch in enumerate(rest) if ch in "/?#:"), len(rest))
+    try:
+        host = rest[:end].encode("idna").decode("ascii")
+    except UnicodeError:
+        return None
+    return f"{scheme}{sep}{host}{rest[end:]}"
+
+
+def with_scheme(url):
+    """没有 http:// 或 https:// 时补上 https://"""
+    if not url.lower().startswith(("http://", "https://")):
+        url = "https://" + url
+    return url
+
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonical_url(url):
+    """判断重复用的规范形式，无法解析时返回 None
+
+    没有协议时按 https 处理，http 与 https 视为同一网站；主机名转小写、
+    国际化域名转为 punycode、去掉开头的 www. 和末尾的点；去掉默认端口、
+    路径的百分号编码和末尾的 /，去掉 #片段，查询参数保留。
+    """
+    url = url.strip()
+    if "://" not in url:
+        url = "https://" + url
+    try:
+        parts = urlsplit(url)
+        if parts.scheme.lower() not in DEFAULT_PORTS or not parts.hostname:
+            return None
+        host = parts.hostname.rstrip(".")  # urlsplit 已转为小写
+        if not host.isascii():
+            host = host.encode("idna").decode("ascii")
+        port = parts.port
+    except (ValueError, UnicodeError):
+        return None
+    if host.startswith("www."):
+        host = host[4:]
+    if port is not None and port != DEFAULT_PORTS[parts.scheme.lower()]:
+        host = f"{host}:{port}"
+    path = parts.path
+    if "%" in path:
+        path = unquote(path)
+    path = path.rstrip("/")
+    query = f"?{parts.query}" if parts.query else ""
+    return f"{host}{path}{query}"
+
+
+class UrlIndex:
+    """规范化URL -> 网站ID列表 的哈希索引，添加前 O(1) 判断是否重复
+
+    同一个规范URL有多个网站时（索引建立之前就重复了）全部记下，find 返回最早加入的；
+    删除其中一个后其余的仍能查到，直到 merge_duplicates 清掉它们。
+    """
+    def __init__(self, sites=()):
+        self.ids = {}
+        for site in sites:
+            self.add(site)
+
+    def find(self, url):
+        """与 url 重复的网站ID，没有时返回 None"""
+        key = canonical_url(url)
+        ids = None if key is None else self.ids.get(key)
+        return ids[0] if ids else None
+
+    def add(self, site):
+        key = canonical_url(site["url"])
+        if key is not None:
+            ids = self.ids.setdefault(key, [])
+            if site["id"] not in ids:
+                ids.append(site["id"])
+
+    def remove(self, site):
+        key = canonical_url(site["url"])
+        ids = None if key is None else self.ids.get(key)
+        if ids and site["id"] in ids:
+            ids.remove(site["id"])
+            if not ids:
+                del self.ids[key]
+
+    def update(self, old, new):
+        self.remove(old)
+        self.add(new)
+
+
+def duplicate_groups(sites):
+    """一遍扫描找出重复的网站：[(保留的网站, [重复的网站, ...]), ...]
+
+    按列表顺序保留每组的第一个，线性时间。
+    """
+    first = {}
+    groups = {}
+    for site in sites:
+        key = canonical_url(site["url"])
+        if key is None:
+            continue
+        kept = first.setdefault(key, site)
+        if kept is not site:
+            groups.setdefault(key, (kept, []))[1].append(site)
+    return list(groups.values())
+
+
+def unique_records(records, existing):
+    """去掉与已有网站（existing 为已有的规范URL集合或字典）或同一批中前面的记录重复的 (名称, URL, 分类)"""
+    seen = set()
+    unique = []
+    for record in records:
+        key = canonical_url(record[1])
+        if key is not None:
+            if key in existing or key in seen:
+                continue
+            seen.add(key)
+        unique.append(record)
+    return unique
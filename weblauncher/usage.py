@@ -0,0 +1,306 @@
+# weblauncher/usage.py
+"""打开记录和常用度（frecency）排序"""
+import heapq
+import json
+import math
+import os
+import struct
+import time
+from bisect import bisect_right
+from collections.abc import Sequence
+
+from .filelock import FileLock, file_identity, lock_path
+
+HALF_LIFE = 14 * 24 * 3600    # 常用度的半衰期：两周前打开一次只算半次
+TOP_K = 24                    # "常用" 视图和默认排序置顶的网站数
+USAGE_LOG_LIMIT = 1024 * 1024  # 写检查点时日志超过该字节数就轮转
+_EPOCH = 1700000000            # 计分的参考时间，避免指数过大
+_RECORD = struct.Struct("<dH")  # 打开时间、网站ID长度，后接 UTF-8 的网站ID
+
+
+def _logaddexp(a, b):
+    """log(exp(a) + exp(b))，不会溢出"""
+    if a < b:
+        a, b = b, a
+    return a + math.log1p(math.exp(b - a))
+
+
+def _stamp(path):
+    """判断检查点是否被别的进程重写过（编号可能被新文件复用，再加上修改时间和大小）"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class UsageLog:
+    """网站打开记录
+
+    每次打开只向 usage.log 追加一条二进制记录。常用度是按时间衰减的
+    打开次数：sum(0.5 ** ((现在 - 打开时间) / 半衰期))。对所有网站来说
+    衰减因子相同，所以只保存 log(sum(2 ** ((打开时间 - 参考时间) / 半衰期)))，
+    它只会在打开时增加、不随时间变化，可以增量维护，也能直接比较排序。
+
+    退出时把计分写成检查点（usage.log.ckpt，记下已计入的日志位置），
+    启动时读取检查点后只重放其后追加的记录；常用的前 K 个用小根堆维护。
+    几个进程共用一个日志：写检查点时在文件锁内先补上其他进程在
+    自己读到的位置之后追加的记录，检查点不会丢掉别人的打开记录。
+    log_file 为 None 时只在内存中计分，不读写任何文件。
+    """
+    def __init__(self, log_file, half_life=HALF_LIFE, top_k=TOP_K):
+        self.log_file = log_file
+        self.checkpoint_file = None if log_file is None else log_file + ".ckpt"
+        self.rate = math.log(2) / half_life
+        self.top_k = top_k
+        self.scores = {}     # 网站ID -> [对数计分, 打开次数, 最后打开时间]
+        self.positions = {}  # 检查点记下的 网站ID -> 快照中的序号
+        self.snapshot_seq = None
+        self._top = {}       # 前 K 个：网站ID -> 对数计分
+        self._heap = []      # (对数计分, 网站ID) 小根堆，分数过期的条目延迟删除
+        self.lock = None if log_file is None else FileLock(lock_path(log_file))
+        self._identity = None  # 已读到的日志文件（轮转后换成新文件）
+        self._offset = 0       # 计分已包含该文件中这个位置之前的全部记录
+        self._own = set()      # 本进程在 _offset 之后追加的记录 (文件, 位置)，已经计入
+        self._checkpoint = None  # 最近读取或写入的检查点文件
+
+    def load(self):
+        """读取检查点，再重放检查点之后追加的打开记录"""
+        if self.log_file is None:
+            return
+        with self.lock:
+            self._load()
+        self._rebuild_top()
+
+    def _load(self):
+        offset = 0
+        try:
+            with open(self.checkpoint_file, "r", encoding="utf-8") as f:
+                checkpoint = json.load(f)
+            self.scores = checkpoint["scores"]
+            self.positions = checkpoint.get("positions", {})
+            self.snapshot_seq = checkpoint.get("seq")
+            offset = checkpoint["offset"]
+        except (OSError, ValueError, KeyError, TypeError):
+            self.scores = {}
+            offset = 0
+        self._checkpoint = _stamp(self.checkpoint_file)
+        self._identity = file_identity(self.log_file)
+        self._own.clear()
+        self._offset = self._replay(self.log_file, offset)
+
+    def _replay(self, path, offset):
+        """计入 path 中 offset 之后的记录（跳过本进程已计入的），返回读到的位置"""
+        try:
+            with open(path, "rb") as f:
+                stat = os.fstat(f.fileno())
+                identity = (stat.st_dev, stat.st_ino)
+                f.seek(offset)
+                data = f.read()
+        except OSError:
+            return offset
+        pos = 0
+        while pos + _RECORD.size <= len(data):
+            when, length = _RECORD.unpack_from(data, pos)
+            end = pos + _RECORD.size + length
+            if end > len(data):
+                break  # 崩溃时或其他进程正在写的半条记录
+            if (identity, offset + pos) not in self._own:
+                self._count(data[pos + _RECORD.size:end].decode("utf-8", "replace"), when)
+            pos = end
+        return offset + pos
+
+    def _catch_up(self):
+        """计入其他进程在 _offset 之后追加的记录（持有文件锁时调用）
+
+        日志已被别的进程轮转时，先读完 .1 中剩下的部分；跟不上轮转时
+        （轮转了不止一次，或读取时还没有日志）重新读取检查点：
+        轮转前写的检查点已经包含轮转掉的全部记录（包括本进程的）。
+        """
+        identity = file_identity(self.log_file)
+        if identity is None or identity != self._identity:
+            if self._identity is not None and file_identity(self.log_file + ".1") == self._identity:
+                self._replay(self.log_file + ".1", self._offset)
+            elif _stamp(self.checkpoint_file) != self._checkpoint:
+                self._load()
+                self._rebuild_top()
+                return
+            self._identity = identity
+            self._offset = 0
+        self._offset = self._replay(self.log_file, self._offset)
+        self._own.clear()
+        self._rebuild_top()
+
+    def record(self, site_id, when=None):
+        """记录一次打开（追加到日志并更新计分）"""
+        if when is None:
+            when = time.time()
+        if self.log_file is not None:
+            data = site_id.encode("utf-8")
+            record = _RECORD.pack(when, len(data)) + data
+            # 打开记录丢了影响不大，不做 fsync
+            with open(self.log_file, "ab") as f:
+                f.write(record)
+                f.flush()
+                # 追加写入后文件位置在这条记录末尾（其他进程同时追加也一样）
+                stat = os.fstat(f.fileno())
+                self._own.add(((stat.st_dev, stat.st_ino), f.tell() - len(record)))
+        self._offer(site_id, self._count(site_id, when))
+
+    def _count(self, site_id, when):
+        """把一次打开计入网站的计分，返回新的对数计分"""
+        value = (when - _EPOCH) * self.rate
+        entry = self.scores.get(site_id)
+        if entry is None:
+            self.scores[site_id] = [value, 1, when]
+            return value
+        entry[0] = _logaddexp(entry[0], value)
+        entry[1] += 1
+        entry[2] = max(entry[2], when)
+        return entry[0]
+
+    def _offer(self, site_id, score):
+        """计分增加后更新前 K 个"""
+        top = self._top
+        if site_id not in top and len(top) >= self.top_k:
+            self._drop_stale()
+            if score <= self._heap[0][0]:
+                return
+            _, weakest = heapq.heappop(self._heap)
+            del top[weakest]
+        top[site_id] = score
+        heapq.heappush(self._heap, (score, site_id))
+        if len(self._heap) > 4 * self.top_k:
+            self._heap = [(s, i) for i, s in top.items()]
+            heapq.heapify(self._heap)
+
+    def _drop_stale(self):
+        heap = self._heap
+        while heap and self._top.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+
+    def _rebuild_top(self):
+        best = heapq.nlargest(self.top_k, self.scores.items(), key=lambda item: item[1][0])
+        self._top = {site_id: entry[0] for site_id, entry in best}
+        self._heap = [(score, site_id) for site_id, score in self._top.items()]
+        heapq.heapify(self._heap)
+
+    def forget(self, site_id):
+        """网站被删除后去掉它的计分"""
+        if self.scores.pop(site_id, None) is None:
+            return
+        self.positions.pop(site_id, None)
+        if site_id in self._top:
+            self._rebuild_top()
+
+    def top(self):
+        """常用的网站ID，常用度从高到低"""
+        return sorted(self._top, key=self._top.get, reverse=True)
+
+    def frecency(self, site_id, now=None):
+        """网站当前的常用度（约等于按时间衰减后的打开次数）"""
+        entry = self.scores.get(site_id)
+        if entry is None:
+            return 0.0
+        if now is None:
+            now = time.time()
+        return math.exp(entry[0] - (now - _EPOCH) * self.rate)
+
+    def save(self, positions=None, seq=None):
+        """写入检查点（临时文件 + 原子重命名），日志过大时轮转
+
+        positions/seq 记下常用网站在快照中的序号，下次启动按偏移索引
+        读取快照时，不解码全部网站也能把它们排到前面。
+        """
+        if self.log_file is None:
+            if positions is not None:
+                self.positions = positions
+                self.snapshot_seq = seq
+            return
+        with self.lock:
+            self._catch_up()
+            if positions is not None:
+                self.positions = positions
+                self.snapshot_seq = seq
+            if self._offset > USAGE_LOG_LIMIT:
+                # 检查点已包含全部计分，旧记录只作为历史保留一份
+                os.replace(self.log_file, self.log_file + ".1")
+                self._identity = None
+                self._offset = 0
+            self._write_checkpoint()
+
+    def _write_checkpoint(self):
+        checkpoint = {"offset": self._offset, "seq": self.snapshot_seq,
+                      "positions": self.positions, "scores": self.scores}
+        tmp_file = self.checkpoint_file + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.checkpoint_file)
+        self._checkpoint = _stamp(self.checkpoint_file)
+
+
+class RankedView(Sequence):
+    """把常用网站排在前面、其余保持原顺序的只读序列
+
+    head 为常用网站在 base 中的下标（按常用度排序），不复制 base，
+    可以直接包装按需解码的快照视图。
+    """
+    def __init__(self, base, head):
+        self.base = base
+        self.head = head
+        self._skips = sorted(head)
+
+    def __len__(self):
+        return len(self.base)
+
+    def _base_index(self, i):
+        if i < len(self.head):
+            return self.head[i]
+        # 第 j 个非置顶网站：跳过排在它前面的置顶网站
+        j = i - len(self.head)
+        for skip in self._skips:
+            if skip <= j:
+                j += 1
+            else:
+                break
+        return j
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.base[self._base_index(k)] for k in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self.base[self._base_index(i)]
+
+
+def rank_by_usage(sites, top_ids):
+    """常用网站在前的视图；没有常用网站时原样返回"""
+    if not top_ids:
+        return sites
+    wanted = set(top_ids)
+    found = {site["id"]: i for i, site in enumerate(sites) if site["id"] in wanted}
+    head = [found[site_id] for site_id in top_ids if site_id in found]
+    return RankedView(sites, head) if head else sites
+
+
+def snapshot_head(view, positions, top_ids):
+    """按检查点中的快照序号找出常用网站在快照视图中的下标"""
+    head = []
+    indices = view.positions
+    for site_id in top_ids:
+        pos = positions.get(site_id)
+        if pos is None:
+            continue
+        if isinstance(indices, range):
+            i = pos if pos in indices else None
+        else:
+            i = bisect_right(indices, pos) - 1
+            if i < 0 or indices[i] != pos:
+                i = None
+        if i is not None and view[i]["id"] == site_id:
+            head.append(i)
+    return head
@@ -0,0 +1,127 @@
+# weblauncher/watch.py
+"""监视数据目录：Linux/安卓上用 inotify，其他平台定时比较文件状态"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+
+POLL_INTERVAL = 1.0   # 轮询方式检查文件状态的间隔（秒）
+SETTLE_DELAY = 0.1    # 收到事件后再等一会儿，把一次保存产生的多个事件合并
+
+# inotify 事件
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT = struct.Struct("iIII")
+
+
+def _load_inotify():
+    """返回 libc（有 inotify 时），否则返回 None"""
+    if os.name != "posix":
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class FileWatcher:
+    """在后台线程监视目录中的几个文件，有变化时调用 on_change(变化的文件名集合)
+
+    on_change 在监视线程中调用，界面需要自己切回界面线程。
+    本进程自己的写入同样会触发，调用方应能廉价地判断"没有新内容"。
+    """
+    def __init__(self, directory, names, on_change, interval=POLL_INTERVAL):
+        self.directory = directory
+        self.names = set(names)
+        self.on_change = on_change
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self.mode = None  # "inotify" 或 "poll"
+
+    def start(self):
+        libc = _load_inotify()
+        fd = -1
+        if libc is not None:
+            fd = libc.inotify_init1(os.O_CLOEXEC)
+            if fd >= 0 and libc.inotify_add_watch(fd, os.fsencode(self.directory), _WATCH_MASK) < 0:
+                os.close(fd)
+                fd = -1
+        if fd >= 0:
+            self.mode = "inotify"
+            target, args = self._run_inotify, (fd,)
+        else:
+            self.mode = "poll"
+            # 启动时的状态在这里记下，线程启动前发生的修改也能发现
+            target, args = self._run_poll, ({name: self._signature(name) for name in self.names},)
+        self._thread = threading.Thread(target=target, args=args, name="file-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2 * self.interval)
+            self._thread = None
+
+    def _notify(self, changed):
+        try:
+            self.on_change(changed)
+        except Exception as e:
+            print(f"处理文件变化失败: {str(e)}")
+
+    def _run_inotify(self, fd):
+        try:
+            while not self._stop.is_set():
+                ready, _, _ = select.select([fd], [], [], self.interval)
+                if not ready:
+                    continue
+                changed = self._read_events(fd)
+                # 一次保存会产生多个事件（写入、重命名），稍等后一起处理
+                while select.select([fd], [], [], SETTLE_DELAY)[0]:
+                    changed |= self._read_events(fd)
+                if changed and not self._stop.is_set():
+                    self._notify(changed)
+        finally:
+            os.close(fd)
+
+    def _read_events(self, fd):
+        data = os.read(fd, 64 * 1024)
+        changed = set()
+        pos = 0
+        while pos + _EVENT.size <= len(data):
+            _, _, _, length = _EVENT.unpack_from(data, pos)
+            name = data[pos + _EVENT.size:pos + _EVENT.size + length].rstrip(b"\0")
+            name = os.fsdecode(name)
+            if name in self.names:
+                changed.add(name)
+            pos += _EVENT.size + length
+        return changed
+
+    def _signature(self, name):
+        try:
+            stat = os.stat(os.path.join(self.directory, name))
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def _run_poll(self, known):
+        while not self._stop.wait(self.interval):
+            changed = set()
+            for name in self.names:
+                signature = self._signature(name)
+                if signature != known[name]:
+                    known[name] = signature
+                    changed.add(name)
+            if changed:
+                self._notify(changed)
@@ -0,0 +1,144 @@
+# weblauncher/writer.py
+"""后台写入：修改先记在内存里，一段时间内的连续修改合并成一次日志写入"""
+import atexit
+import threading
+
+FLUSH_INTERVAL = 1.0  # 第一条修改之后最多等待多久写入（秒）
+
+
+class WriteBehind:
+    """在后台线程中把操作记录追加到日志
+
+    界面线程调用 submit() 后立即返回，interval 秒内的修改合并成一次
+    写入、一次 fsync；flush() 立即写入并等待完成（应用暂停、退出时调用）。
+    写入失败时调用 on_error(消息)，记录保留到下次重试；on_error 和
+    on_written（写入成功后，如检查是否需要压缩）都在写入线程中调用，
+    界面需要自己切回界面线程。线程在第一次 submit 时才启动；
+    interval 为 None 时不启动线程，submit 在调用线程中直接写入。
+    """
+    def __init__(self, journal, interval=FLUSH_INTERVAL, on_error=None, on_written=None):
+        self.journal = journal
+        self.interval = interval
+        self.on_error = on_error
+        self.on_written = on_written
+        self._cond = threading.Condition()
+        self._records = []     # 待写的 (操作, 内容)
+        self._requested = 0    # flush 请求的编号
+        self._done = 0         # 已完成的 flush 请求编号
+        self._failed = False
+        self._stopped = False
+        self._thread = None
+
+    def submit(self, op, payloads):
+        """登记同一种操作的若干条记录"""
+        self.submit_records([(op, payload) for payload in payloads])
+
+    def submit_records(self, records):
+        """登记已经组好的 (操作, 内容) 记录（如导入时在后台线程中建好的）"""
+        with self._cond:
+            self._records.extend(records)
+            if self.interval is None:
+                self._write_now()
+                return
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                self._thread.start()
+                # 忘记调用 close() 时，解释器退出前也把剩下的修改写完
+                atexit.register(self.flush)
+            self._cond.notify_all()
+
+    def pending(self):
+        """还有没写入的记录"""
+        with self._cond:
+            return bool(self._records)
+
+    def flush(self, timeout=None):
+        """立即写入全部待写记录并等待完成，返回是否写入成功"""
+        with self._cond:
+            if self.interval is None:
+                self._write_now()
+                return not self._records
+            if self._thread is None or not self._thread.is_alive():
+                return not self._records
+            self._requested += 1
+            target = self._requested
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: self._done >= target, timeout)
+            return not self._records and not self._failed
+
+    def stop(self):
+        """写完剩下的记录后结束线程"""
+        self.flush()
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            atexit.unregister(self.flush)
+
+    def _run(self):
+        with self._cond:
+            while True:
+                self._cond.wait_for(
+                    lambda: self._records or self._requested > self._done or self._stopped)
+                if self._stopped and not self._records:
+                    return
+                if self._requested == self._done and not self._stopped:
+                    # 等一会儿，把连续的修改合并到一次写入；失败后同样等一会儿再重试
+                    self._cond.wait_for(
+                        lambda: self._requested > self._done or self._stopped, self.interval)
+                batch, self._records = self._records, []
+                target = self._requested
+                self._cond.release()
+                try:
+                    error = self._write(batch)
+                finally:
+                    self._cond.acquire()
+                if error is not None:
+                    self._records[:0] = batch
+                    if not self._failed:
+                        self._report(f"保存数据失败: {error}")
+                    if self._stopped:
+                        self._records = []  # 退出时不再无限重试
+                self._failed = error is not None
+                self._done = max(self._done, target)
+                self._cond.notify_all()
+
+    def _write_now(self):
+        """在调用线程中写入（持有锁时调用），失败的记录留到下次重试"""
+        batch, self._records = self._records, []
+        error = self._write(batch)
+        if error is not None:
+            self._records[:0] = batch
+            if not self._failed:
+                self._report(f"保存数据失败: {error}")
+        self._failed = error is not None
+
+    def _write(self, batch):
+        """写入一批记录，失败时返回错误信息"""
+        if not batch:
+            return None
+        try:
+            self.journal.append_records(batch)
+        except Exception as e:
+            return str(e)
+        if self.on_written is not None:
+            try:
+                self.on_written()
+            except Exception as e:
+                print(f"压缩数据文件失败: {str(e)}")
+        return None
+
+    def _report(self, message):
+        # 在写入线程中调用（不持有锁，回调可以做任何事）
+        self._cond.release()
+        try:
+            if self.on_error is not None:
+                self.on_error(message)
+            else:
+                print(message)
+        except Exception as e:
+            print(f"报告写入错误失败: {str(e)}")
+        finally:
+            self._cond.acquire()